@@ -0,0 +1,58 @@
+"""
+  Compares the memory and parse throughput of pdfplumber word dicts against
+  lean word dicts and `WordColumns` on the fixture PDFs.
+
+  Usage: python -m benchmarks.columnar [PDF ...]
+"""
+import sys
+import time
+import tracemalloc
+from lib import Document, WordColumns
+from lib.extraction import extract_pages
+
+FIXTURES = ['fixtures/sample.pdf', 'fixtures/sample2.pdf', 'fixtures/sample3.pdf']
+
+def traced(build):
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+def parse(pages):
+    start = time.perf_counter()
+    document = Document()
+    for width, words in pages:
+        document.add_words(words, width=width)
+    return document, time.perf_counter() - start
+
+def main(argv):
+    for path in argv[1:] or FIXTURES:
+        dict_pages, dict_bytes = traced(lambda: list(extract_pages(path)))
+        lean_pages, lean_bytes = traced(lambda: list(extract_pages(path, lean=True)))
+        columnar_pages, columnar_bytes = traced(
+            lambda: [(width, WordColumns.from_words(words)) for width, words in dict_pages]
+        )
+        word_count = sum(len(words) for _, words in dict_pages)
+        if word_count == 0:
+            print(f"{path}: no words")
+            continue
+
+        dict_document, dict_time = parse(dict_pages)
+        lean_document, lean_time = parse(lean_pages)
+        columnar_document, columnar_time = parse(columnar_pages)
+        headings = [(h.text(), h.tier) for h in dict_document.headings]
+        identical = (
+            headings == [(h.text(), h.tier) for h in lean_document.headings]
+            and headings == [(h.text(), h.tier) for h in columnar_document.headings]
+        )
+        print(
+            f"{path}: {word_count} words; "
+            f"memory dicts {dict_bytes / 1e6:.1f} MB, lean {lean_bytes / 1e6:.1f} MB, columns {columnar_bytes / 1e6:.2f} MB; "
+            f"parse dicts {word_count / dict_time:,.0f} words/s, lean {word_count / lean_time:,.0f} words/s, "
+            f"columns {word_count / columnar_time:,.0f} words/s; "
+            f"identical={identical}"
+        )
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,31 @@
+"""
+  Compares serial and process-pool extraction of a bill.
+
+  Usage: python -m benchmarks.parallel_extraction [PDF] [JOBS]
+"""
+import os
+import sys
+import time
+from lib import Document
+
+def run(path, jobs):
+    start = time.perf_counter()
+    document = Document.from_pdf(path, jobs=jobs)
+    return document, time.perf_counter() - start
+
+def main(argv):
+    path = argv[1] if len(argv) > 1 else 'fixtures/sample3.pdf'
+    jobs = int(argv[2]) if len(argv) > 2 else (os.cpu_count() or 1)
+
+    serial, serial_time = run(path, 1)
+    parallel, parallel_time = run(path, jobs)
+
+    identical = (
+        [heading.text() for heading in serial.headings] == [heading.text() for heading in parallel.headings]
+        and [section.tier for section in serial.sections] == [section.tier for section in parallel.sections]
+    )
+    print(f"{path}: serial {serial_time:.2f}s, jobs={jobs} {parallel_time:.2f}s, "
+          f"speedup {serial_time / parallel_time:.2f}x, identical={identical}")
+
+if __name__ == '__main__':
+    main(sys.argv)
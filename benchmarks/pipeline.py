@@ -0,0 +1,158 @@
+"""
+  End-to-end benchmark of the parsing pipeline, stage by stage, on the
+  fixture PDFs. Every stage is run once to warm up and then `--repeat`
+  times; the JSON report has, per PDF and stage, the median and best wall
+  time, the median CPU time, pages/s and words/s at the median wall time and
+  the peak memory the stage allocated. The peak comes from one more run under
+  `tracemalloc`, after the timed ones, since tracing slows the stage down; it
+  counts Python allocations made during the stage, not memory held before it.
+
+  Stages:
+    extraction      pdfplumber word extraction (no word cache)
+    classification  the heading logic: every word through `Document`,
+                    without building the section tree
+    tree            building the section tree from the classified headings
+                    and content
+    rendering       rendering the tree in each of the `RENDERERS` formats
+    tokens          `count_tokens` over the tree, with cached counts dropped
+
+  Usage: python -m benchmarks.pipeline [PDF ...] [--repeat N] [--output FILE] [--offline]
+
+  See `benchmarks.token_count` for --offline.
+"""
+import argparse
+import io
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from lib import Document
+from lib.extraction import extract_pages
+from lib.renderer import RENDERERS, render
+from lib.tokens import count_tokens, register_encoder
+from .token_count import MODEL, byte_level_encoding
+
+FIXTURES = ['fixtures/sample.pdf', 'fixtures/sample2.pdf', 'fixtures/sample3.pdf']
+
+class ClassifyingDocument(Document):
+    """
+      A `Document` that records the content and headings the heading logic
+      produces instead of attaching them to a tree, so classification can be
+      timed on its own. `build_tree` replays the recorded events onto a plain
+      `Document`.
+    """
+    def __init__(self):
+        super().__init__()
+        self.events = []
+
+    def _append_content(self, item):
+        self.events.append((False, item))
+
+    def _attach_heading(self, heading):
+        self.events.append((True, heading))
+
+    def build_tree(self):
+        document = Document()
+        for is_heading, value in self.events:
+            if is_heading:
+                document._attach_heading(value)
+            else:
+                document._append_content(value)
+        return document
+
+def peak_memory(run):
+    tracemalloc.start()
+    try:
+        run()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def measure(run, repeat, pages, words):
+    run()
+    walls = []
+    cpus = []
+    result = None
+    for _ in range(repeat):
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        result = run()
+        cpus.append(time.process_time() - cpu)
+        walls.append(time.perf_counter() - wall)
+    wall = statistics.median(walls)
+    return result, {
+        'wall_s': wall,
+        'wall_best_s': min(walls),
+        'cpu_s': statistics.median(cpus),
+        'pages_per_s': pages / wall if wall else None,
+        'words_per_s': words / wall if wall else None,
+        'peak_bytes': peak_memory(run),
+        'runs': repeat,
+    }
+
+def classify(pages):
+    document = ClassifyingDocument()
+    for width, words in pages:
+        document.add_words(words, width=width)
+    return document
+
+def render_all(document):
+    for format in RENDERERS:
+        render(document.sections, io.StringIO(), format=format)
+
+def count_all_tokens(document):
+    for root in document.sections:
+        for section in root.walk():
+            section.invalidate()
+    return count_tokens(document.sections, MODEL)
+
+def benchmark(path, repeat):
+    stages = {}
+    pages, stages['extraction'] = measure(lambda: list(extract_pages(path)), repeat, 0, 0)
+    page_count = len(pages)
+    word_count = sum(len(words) for _, words in pages)
+    # Extraction produced the page and word counts, so fill in its rates now.
+    stages['extraction']['pages_per_s'] = page_count / stages['extraction']['wall_s']
+    stages['extraction']['words_per_s'] = word_count / stages['extraction']['wall_s']
+
+    classified, stages['classification'] = measure(lambda: classify(pages), repeat, page_count, word_count)
+    document, stages['tree'] = measure(classified.build_tree, repeat, page_count, word_count)
+    _, stages['rendering'] = measure(lambda: render_all(document), repeat, page_count, word_count)
+    counts, stages['tokens'] = measure(lambda: count_all_tokens(document), repeat, page_count, word_count)
+
+    return {
+        'path': path,
+        'pages': page_count,
+        'words': word_count,
+        'sections': sum(1 for root in document.sections for _ in root.walk()),
+        'tokens': sum(counts),
+        'stages': stages,
+    }
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.pipeline')
+    parser.add_argument('paths', nargs='*', default=FIXTURES)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help="write the report here instead of to stdout")
+    parser.add_argument('--offline', action='store_true')
+    arguments = parser.parse_args(argv[1:])
+    if arguments.offline:
+        register_encoder(MODEL, byte_level_encoding())
+
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': arguments.repeat,
+        'documents': [benchmark(path, arguments.repeat) for path in arguments.paths],
+    }
+    text = json.dumps(report, indent=2)
+    if arguments.output:
+        with open(arguments.output, 'w') as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,77 @@
+"""
+  Replays a recorded token stream through `Document`, without any PDF I/O,
+  for repeatable measurements of the heading logic and the section tree.
+  The stream is decoded before timing starts. Every run parses the whole
+  stream into a new `Document`; the JSON report has the median and best time
+  and words/s and, with --stats, the `ParseStats` of the last run.
+
+  Usage:
+    python -m benchmarks.replay STREAM [--repeat N] [--stats] [--profile] [--output FILE]
+    python -m benchmarks.replay STREAM --record PDF [--lean]
+
+  --record extracts the words of PDF and writes them to STREAM first.
+  --profile runs the stream once under cProfile and prints the hottest
+  functions to stderr.
+"""
+import argparse
+import cProfile
+import json
+import pstats
+import statistics
+import sys
+import time
+from lib import Document, TokenStream
+from lib.extraction import extract_pages
+
+def replay(stream, stats=False):
+    start = time.perf_counter()
+    document = stream.feed(Document(stats=stats))
+    return document, time.perf_counter() - start
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.replay')
+    parser.add_argument('stream')
+    parser.add_argument('--record', metavar='PDF', help="record the words of PDF to the stream first")
+    parser.add_argument('--lean', action='store_true', help="record lean words (see extract_page_words)")
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--stats', action='store_true', help="collect ParseStats (slows parsing down)")
+    parser.add_argument('--profile', action='store_true')
+    parser.add_argument('--output', help="write the report here instead of to stdout")
+    arguments = parser.parse_args(argv[1:])
+
+    if arguments.record:
+        TokenStream.record(arguments.stream, extract_pages(arguments.record, lean=arguments.lean))
+
+    stream = TokenStream(arguments.stream)
+    replay(stream)
+    times = []
+    for _ in range(arguments.repeat):
+        document, elapsed = replay(stream, arguments.stats)
+        times.append(elapsed)
+
+    if arguments.profile:
+        profile = cProfile.Profile()
+        profile.runcall(replay, stream)
+        pstats.Stats(profile, stream=sys.stderr).sort_stats('cumulative').print_stats(25)
+
+    median = statistics.median(times)
+    report = {
+        'stream': arguments.stream,
+        'pages': len(stream),
+        'words': stream.word_count,
+        'headings': len(document.headings),
+        'runs': arguments.repeat,
+        'median_us': median * 1e6,
+        'best_us': min(times) * 1e6,
+        'words_per_s': stream.word_count / median,
+        'stats': document.stats.as_dict() if arguments.stats else None,
+    }
+    text = json.dumps(report, indent=2)
+    if arguments.output:
+        with open(arguments.output, 'w') as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+
+if __name__ == '__main__':
+    main(sys.argv)
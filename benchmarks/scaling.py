@@ -0,0 +1,79 @@
+"""
+  Measures how parsing scales with the size of a bill, on synthetic bills
+  from `SyntheticBill`. For each size the bill's pages are generated ahead of
+  each page's parse, and only `Document.add_words` is timed. The JSON report
+  has, per size, the words, headings, parse time, words/s and, with
+  --memory, the memory retained by the parsed document, plus the scaling
+  exponent against the previous size (1.0 is linear; anything well above it
+  means superlinear behavior).
+
+  Usage: python -m benchmarks.scaling [PAGES ...] [--seed N] [--lean] [--memory] [--output FILE]
+"""
+import argparse
+import json
+import math
+import sys
+import time
+import tracemalloc
+from lib import Document
+from lib.synthetic import SyntheticBill
+
+SIZES = [100, 500, 1000, 2000, 5000]
+
+def run(pages, seed, lean, memory):
+    bill = SyntheticBill(pages, seed=seed, lean=lean)
+    document = Document()
+    if memory:
+        tracemalloc.start()
+    elapsed = 0.0
+    retained = 0
+    for width, words in bill.pages():
+        if memory:
+            before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        document.add_words(words, width=width)
+        elapsed += time.perf_counter() - start
+        if memory:
+            # Memory the document keeps per page, beyond the page's own words.
+            retained += tracemalloc.get_traced_memory()[0] - before
+    if memory:
+        tracemalloc.stop()
+
+    return {
+        'pages': pages,
+        'words': bill.word_count,
+        'headings': len(document.headings),
+        'parse_s': elapsed,
+        'words_per_s': bill.word_count / elapsed,
+        'retained_bytes': retained if memory else None,
+    }
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.scaling')
+    parser.add_argument('sizes', nargs='*', type=int, default=SIZES)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--lean', action='store_true')
+    parser.add_argument('--memory', action='store_true', help="trace memory (slows parsing down)")
+    parser.add_argument('--output', help="write the report here instead of to stdout")
+    arguments = parser.parse_args(argv[1:])
+
+    results = []
+    for pages in sorted(arguments.sizes):
+        result = run(pages, arguments.seed, arguments.lean, arguments.memory)
+        if results:
+            previous = results[-1]
+            result['exponent'] = (
+                math.log(result['parse_s'] / previous['parse_s']) / math.log(result['words'] / previous['words'])
+            )
+        results.append(result)
+        print(f"{pages} pages: {result['words_per_s']:,.0f} words/s", file=sys.stderr)
+
+    text = json.dumps({'seed': arguments.seed, 'lean': arguments.lean, 'results': results}, indent=2)
+    if arguments.output:
+        with open(arguments.output, 'w') as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,58 @@
+"""
+  Compares per-section `Section.token_count()` calls with the thread-pooled
+  `count_tokens` on a parsed bill.
+
+  Usage: python -m benchmarks.token_count [PDF] [WORKERS] [--offline]
+
+  --offline registers a byte-level tiktoken encoding under the model name,
+  for machines that cannot download the real encodings. Counts differ from
+  the model's, but the encoding work runs through the same tiktoken core.
+"""
+import sys
+import time
+import tiktoken
+from lib import Document, WordCache
+from lib.tokens import count_tokens, register_encoder
+
+MODEL = "gpt-4o"
+
+def byte_level_encoding():
+    return tiktoken.Encoding(
+        name="byte_level",
+        pat_str=r"""'s|'t|'re|'ve|'m|'ll|'d| ?\p{L}+| ?\p{N}+| ?[^\s\p{L}\p{N}]+|\s+(?!\S)|\s+""",
+        mergeable_ranks={bytes([byte]): byte for byte in range(256)},
+        special_tokens={},
+    )
+
+def parse(path):
+    return Document.from_pdf(path, cache=WordCache())
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+def main(argv):
+    arguments = [argument for argument in argv[1:] if not argument.startswith('--')]
+    path = arguments[0] if arguments else 'fixtures/sample3.pdf'
+    workers = int(arguments[1]) if len(arguments) > 1 else 4
+    if '--offline' in argv:
+        register_encoder(MODEL, byte_level_encoding())
+
+    looped = parse(path)
+    sections = [section for root in looped.sections for section in root.walk()]
+    _, loop_time = timed(lambda: [section.token_count(MODEL) for section in sections])
+    loop_counts = [root.token_count(MODEL) for root in looped.sections]
+
+    batched = parse(path)
+    batch_counts, batch_time = timed(lambda: count_tokens(batched.sections, MODEL, workers=workers))
+
+    print(
+        f"{path}: {len(sections)} sections, {sum(batch_counts)} tokens; "
+        f"token_count() loop {loop_time * 1000:.1f} ms, count_tokens(workers={workers}) {batch_time * 1000:.1f} ms, "
+        f"speedup {loop_time / batch_time:.2f}x, "
+        f"same counts={loop_counts == batch_counts}"
+    )
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -4,19 +4,21 @@ from lib import ContentType
 from lib import ContentCharacteristics, ContentGroup
 from lib import HeadingAccumulator
 from lib import Document
+from lib import WordCache
 import copy
+import sys
 
 pdf_path = 'fixtures/sample3.pdf'
 
 heading_sentences = []
-with pdfplumber.open(pdf_path) as pdf:
-    document = Document()
-
-    for page in pdf.pages:
-        document.add_page(page)
+cache = WordCache()
+document = Document.from_pdf(pdf_path, cache=cache)
 
 for heading in document.headings:
     print("----")
     print(heading.text())
 
 document.print_headings()
+
+stats = cache.stats()
+print(f"word cache: {stats['hits']} hits, {stats['misses']} misses, {stats['bytes_read']} bytes read", file=sys.stderr)
@@ -3,4 +3,15 @@ from .content_group import ContentCharacteristics, ContentGroup
 from .heading_accumulator import HeadingAccumulator
 from .casing import Casing
 from .section import Section
+from .renderer import render, TaggedRenderer, MarkdownRenderer, JSONLinesRenderer
+from .section_index import SectionIndex
+from .text_index import TextIndex
+from .document_file import DocumentFile, SectionView
+from .checkpoint import Checkpoint
+from .parse_stats import ParseStats
+from .token_stream import TokenStream, TokenStreamWriter
 from .document import Document
+from .word_cache import WordCache
+from .word_columns import WordColumns, ColumnarWord
+from .chunker import Chunk, chunk_sections
+from .tokens import count_tokens
@@ -0,0 +1,83 @@
+import pickle
+import zlib
+from pathlib import Path
+
+def content_without_chars(content):
+    """
+      A copy of a section's content list with the words' `chars` left out.
+      Nothing reads the chars of a word once it is content, and they make up
+      most of its size.
+    """
+    if content is None:
+        return None
+    return [
+        [_without_chars(word) for word in item] if isinstance(item, list) else _without_chars(item)
+        for item in content
+    ]
+
+def _without_chars(word):
+    return {key: value for key, value in word.items() if key != 'chars'}
+
+class Checkpoint:
+    """
+      The state of a `Document` between two pages, from which parsing can be
+      resumed with `Document.resume`: the sections still open (the rightmost
+      spine of the tree, with the content already attached to them), the
+      pending heading accumulator, the line being skipped, the content not yet
+      attached to a section and the running counters.
+
+      Sections that were closed before the checkpoint are not part of it, nor
+      are their headings, and content is kept without its chars (see
+      `content_without_chars`), so a checkpoint stays small however far into
+      the bill it is taken. A resumed document holds only the open sections
+      and what is parsed after the checkpoint, exactly as an uninterrupted
+      parse would; `Document.prepend` adds the rest from a parse of the pages
+      before the checkpoint.
+    """
+    FORMAT_VERSION = 2
+    COMPRESSION_LEVEL = 6
+
+    def __init__(self, *, page_number, open_sections, heading, line_skip, content, section_count, heading_count, retries, page_retries, fast_path_words, page_fast_path_words):
+        # Pages parsed before the checkpoint; parsing resumes at the page
+        # with index `page_number`.
+        self.page_number = page_number
+        # (heading, tier, page, ordinal, content) of each open section, from
+        # the top-level section down.
+        self.open_sections = open_sections
+        self.heading = heading
+        self.line_skip = line_skip
+        self.content = content
+        self.section_count = section_count
+        # Length of the document's `headings` at the checkpoint.
+        self.heading_count = heading_count
+        self.retries = retries
+        self.page_retries = page_retries
+        self.fast_path_words = fast_path_words
+        self.page_fast_path_words = page_fast_path_words
+
+    def __repr__(self):
+        return f'Checkpoint(page_number={self.page_number}, open_sections={len(self.open_sections)})'
+
+    def dumps(self):
+        return zlib.compress(
+            pickle.dumps((self.FORMAT_VERSION, self.__dict__), protocol=pickle.HIGHEST_PROTOCOL),
+            self.COMPRESSION_LEVEL,
+        )
+
+    @classmethod
+    def loads(cls, data):
+        version, state = pickle.loads(zlib.decompress(data))
+        if version != cls.FORMAT_VERSION:
+            raise ValueError(f"unsupported checkpoint format {version}, expected {cls.FORMAT_VERSION}")
+        return cls(**state)
+
+    def save(self, path):
+        path = Path(path)
+        # Write then rename so a crash mid-write leaves the previous checkpoint.
+        partial = path.with_suffix('.partial')
+        partial.write_bytes(self.dumps())
+        partial.replace(path)
+
+    @classmethod
+    def load(cls, path):
+        return cls.loads(Path(path).read_bytes())
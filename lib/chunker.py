@@ -0,0 +1,151 @@
+from .tokens import encoder_for
+
+class Chunk:
+    """
+      A piece of a bill sized for a single model request: the text of one or
+      more adjacent sections (or part of an oversized one), together with the
+      headings of the sections it sits under.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.parts = []
+        self.sections = []
+        self.token_count = 0
+
+    def __repr__(self):
+        return f'Chunk(path={self.path}, sections={len(self.sections)}, token_count={self.token_count})'
+
+    def add(self, text, token_count, section):
+        self.parts.append(text)
+        self.token_count += token_count
+        if not self.sections or self.sections[-1] is not section:
+            self.sections.append(section)
+
+    def text(self):
+        return "".join(self.parts)
+
+def chunk_sections(sections, budget, model="gpt-4o"):
+    """
+      Packs a forest of sections into chunks of at most `budget` tokens.
+
+      Adjacent sibling subtrees that fit are packed together. A subtree that
+      does not fit is split at its subsections: its own heading and content
+      are packed like a subtree of their own, followed by its subsections one
+      level down, so the heading shares a chunk with the subsections after
+      it when they fit. Content that alone exceeds the budget is split at
+      paragraph (or, for parsed words, line) boundaries, and a single unit
+      that is still too large is split by tokens, between characters.
+
+      Token counts come from the cached `Section` counts, so the tree is
+      encoded once and the packing is linear in its size. `budget` limits
+      each chunk's text; its `path` is extra context for the caller.
+    """
+    if budget < 1:
+        raise ValueError("budget must be at least one token")
+    packer = _Packer(budget)
+    _chunk_siblings(sections, (), packer, model)
+    return packer.chunks
+
+class _Packer:
+    """
+      Fills chunks in document order. Text goes into the last chunk while it
+      fits and sits under the chunk's path; otherwise it starts a new chunk.
+    """
+    def __init__(self, budget):
+        self.budget = budget
+        self.chunks = []
+
+    def add(self, text, token_count, section, path):
+        chunk = self.chunks[-1] if self.chunks else None
+        if (
+            chunk is None
+            or chunk.token_count + token_count > self.budget
+            or path[:len(chunk.path)] != chunk.path
+        ):
+            chunk = Chunk(path)
+            self.chunks.append(chunk)
+        chunk.add(text, token_count, section)
+
+def _chunk_siblings(sections, path, packer, model):
+    for section in sections:
+        count = section.token_count(model)
+        if count <= packer.budget:
+            packer.add(section.text(), count, section, path)
+        else:
+            _chunk_own_text(section, path, packer, model)
+            _chunk_siblings(section.subsections, path + (section.heading_text(),), packer, model)
+
+def _chunk_own_text(section, path, packer, model):
+    own_count = section.own_token_count(model)
+    if own_count <= packer.budget:
+        packer.add(section.own_text(), own_count, section, path)
+        return
+
+    encoder = encoder_for(model)
+    tag = f"<h{section.tier}>"
+    # The heading sits under `path`, its content under the heading too.
+    unit_path = path
+    for unit in _content_units(section, f"{tag}{section.heading_text()}{tag}\n\n"):
+        tokens = encoder.encode(unit)
+        if len(tokens) > packer.budget:
+            for piece in _token_pieces(encoder, tokens, packer.budget):
+                packer.add(encoder.decode(piece), len(piece), section, unit_path)
+        else:
+            packer.add(unit, len(tokens), section, unit_path)
+        unit_path = path + (section.heading_text(),)
+
+def _token_pieces(encoder, tokens, budget):
+    """
+      Splits `tokens` into runs of at most `budget` tokens. With a byte-level
+      encoder like tiktoken's, runs end between characters, so each decodes
+      on its own; a character encoded as more than `budget` tokens is kept
+      whole in a longer run.
+    """
+    if not hasattr(encoder, 'decode_single_token_bytes'):
+        for start in range(0, len(tokens), budget):
+            yield tokens[start:start + budget]
+        return
+
+    def starts_character(index):
+        # UTF-8 continuation bytes are 0b10xxxxxx.
+        return index == len(tokens) or encoder.decode_single_token_bytes(tokens[index])[0] & 0xC0 != 0x80
+
+    start = 0
+    while start < len(tokens):
+        stop = min(start + budget, len(tokens))
+        end = stop
+        while end > start and not starts_character(end):
+            end -= 1
+        if end == start:
+            end = stop
+            while not starts_character(end):
+                end += 1
+        yield tokens[start:end]
+        start = end
+
+def _content_units(section, heading):
+    """
+      Yields the section's own text as units that can be split between:
+      the heading, then each paragraph (string content) or line (parsed
+      words), each starting with the separator that precedes it.
+    """
+    yield heading
+    content = section.content
+    if isinstance(content, str):
+        paragraphs = content.split("\n\n")
+        yield paragraphs[0]
+        for paragraph in paragraphs[1:]:
+            yield "\n\n" + paragraph
+    elif content:
+        line = []
+        bottom = None
+        for item in content:
+            for word in (item if isinstance(item, list) else (item,)):
+                if line and abs(word['bottom'] - bottom) >= 2:
+                    yield "".join(line)
+                    line = []
+                line.append(word['text'] if bottom is None else " " + word['text'])
+                bottom = word['bottom']
+        if line:
+            yield "".join(line)
+    yield "\n\n"
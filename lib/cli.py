@@ -0,0 +1,209 @@
+"""
+  Batch entry point: parses many bills, in a process pool, and writes each
+  bill's headings, section tree and rendered text to an output directory.
+
+  Usage: bill-ai PATH [PATH ...] [-o DIRECTORY] [-j JOBS] [--format FORMAT] [--lean] [--cache] [--force] [--quiet]
+
+  PATHs are PDFs or directories searched recursively for PDFs. The outputs
+  of a bill go to DIRECTORY/<bill name>/:
+
+    headings.txt    one "#"-prefixed line per section, as `print_headings`
+    sections.json   the section tree, with each section's heading, tier,
+                    page, content and subsections
+    text.<format>   the tree rendered in FORMAT (see `RENDERERS`)
+    manifest.json   the size and modification time of the PDF the outputs
+                    were made from, written last
+
+  A bill is skipped when its manifest matches the PDF and the options, so
+  rerunning after an interruption or on a growing directory only parses the
+  new and changed bills. Exits with status 1 if any bill failed.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from .document import Document
+from .renderer import RENDERERS, render
+from .word_cache import WordCache
+
+# Bump when the outputs change, so every bill is parsed again.
+OUTPUT_VERSION = 1
+EXTENSIONS = {'tagged': 'txt', 'markdown': 'md', 'jsonl': 'jsonl'}
+
+def find_bills(paths):
+    """
+      The PDFs at `paths`, with directories searched recursively, in order
+      and without duplicates.
+    """
+    bills = []
+    seen = set()
+    for path in map(Path, paths):
+        if path.is_dir():
+            found = sorted(found for found in path.rglob('*') if found.suffix.lower() == '.pdf' and found.is_file())
+        elif path.is_file():
+            found = [path]
+        else:
+            raise FileNotFoundError(f"no such file or directory: {path}")
+        for bill in found:
+            if bill.resolve() not in seen:
+                seen.add(bill.resolve())
+                bills.append(bill)
+    return bills
+
+def bill_directory(output, bill):
+    return Path(output) / bill.stem
+
+def manifest_for(bill, options):
+    stat = bill.stat()
+    return {
+        'version': OUTPUT_VERSION,
+        'source': str(bill.resolve()),
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'options': options,
+    }
+
+def is_up_to_date(bill, directory, options):
+    try:
+        manifest = json.loads((directory / 'manifest.json').read_text())
+    except (FileNotFoundError, ValueError):
+        return False
+    return manifest == manifest_for(bill, options)
+
+def section_tree(section):
+    """
+      `section` and its subtree as nested dicts, built with an explicit stack
+      so deep trees do not hit the recursion limit.
+    """
+    def node(section):
+        return {
+            'heading': section.heading_text(),
+            'tier': section.tier,
+            'page': section.page,
+            'content': section.content_text(),
+            'subsections': [],
+        }
+
+    root = node(section)
+    stack = [(section, root)]
+    while stack:
+        section, tree = stack.pop()
+        for subsection in section.subsections:
+            child = node(subsection)
+            tree['subsections'].append(child)
+            stack.append((subsection, child))
+    return root
+
+def process_bill(bill, directory, options, cache=False):
+    """
+      Parses `bill` and writes its outputs to `directory`; `options` are the
+      ones recorded in the manifest. Returns the number of pages and the time
+      taken. Runs in a worker process.
+    """
+    start = time.perf_counter()
+    cache = WordCache() if cache else None
+    document = Document.from_pdf(str(bill), lean=options['lean'], cache=cache)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    with open(directory / 'headings.txt', 'w') as file:
+        for root in document.sections:
+            for section in root.walk():
+                file.write(f"{'#' * section.tier} {section.heading_text()}\n")
+    with open(directory / 'sections.json', 'w') as file:
+        json.dump([section_tree(section) for section in document.sections], file, ensure_ascii=False, indent=1)
+        file.write("\n")
+    format = options['format']
+    with open(directory / f'text.{EXTENSIONS[format]}', 'w') as file:
+        render(document.sections, file, format=format)
+
+    # Written last: a bill interrupted before this point is parsed again.
+    manifest = directory / 'manifest.json'
+    partial = manifest.with_suffix('.partial')
+    partial.write_text(json.dumps(manifest_for(bill, options), indent=2) + "\n")
+    partial.replace(manifest)
+    return document.page_number, time.perf_counter() - start
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='bill-ai', description="Parse bills into sections.")
+    parser.add_argument('paths', nargs='+', metavar='PATH', help="a PDF or a directory of PDFs")
+    parser.add_argument('-o', '--output', default='output', help="output directory (default: %(default)s)")
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1, help="worker processes (default: %(default)s)")
+    parser.add_argument('--format', choices=RENDERERS, default='tagged', help="format of the rendered text (default: %(default)s)")
+    parser.add_argument('--lean', action='store_true', help="extract words without their chars")
+    parser.add_argument('--cache', action='store_true', help="reuse extracted words from the word cache")
+    parser.add_argument('--force', action='store_true', help="parse bills even if their outputs are up to date")
+    parser.add_argument('--quiet', action='store_true', help="report failures only")
+    arguments = parser.parse_args(argv)
+
+    def report(message):
+        if not arguments.quiet:
+            print(message, file=sys.stderr)
+
+    try:
+        bills = find_bills(arguments.paths)
+    except FileNotFoundError as error:
+        parser.error(str(error))
+    directories = {}
+    for bill in bills:
+        directory = bill_directory(arguments.output, bill)
+        if directory in directories:
+            parser.error(f"{bill} and {directories[directory]} would both be written to {directory}")
+        directories[directory] = bill
+
+    options = {'format': arguments.format, 'lean': arguments.lean}
+    pending = [
+        (bill, directory) for directory, bill in directories.items()
+        if arguments.force or not is_up_to_date(bill, directory, options)
+    ]
+    skipped = len(bills) - len(pending)
+    if skipped:
+        report(f"{skipped} of {len(bills)} bills up to date")
+
+    start = time.perf_counter()
+    pages = 0
+    failures = 0
+    for done, (bill, result, error) in enumerate(run(pending, options, arguments.cache, arguments.jobs), 1):
+        if error is not None:
+            failures += 1
+            print(f"[{done}/{len(pending)}] {bill}: failed: {error}", file=sys.stderr)
+            continue
+        bill_pages, elapsed = result
+        pages += bill_pages
+        report(f"[{done}/{len(pending)}] {bill}: {bill_pages} pages in {elapsed:.1f}s")
+
+    elapsed = time.perf_counter() - start
+    if pending:
+        parsed = len(pending) - failures
+        report(
+            f"{parsed} bills, {pages} pages in {elapsed:.1f}s "
+            f"({parsed / elapsed:.2f} bills/s, {pages / elapsed:.1f} pages/s)"
+        )
+    return 1 if failures else 0
+
+def run(pending, options, cache, jobs):
+    """
+      Processes the (bill, directory) pairs in `pending`, yielding (bill,
+      result, error) as each finishes. With one job, bills are processed in
+      this process.
+    """
+    if jobs <= 1 or len(pending) <= 1:
+        for bill, directory in pending:
+            try:
+                yield bill, process_bill(bill, directory, options, cache), None
+            except Exception as error:
+                yield bill, None, error
+        return
+
+    with ProcessPoolExecutor(max_workers=min(jobs, len(pending))) as pool:
+        futures = {pool.submit(process_bill, bill, directory, options, cache): bill for bill, directory in pending}
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result(), None
+            except Exception as error:
+                yield futures[future], None, error
+
+if __name__ == '__main__':
+    sys.exit(main())
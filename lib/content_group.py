@@ -3,6 +3,44 @@ import re
 from .casing import Casing
 import pdb
 
+def word_sizes(word):
+    """
+      Returns the (first, smallest, uniform) char sizes of `word`, reading
+      them from its chars when present and from its size summary otherwise.
+    """
+    if 'chars' in word:
+        chars = word['chars']
+        first = chars[0]['size']
+        smallest = first
+        uniform = True
+        for char in chars:
+            if char['size'] < smallest:
+                smallest = char['size']
+            if char['size'] != first:
+                uniform = False
+        return first, smallest, uniform
+    return word['size'], word['min_size'], word['uniform_size']
+
+def word_size_steps(word):
+    """
+      Returns the char sizes of `word` that are smaller than every char
+      before them, first char included. The first char of `word` smaller than
+      a given size is always one of these, so they answer that question
+      exactly without keeping every char size of a lean word.
+    """
+    if 'chars' in word:
+        steps = []
+        for char in word['chars']:
+            if not steps or char['size'] < steps[-1]:
+                steps.append(char['size'])
+        return tuple(steps)
+    return tuple(word['size_steps'])
+
+def word_char_text(word):
+    if 'chars' in word:
+        return ''.join(char['text'] for char in word['chars'])
+    return word['text']
+
 class ContentCharacteristics:
     TOLERANCE = 0.1
     FORBIDDEN_START_CHARS = "‘"
@@ -37,22 +75,39 @@ class ContentCharacteristics:
         return self.characteristics_match(other, accept_casing=[Casing.ALL_CAPS, Casing.UNKNOWN])
 
 class ContentGroup(ContentCharacteristics):
+    """
+      Classification features of a single word. Everything the heading logic
+      asks of a word is computed once here, so a word's `ContentGroup` can be
+      built when it enters the pipeline and reused from then on.
+    """
+    ACRONYM_REGEX = re.compile(r'([A-Z]\.)+')
+    NUMBER_REGEX = re.compile(r'^\d+$')
+    ENUMERATION_REGEXES = (
+        re.compile(r'^\(([a-zA-Z]|\d+)\)$'),
+        re.compile(r'^\([iIvVxXlLcCdDmM]+\)$'), # lowercase roman numerals
+        re.compile(r'^([a-zA-Z]|\d+)\.$'),
+    )
+
     def __init__(self, word, casing=None):
-        self.chars = word['chars']
-        self.text = ''.join(item['text'] for item in self.chars)
+        self.text = word_char_text(word)
+        self.has_lowercase = any(c in string.ascii_lowercase for c in self.text)
+        self._acronym = bool(self.ACRONYM_REGEX.fullmatch(self.text))
+        self._number = bool(self.NUMBER_REGEX.search(self.text))
+        self._enumeration = any(regex.search(self.text) for regex in self.ENUMERATION_REGEXES)
+        self._punctuation = len(self.text) == 1 and not self.text[0].isalnum()
+        size, _, uniform_size = word_sizes(word)
         if not casing:
-            if any(c in string.ascii_lowercase for c in self.text):
+            if self.has_lowercase:
                 casing = Casing.NORMAL
             elif any(c in string.digits for c in self.text):
                 casing = Casing.UNKNOWN
             elif self.is_acronym():
                 casing = Casing.UNKNOWN
-            elif all(c['size'] == self.chars[0]['size'] for c in self.chars):
+            elif uniform_size:
                 casing = Casing.ALL_CAPS
             else:
                 casing = Casing.SMALL_CAPS
         self.y_bottom = word['bottom']
-        size = self.chars[0]['size']
         super().__init__(word['fontname'], size, casing=casing)
 
 
@@ -66,20 +121,16 @@ class ContentGroup(ContentCharacteristics):
         return abs(self.y_bottom - other.y_bottom) < 2
 
     def is_acronym(self):
-        return bool(re.fullmatch(r'([A-Z]\.)+', self.text))
+        return self._acronym
 
     def is_number(self):
-        return bool(re.search(r'^\d+$', self.text))
+        return self._number
 
     def is_punctuation(self):
-        return len(self.text) == 1 and not self.text[0].isalnum()
+        return self._punctuation
 
     def starts_with_forbidden_punctuation(self):
         return self.text[0] in self.FORBIDDEN_START_CHARS
 
     def is_enumeration(self):
-        return (
-            bool(re.search(r'^\(([a-zA-Z]|\d+)\)$', self.text))
-            or bool(re.search(r'^\([iIvVxXlLcCdDmM]+\)$', self.text)) # lowercase roman numerals
-            or bool(re.search(r'^([a-zA-Z]|\d+)\.$', self.text))
-        )
+        return self._enumeration
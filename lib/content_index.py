@@ -0,0 +1,64 @@
+import sys
+from .casing import Casing
+from .content_descriptors import CONTENT_TYPES, HEADINGS, POSSIBLE_HEADINGS, IGNORABLE, CONTENT
+
+class ContentTypeIndex:
+    """
+      Hash index from a word's (font, size, casing) to every `ContentType` it
+      matches.
+
+      Descriptors are grouped by interned font name when the index is built,
+      so words in an unknown font resolve to nothing without any comparisons.
+      For known fonts, the matching types are computed once per exact size and
+      casing with `characteristics_match` itself and memoized, which keeps the
+      size tolerance and SMALL_CAPS rules exactly as they are. A bill only uses
+      a handful of distinct sizes, so the memo stays small.
+    """
+    NO_MATCHES = (frozenset(), frozenset())
+
+    def __init__(self, content_types):
+        self._by_font = {}
+        for content_type, characteristics in content_types.items():
+            self._by_font.setdefault(sys.intern(characteristics.font), []).append((content_type, characteristics))
+        self._matches = {}
+
+    def lookup(self, candidate):
+        """
+          Returns a pair of frozensets: the content types `candidate` matches
+          and those it matches when its casing may be unknown.
+        """
+        key = (candidate.font, candidate.size, candidate.casing)
+        try:
+            return self._matches[key]
+        except KeyError:
+            pass
+
+        descriptors = self._by_font.get(candidate.font)
+        if descriptors is None:
+            matches = self.NO_MATCHES
+        else:
+            matches = (
+                frozenset(t for t, c in descriptors if c.characteristics_match(candidate)),
+                frozenset(t for t, c in descriptors if c.characteristics_match(candidate, accept_casing=[Casing.UNKNOWN])),
+            )
+        self._matches[key] = matches
+        return matches
+
+    def matches(self, candidate):
+        return self.lookup(candidate)[0]
+
+    def matches_accepting_unknown_casing(self, candidate):
+        return self.lookup(candidate)[1]
+
+CONTENT_TYPE_INDEX = ContentTypeIndex(CONTENT_TYPES)
+HEADING_SET = frozenset(HEADINGS)
+POSSIBLE_HEADING_SET = frozenset(POSSIBLE_HEADINGS)
+IGNORABLE_SET = frozenset(IGNORABLE)
+CONTENT_SET = frozenset(CONTENT)
+# Casing must match for any descriptor to match a word, so when no heading
+# or ignorable descriptor is normal-cased, a lowercase word can never start a
+# heading or be ignored by font.
+NORMAL_CASING_NEVER_HEADS = all(
+    CONTENT_TYPES[content_type].casing != Casing.NORMAL
+    for content_type in HEADINGS + POSSIBLE_HEADINGS + IGNORABLE
+)
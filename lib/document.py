@@ -1,79 +1,548 @@
-from lib import HeadingAccumulator, Section
+import copy
+import difflib
+from collections import deque
+from lib import HeadingAccumulator, Section, ContentGroup
+from .section_tree import SectionTreeBuilder
+from .renderer import render
+from .extraction import extract_page_words, extract_pages, extract_page_range, open_pages
+from .page_record import PageRecord, heading_state, page_doctop, words_fingerprint
+from .checkpoint import Checkpoint, content_without_chars
+from .section_index import SectionIndex
+from .document_file import DocumentFile
+from .word_columns import WordColumns
+from .parse_stats import ParseStats
 import pdb
 
 class Document:
     LINE_SKIP_TOLERANCE = 2
 
-    def __init__(self):
+    def __init__(self, record_pages=False, text_index=None, name=None, stats=False, recorder=None):
         self.pages = []
-        self.sections = []
+        self.tree = SectionTreeBuilder()
+        self.sections = self.tree.sections
         self.current_content = ''
         self._line_skip = None
         self.current_heading = None
         self.current_content = []
         self.headings = []
+        self.page_width = None
+        # Number (1-based) of the page being parsed.
+        self.page_number = 0
+        # Number of words re-fed after a heading completed or was rejected,
+        # overall and for each page added.
+        self.retries = 0
+        self.page_retries = []
+        # Line-starting words rejected without building a heading
+        # accumulator, overall and for each page added.
+        self.fast_path_words = 0
+        self.page_fast_path_words = []
+        # With `record_pages`, a `PageRecord` for every page added, which lets
+        # `update` reuse this parse for a later version of the bill.
+        self.page_records = [] if record_pages else None
+        self.replayed_pages = 0
+        # With `stats`, a `ParseStats` of the heading logic.
+        self.stats = ParseStats() if stats else None
+        # A `TokenStreamWriter` every page's words are written to as they are
+        # parsed.
+        self.recorder = recorder
+        # A `TextIndex` fed each section's heading and content, under `name`,
+        # as the tree is built.
+        self.text_index = text_index
+        self.name = name
+        self.section_count = 0
+        # The last section added, which is indexed once its content is final.
+        self._unindexed_section = None
+        self._events = None
+        # Whether `current_heading` belongs to a `PageRecord` and has to be
+        # copied before more words are added to it.
+        self._borrowed_heading = False
+        # The `Checkpoint` a document created by `resume` was resumed from,
+        # until `prepend` adds what was parsed before it.
+        self.resumed_from = None
 
-    def add_page(self, page):
+    @classmethod
+    def from_pdf(cls, path, *, jobs=1, cache=None, columnar=False, lean=False, record_pages=False, previous=None, text_index=None, name=None, stats=False, recorder=None):
+        """
+          Builds a document from the PDF at `path`. With `jobs` greater than one
+          the word extraction runs in a process pool; the words are still fed
+          through the heading logic in page order, so the resulting sections and
+          headings are identical to a serial run. Pages are not retained.
+
+          Pass a `WordCache` to reuse the words extracted by a previous run.
+          With `columnar`, each page's words are converted to `WordColumns`
+          before parsing, so per-word dicts and their chars are not retained.
+          With `lean`, words are extracted without their chars (see
+          `extract_page_words`).
+
+          With `record_pages`, pages are fingerprinted by their raw content and
+          recorded so the document can be passed as `previous` when parsing a
+          later version of the same bill. With `previous`, only the pages that
+          changed since then (and pages after them whose parse state differs)
+          are extracted and parsed; see `update`. `jobs` and `cache` apply to
+          full parses only.
+
+          With a `TextIndex`, sections are indexed under `name` as they are
+          built. With `stats`, the document collects `ParseStats`. With a
+          `TokenStreamWriter` as `recorder`, the words parsed are recorded to
+          it; pages replayed by `update` are not.
+        """
+        if previous is not None:
+            with open_pages(path, lean=lean) as (fingerprints, doctops, load):
+                if columnar:
+                    load = cls._columnar_loader(load)
+                return cls.update(previous, fingerprints, load, doctops, text_index=text_index, name=name, stats=stats)
+
+        if record_pages:
+            document = cls(record_pages=True, text_index=text_index, name=name, stats=stats, recorder=recorder)
+            with open_pages(path, lean=lean) as (fingerprints, _, load):
+                for index, fingerprint in enumerate(fingerprints):
+                    width, words = load(index)
+                    if columnar:
+                        words = WordColumns.from_words(words)
+                    document.add_words(words, width=width, fingerprint=fingerprint)
+            document.flush_text_index()
+            return document
+
+        document = cls(text_index=text_index, name=name, stats=stats, recorder=recorder)
+        for width, words in extract_pages(path, jobs=jobs, cache=cache, lean=lean):
+            if columnar:
+                words = WordColumns.from_words(words)
+            document.add_words(words, width=width)
+        document.flush_text_index()
+        return document
+
+    @staticmethod
+    def _columnar_loader(load):
+        def load_columns(index):
+            width, words = load(index)
+            return width, WordColumns.from_words(words)
+        return load_columns
+
+    @classmethod
+    def update(cls, previous, fingerprints, load_page, doctops=None, text_index=None, name=None, stats=False):
+        """
+          Parses a new version of the document `previous` was parsed from.
+          `fingerprints` holds one fingerprint per page of the new version and
+          `load_page(index)` returns the (width, words) of a page. `doctops`,
+          the `doctop` of the top of every page, lets the words of replayed
+          pages be moved to where their page now is.
+
+          Pages are matched to the pages of `previous` by fingerprint. A
+          matched page whose starting parse state (the open heading
+          accumulator) equals the one it had in `previous` is replayed from its
+          `PageRecord` without loading its words; every other page is loaded
+          and parsed. Parsing resynchronizes as soon as the state carried out
+          of a changed region matches the old one again, so an amendment costs
+          the changed pages and, at most, the few pages a heading spans past
+          them. The result, which records its pages too, is identical to a full
+          parse of the new version. `text_index`, `name` and `stats` are
+          passed to the new document.
+        """
+        if previous.page_records is None:
+            raise ValueError("previous document was not parsed with record_pages")
+
+        records = previous.page_records
+        matcher = difflib.SequenceMatcher(
+            None, [record.fingerprint for record in records], fingerprints, autojunk=False
+        )
+        matches = {}
+        for old, new, size in matcher.get_matching_blocks():
+            for offset in range(size):
+                matches[new + offset] = old + offset
+
+        document = cls(record_pages=True, text_index=text_index, name=name, stats=stats)
+        for index, fingerprint in enumerate(fingerprints):
+            old = matches.get(index)
+            if old is not None and records[old].start_state == heading_state(document.current_heading):
+                document.replay_page(records[old], None if doctops is None else doctops[index])
+            else:
+                width, words = load_page(index)
+                document.add_words(words, width=width, fingerprint=fingerprint)
+        document.flush_text_index()
+        return document
+
+    def checkpoint(self):
+        """
+          Returns a `Checkpoint` of the parse state. Call it between pages.
+        """
+        return Checkpoint(
+            page_number=self.page_number,
+            open_sections=[
+                (section.heading, section.tier, section.page, section.ordinal,
+                 content_without_chars(section.content))
+                for section in self.tree.open_sections
+            ],
+            heading=copy.deepcopy(self.current_heading),
+            line_skip=self._line_skip,
+            content=content_without_chars(self.current_content),
+            section_count=self.section_count,
+            heading_count=len(self.headings),
+            retries=self.retries,
+            page_retries=list(self.page_retries),
+            fast_path_words=self.fast_path_words,
+            page_fast_path_words=list(self.page_fast_path_words),
+        )
+
+    @classmethod
+    def resume(cls, checkpoint, **options):
+        """
+          Creates a document in the state saved in `checkpoint`, ready for the
+          words of page `checkpoint.page_number` (0-based). `options` are
+          passed to the constructor.
+
+          The document's `sections` start with the sections still open at the
+          checkpoint, without the subsections they had closed, and its
+          `headings` with the first one parsed after it, so a resumed run
+          yields only what follows the checkpoint. Use `prepend` to complete
+          it.
+        """
+        document = cls(**options)
+        for heading, tier, page, ordinal, content in checkpoint.open_sections:
+            section = Section(heading, tier=tier, content=None if content is None else list(content))
+            section.page = page
+            section.ordinal = ordinal
+            document.tree.add(section)
+        if document.text_index is not None:
+            document._unindexed_section = document.tree.last_section()
+        document.current_heading = copy.deepcopy(checkpoint.heading)
+        document._line_skip = checkpoint.line_skip
+        document.current_content = list(checkpoint.content)
+        document.page_number = checkpoint.page_number
+        document.section_count = checkpoint.section_count
+        document.retries = checkpoint.retries
+        document.page_retries = list(checkpoint.page_retries)
+        document.fast_path_words = checkpoint.fast_path_words
+        document.page_fast_path_words = list(checkpoint.page_fast_path_words)
+        document.resumed_from = checkpoint
+        return document
+
+    def prepend(self, earlier):
+        """
+          Completes a document created by `resume` with what `earlier`, a
+          parse of the same bill up to the checkpoint it was resumed from,
+          held before the checkpoint: the sections closed by then, which are
+          moved into this document's tree, and their headings. The document
+          ends up as an uninterrupted parse would have.
+        """
+        checkpoint = self.resumed_from
+        if checkpoint is None:
+            raise ValueError("only a resumed document can be prepended to")
+
+        ordinals = [ordinal for _, _, _, ordinal, _ in checkpoint.open_sections]
+        parent = earlier_parent = None
+        # Down the open sections, put the siblings each had before it in
+        # front of the one rebuilt from the checkpoint.
+        for ordinal in ordinals or [checkpoint.section_count]:
+            earlier_siblings = earlier.sections if earlier_parent is None else earlier_parent.subsections
+            closed = [section for section in earlier_siblings if section.ordinal < ordinal]
+            if parent is None:
+                self.sections[:0] = closed
+                siblings = self.sections
+            else:
+                parent.subsections = closed + parent.subsections
+                siblings = parent.subsections
+            if ordinals:
+                parent, earlier_parent = siblings[len(closed)], earlier_siblings[len(closed)]
+        self.headings[:0] = earlier.headings[:checkpoint.heading_count]
+        self.resumed_from = None
+        return self
+
+    @classmethod
+    def from_pdf_range(cls, path, *, start=None, stop=None, checkpoint_every=None, on_checkpoint=None, lean=False, **options):
+        """
+          Parses the pages of `path` from the `Checkpoint` `start` (or the first
+          page) up to, not including, page index `stop` (or the end). With
+          `checkpoint_every` and `on_checkpoint`, a checkpoint is passed to
+          `on_checkpoint` after every `checkpoint_every` pages, so a long run
+          can be resumed after a crash from the last one saved.
+        """
+        if checkpoint_every and on_checkpoint is None:
+            raise ValueError("checkpoint_every needs on_checkpoint")
+        document = cls(**options) if start is None else cls.resume(start, **options)
+        for width, words in extract_page_range(path, document.page_number, stop, lean=lean):
+            document.add_words(words, width=width)
+            if checkpoint_every and document.page_number % checkpoint_every == 0:
+                on_checkpoint(document.checkpoint())
+        document.flush_text_index()
+        return document
+
+    def replay_page(self, record, doctop=None):
+        """
+          Applies a page parsed earlier, as recorded in `record`, without
+          parsing its words. The document must be in the state the page was
+          originally parsed from. `doctop` is where the top of the page now
+          is in the bill, if pages before it were inserted or removed; the
+          words replayed are moved there (see `PageRecord.moved`).
+        """
+        carried = [] if self.current_heading is None else self.current_heading.words
+        record = record.moved(doctop, carried)
         self._line_skip = None
-        self.current_page = page
-        all_words = page.extract_words(extra_attrs=['fontname'], return_chars=True, split_at_punctuation="—")
+        self.page_number += 1
+        self.page_width = record.width
+        self.page_retries.append(record.retries)
+        self.retries += record.retries
+        self.page_fast_path_words.append(record.fast_path_words)
+        self.fast_path_words += record.fast_path_words
+        if self.stats is not None:
+            self.stats.start_page()
 
-        for word in all_words:
-            self.add_token(word)
+        events = self._events
+        self._events = None
+        for kind, value in record.events:
+            if kind == PageRecord.CONTENT:
+                self._append_content(value)
+            else:
+                self._attach_heading(value)
+        self._events = events
 
+        self.current_heading = record.end_heading
+        self._borrowed_heading = True
+        self.replayed_pages += 1
+        if self.page_records is not None:
+            self.page_records.append(record)
+
+    def add_page(self, page):
+        self.current_page = page
+        self.add_words(extract_page_words(page), width=page.width)
         self.pages.append(page)
         return True
 
-    def add_token(self, token):
+    def iter_sections(self, pdf, lean=False):
+        """
+          Streams the top-level sections of `pdf`. A section is yielded once the
+          page holding the heading that closes it has been consumed, and is then
+          dropped from `sections`. Pages are closed as soon as their words are
+          extracted and are not retained, so memory stays bounded by the open
+          section rather than by the size of the bill.
+        """
+        for page in pdf.pages:
+            words = extract_page_words(page, lean=lean)
+            width = page.width
+            page.close()
+            yield from self.add_words_streaming(words, width=width)
+
+        yield from self.drain_sections()
+
+    def add_words_streaming(self, words, *, width):
+        """
+          Parses the words of the next page and returns the top-level sections
+          it closed, removing them from `sections`. Only the most recent
+          heading is kept in `headings`, as it is the only one consulted while
+          parsing.
+        """
+        self.add_words(words, width=width)
+        del self.headings[:-1]
+        closed = []
+        while len(self.sections) > 1:
+            closed.append(self.sections.pop(0))
+        return closed
+
+    def drain_sections(self):
+        """
+          Returns and removes the sections still open at the end of a
+          document parsed with `add_words_streaming`, after indexing the last
+          one.
+        """
+        self.flush_text_index()
+        sections = list(self.sections)
+        del self.sections[:]
+        return sections
+
+    def add_words(self, words, *, width, fingerprint=None):
+        """
+          Parses the words of the next page. When pages are recorded, the page
+          is recorded under `fingerprint`, which defaults to a hash of its
+          words.
+        """
+        self._line_skip = None
+        self.page_number += 1
+        self.page_width = width
+        self.page_retries.append(0)
+        self.page_fast_path_words.append(0)
+        if self.stats is not None:
+            self.stats.start_page()
+        if self.recorder is not None:
+            self.recorder.add_page(words, width=width)
+
+        if self._borrowed_heading:
+            self.current_heading = copy.deepcopy(self.current_heading)
+            self._borrowed_heading = False
+
+        record = None
+        if self.page_records is not None:
+            if fingerprint is None:
+                fingerprint = words_fingerprint(words, width)
+            record = PageRecord(fingerprint, width, heading_state(self.current_heading), page_doctop(words))
+            self._events = record.events
+
+        for word in words:
+            self.add_token(word)
+
+        if record is not None:
+            self._events = None
+            record.finish(self.current_heading, self.page_retries[-1], self.page_fast_path_words[-1])
+            self.page_records.append(record)
+
+    def add_token(self, token, candidate=None):
+        """
+          Feeds a token through the heading logic. Completing or rejecting a
+          heading means re-feeding words: any subheading words the finished
+          heading accumulated, then the token itself. Those retries go through
+          an explicit queue, front-loaded so they are processed in the same
+          depth-first order as a recursive re-feed would.
+
+          Returns the outcome of the final processing of `token`.
+        """
+        result, retries = self._process_token(token, candidate)
+        if not retries:
+            return result
+
+        queue = deque()
+        while True:
+            if retries:
+                self.retries += len(retries)
+                if self.page_retries:
+                    self.page_retries[-1] += len(retries)
+                queue.extendleft(reversed(retries))
+            if not queue:
+                return result
+            result, retries = self._process_token(*queue.popleft())
+
+    def _process_token(self, token, candidate):
+        """
+          Processes a single token. Returns a pair of the outcome and the
+          (word, candidate) pairs that must be re-fed before anything else.
+        """
         if self._line_skip:
             if abs(token['bottom'] - self._line_skip) < Document.LINE_SKIP_TOLERANCE:
-                self.current_content.append(token)
-                return False
+                self._append_content(token)
+                return False, None
             else:
                 self._line_skip = None
 
+        heading = self.current_heading
+        if (heading is None or heading.is_empty()) and HeadingAccumulator.rejects_as_first_word(token):
+            # Fast path for ordinary lines of body text: the accumulator would
+            # reject the word without keeping it, so skip building one.
+            self.fast_path_words += 1
+            if self.page_fast_path_words:
+                self.page_fast_path_words[-1] += 1
+            if heading is not None and self.stats is not None:
+                self.stats.discarded(heading)
+            self.current_heading = None
+            self._line_skip = token['bottom']
+            return False, None
+
+        # Built once per token and reused by every accumulator it is fed to.
+        if candidate is None:
+            candidate = ContentGroup(token)
+
         if self.current_heading is None:
-            self.current_heading = HeadingAccumulator(width=self.current_page.width)
+            self.current_heading = HeadingAccumulator(width=self.page_width)
+            if self.stats is not None:
+                self.stats.created()
 
-        if self.current_heading.add(token):
-            return True
+        if self.stats is None:
+            added = self.current_heading.add(token, candidate)
+        else:
+            added = self.stats.add(self.current_heading, token, candidate)
+        if added:
+            return True, None
 
         if self.current_heading.is_heading_complete():
-            self.headings.append(self.current_heading)
-            tier = self.current_heading.tier
-            if len(self.sections) == 0:
-                self.sections.append(
-                    Section(self.current_heading, tier=tier)
-                )
-            else:
-                last_subsection = self.sections[-1].last_subsection()
-                last_subsection.content = self.current_content
-                self.current_content = []
-                if tier is not None:
-                    new_section = Section(self.current_heading, tier=tier)
-                    if not self.sections[-1].add_subsection(new_section):
-                        self.sections.append(new_section)
-                else:
-                    # Not clear that this path is ever taken.
-                    last_subsection.content.append(self.current_heading.words)
-
+            heading = self.current_heading
+            self._attach_heading(heading)
             self.current_heading = None
+            if self.stats is not None:
+                self.stats.discarded(heading)
 
-            for word in self.headings[-1].accumulated_subheading_words():
-                self.add_token(word) # Retry any subheading words that were accumulated.
-            return self.add_token(token) # Retry current word with new heading accumulator
+            # Retry any subheading words that were accumulated, then the
+            # current word with a new heading accumulator.
+            retries = list(zip(heading.accumulated_subheading_words(), heading.accumulated_subheading_groups()))
+            retries.append((token, candidate))
+            return False, retries
 
         if self.current_heading.is_not_heading():
+            if self.stats is not None:
+                self.stats.discarded(self.current_heading)
             if len(self.current_heading.words) > 0:
                 self._line_skip = self.current_heading.words[-1]['bottom']
-                self.current_content.append(self.current_heading.words)
+                self._append_content(self.current_heading.words)
                 self.current_heading = None
-                return self.add_token(token)
+                return False, [(token, candidate)]
             self.current_heading = None
             self._line_skip = token['bottom']
-            return False
+            return False, None
+
+        return False, None # Token was something that should be ignored
+
+    def _append_content(self, item):
+        self.current_content.append(item)
+        if self._events is not None:
+            self._events.append((PageRecord.CONTENT, item))
+
+    def _attach_heading(self, heading):
+        self.headings.append(heading)
+        tier = heading.tier
+        if len(self.sections) == 0:
+            self.tree.add(
+                self._section_for(heading, tier)
+            )
+        else:
+            last_subsection = self.tree.last_section()
+            last_subsection.content = self.current_content
+            self.current_content = []
+            if tier is not None:
+                self.tree.add(self._section_for(heading, tier))
+            else:
+                # Not clear that this path is ever taken.
+                last_subsection.content.append(heading.words)
+                last_subsection.invalidate()
+
+        if self._events is not None:
+            self._events.append((PageRecord.HEADING, heading))
+
+    def _section_for(self, heading, tier):
+        section = Section(heading, tier=tier)
+        section.page = self.page_number
+        section.ordinal = self.section_count
+        self.section_count += 1
+        if self.text_index is not None:
+            # Content is only ever assigned to the last section, so adding a
+            # section fixes the content of the one before.
+            self.flush_text_index()
+            self._unindexed_section = section
+        return section
+
+    def flush_text_index(self):
+        """
+          Indexes the last section in `text_index`. Sections are indexed as
+          the sections following them are added; `from_pdf`, `update` and
+          `iter_sections` call this at the end of the document.
+        """
+        section = self._unindexed_section
+        if section is not None:
+            self.text_index.add_text(self.name, section.ordinal, section.heading_text())
+            self.text_index.add_text(self.name, section.ordinal, section.content_text())
+            self._unindexed_section = None
+
+    def save_index(self, path, name):
+        """
+          Stores the section tree under `name` in the `SectionIndex` database
+          at `path` and returns the document's id there.
+        """
+        with SectionIndex(path) as index:
+            return index.add_document(name, self.sections, page_count=self.page_number)
+
+    def save(self, path):
+        """
+          Writes the section tree to `path` in the binary format read by
+          `DocumentFile`.
+        """
+        DocumentFile.write(path, self.sections, page_count=self.page_number)
 
-        return False # Token was something that should be ignored
+    def render(self, sink, format='tagged'):
+        render(self.sections, sink, format=format)
 
     def print_headings(self):
         for section in self.sections:
@@ -0,0 +1,242 @@
+import io
+import mmap
+import struct
+from .renderer import TaggedRenderer, render
+
+class SectionView:
+    """
+      A read-only, `Section`-like view of one section of a `DocumentFile`.
+      Nothing is decoded until it is asked for, and subsections are views
+      created on access. Works with the renderers, `walk` and `text` like a
+      `Section`, with its content as a single string.
+    """
+    def __init__(self, file, ordinal):
+        self.file = file
+        self.ordinal = ordinal
+        (self.tier, parent, self.last_ordinal, self._heading_offset, self._heading_length,
+         self._content_offset, self._content_length, page) = file._record(ordinal)
+        self._parent = None if parent < 0 else parent
+        self.page = None if page < 0 else page
+
+    def __repr__(self):
+        return f'SectionView(ordinal={self.ordinal}, tier={self.tier}, heading={self.heading_text()!r})'
+
+    @property
+    def parent(self):
+        return None if self._parent is None else SectionView(self.file, self._parent)
+
+    @property
+    def subsections(self):
+        return [SectionView(self.file, ordinal) for ordinal in self.file._children(self.ordinal, self.last_ordinal)]
+
+    @property
+    def heading(self):
+        return self.heading_text()
+
+    @property
+    def content(self):
+        return self.content_text()
+
+    def heading_bytes(self):
+        return self.file._string(self._heading_offset, self._heading_length)
+
+    def heading_text(self):
+        return str(self.heading_bytes(), 'utf-8')
+
+    def content_bytes(self):
+        """
+          The UTF-8 encoded content, as a `memoryview` of the mapped file.
+        """
+        return self.file._text(self._content_offset, self._content_length)
+
+    def content_text(self):
+        return str(self.content_bytes(), 'utf-8')
+
+    def content_chunks(self):
+        if self._content_length:
+            yield self.content_text()
+
+    def walk(self):
+        for ordinal in range(self.ordinal, self.last_ordinal + 1):
+            yield SectionView(self.file, ordinal)
+
+    def text(self):
+        sink = io.StringIO()
+        TaggedRenderer(sink).render([self])
+        return sink.getvalue()
+
+class DocumentFile:
+    """
+      A parsed document in a compact binary format, read through `mmap`.
+
+      The file is a header, a table of fixed-size section records in document
+      order, a table of section ordinals sorted by heading, a string table of
+      UTF-8 headings and one UTF-8 text blob holding every section's content.
+      Opening a file reads only the header; sections are `SectionView`s over
+      the mapping and headings and content are `memoryview` slices of it.
+      `find` binary searches the sorted heading table.
+    """
+    MAGIC = b'BILLDOC\0'
+    VERSION = 1
+    # magic, version, section count, page count (-1 if unknown), offsets of
+    # the sorted heading table, the string table and the text blob.
+    HEADER = struct.Struct('<8sIIiQQQ')
+    # tier, parent ordinal (-1 for none), ordinal of the last descendant,
+    # heading offset and length, content offset and length, page (-1 for none).
+    RECORD = struct.Struct('<iiIIIQQi')
+    ORDINAL = struct.Struct('<I')
+
+    def __init__(self, path):
+        with open(path, 'rb') as file:
+            try:
+                self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty files cannot be mapped.
+                raise ValueError(f"{path} is not a document file") from None
+        self._buffer = memoryview(self._mmap)
+        if len(self._mmap) < self.HEADER.size:
+            self.close()
+            raise ValueError(f"{path} is not a document file")
+        magic, version, self.section_count, page_count, self._sorted_offset, self._strings_offset, self._text_offset = (
+            self.HEADER.unpack_from(self._buffer, 0)
+        )
+        if magic != self.MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a document file")
+        if version != self.VERSION:
+            self.close()
+            raise ValueError(f"unsupported document file version {version}, expected {self.VERSION}")
+        self.page_count = None if page_count < 0 else page_count
+
+    @classmethod
+    def open(cls, path):
+        return cls(path)
+
+    def close(self):
+        """
+          Unmaps the file. Any `memoryview` obtained from a view must have been
+          released first.
+        """
+        self._buffer.release()
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self.section_count
+
+    @classmethod
+    def write(cls, path, sections, page_count=None):
+        """
+          Writes the section forest `sections` to `path`.
+        """
+        records = []
+        headings = []
+        strings = bytearray()
+        string_offsets = {}
+        text = bytearray()
+        open_ordinals = []
+        stack = [(section, -1) for section in reversed(sections)]
+        while stack:
+            section, parent = stack.pop()
+            ordinal = len(records)
+            while open_ordinals and open_ordinals[-1] != parent:
+                records[open_ordinals.pop()][2] = ordinal - 1
+
+            heading = section.heading_text().encode('utf-8')
+            if heading not in string_offsets:
+                string_offsets[heading] = len(strings)
+                strings += heading
+            content = section.content_text().encode('utf-8')
+            page = getattr(section, 'page', None)
+            records.append([
+                section.tier, parent, ordinal, string_offsets[heading], len(heading),
+                len(text), len(content), -1 if page is None else page,
+            ])
+            headings.append(heading)
+            text += content
+            open_ordinals.append(ordinal)
+            stack.extend((subsection, ordinal) for subsection in reversed(section.subsections))
+        for ordinal in open_ordinals:
+            records[ordinal][2] = len(records) - 1
+
+        sorted_offset = cls.HEADER.size + cls.RECORD.size * len(records)
+        strings_offset = sorted_offset + cls.ORDINAL.size * len(records)
+        text_offset = strings_offset + len(strings)
+        with open(path, 'wb') as file:
+            file.write(cls.HEADER.pack(
+                cls.MAGIC, cls.VERSION, len(records), -1 if page_count is None else page_count,
+                sorted_offset, strings_offset, text_offset,
+            ))
+            for record in records:
+                file.write(cls.RECORD.pack(*record))
+            for ordinal in sorted(range(len(records)), key=lambda ordinal: (headings[ordinal], ordinal)):
+                file.write(cls.ORDINAL.pack(ordinal))
+            file.write(strings)
+            file.write(text)
+
+    def _record(self, ordinal):
+        if not 0 <= ordinal < self.section_count:
+            raise IndexError(ordinal)
+        return self.RECORD.unpack_from(self._buffer, self.HEADER.size + self.RECORD.size * ordinal)
+
+    def _last_ordinal(self, ordinal):
+        return self._record(ordinal)[2]
+
+    def _children(self, ordinal, last_ordinal):
+        child = ordinal + 1
+        while child <= last_ordinal:
+            yield child
+            child = self._last_ordinal(child) + 1
+
+    def _string(self, offset, length):
+        start = self._strings_offset + offset
+        return self._buffer[start:start + length]
+
+    def _text(self, offset, length):
+        start = self._text_offset + offset
+        return self._buffer[start:start + length]
+
+    def section(self, ordinal):
+        return SectionView(self, ordinal)
+
+    @property
+    def sections(self):
+        """
+          Views of the top-level sections.
+        """
+        if not self.section_count:
+            return []
+        return [SectionView(self, ordinal) for ordinal in self._children(-1, self.section_count - 1)]
+
+    def _sorted_ordinal(self, index):
+        return self.ORDINAL.unpack_from(self._buffer, self._sorted_offset + self.ORDINAL.size * index)[0]
+
+    def _heading_at(self, index):
+        record = self._record(self._sorted_ordinal(index))
+        return self._string(record[3], record[4])
+
+    def find(self, heading):
+        """
+          Views of the sections headed exactly `heading`, in document order.
+        """
+        key = heading.encode('utf-8')
+        low, high = 0, self.section_count
+        while low < high:
+            middle = (low + high) // 2
+            if bytes(self._heading_at(middle)) < key:
+                low = middle + 1
+            else:
+                high = middle
+        views = []
+        while low < self.section_count and self._heading_at(low) == key:
+            views.append(SectionView(self, self._sorted_ordinal(low)))
+            low += 1
+        return views
+
+    def render(self, sink, format='tagged'):
+        render(self.sections, sink, format=format)
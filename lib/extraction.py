@@ -0,0 +1,179 @@
+import hashlib
+import math
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+import pdfplumber
+from pdfminer.pdftypes import PDFObjRef, PDFStream, resolve1
+from .content_group import word_sizes, word_size_steps
+
+EXTRACT_WORDS_OPTIONS = {
+    'extra_attrs': ['fontname'],
+    'return_chars': True,
+    'split_at_punctuation': "—",
+}
+
+def extract_page_words(page, lean=False):
+    """
+      Extracts the words of `page` the way the parser expects them. In lean
+      mode each word's chars are replaced by the only things the parser reads
+      from them: the first char's `size`, the `min_size`, whether all chars
+      share a size (`uniform_size`) and the `size_steps` (see
+      `word_size_steps`).
+    """
+    words = page.extract_words(**EXTRACT_WORDS_OPTIONS)
+    if lean:
+        for word in words:
+            word['size'], word['min_size'], word['uniform_size'] = word_sizes(word)
+            word['size_steps'] = word_size_steps(word)
+            del word['chars']
+    return words
+
+def page_count(path):
+    with pdfplumber.open(path) as pdf:
+        return len(pdf.pages)
+
+def extract_pages(path, jobs=1, cache=None, lean=False):
+    """
+      Yields a (width, words) pair for every page of the PDF at `path`, in
+      page order.
+
+      With `jobs` greater than one, pages are split into contiguous runs that
+      are extracted by a process pool. Results are still yielded in page
+      order, so feeding them to `Document.add_words` gives the same result as
+      a serial run.
+
+      With a `WordCache`, pages already in the cache are read from it and only
+      the missing pages are extracted (and then stored). When every page is
+      cached, the PDF is never opened.
+
+      See `extract_page_words` for `lean`.
+    """
+    if cache is None:
+        for _, width, words in _extract_indexes(path, None, jobs, lean):
+            yield width, words
+        return
+
+    key = cache.key(path, lean=lean)
+    count = cache.page_count(key)
+    if count is None:
+        count = page_count(path)
+        cache.put_page_count(key, count)
+
+    missing = cache.missing(key, count)
+    extracted = _extract_indexes(path, missing, jobs, lean) if missing else iter(())
+    missing = set(missing)
+    for index in range(count):
+        if index in missing:
+            _, width, words = next(extracted)
+            cache.put(key, index, width, words)
+        else:
+            width, words = cache.get(key, index)
+        yield width, words
+
+def extract_page_range(path, start, stop=None, lean=False):
+    """
+      Yields a (width, words) pair for the pages of `path` with indexes from
+      `start` up to, not including, `stop` (the last page by default).
+    """
+    if stop is None:
+        stop = page_count(path)
+    for _, width, words in _extract_page_range(path, range(start, stop), lean):
+        yield width, words
+
+def _extract_indexes(path, indexes, jobs, lean):
+    if jobs <= 1:
+        yield from _extract_page_range(path, indexes, lean)
+        return
+
+    if indexes is None:
+        indexes = range(page_count(path))
+    run_length = max(1, math.ceil(len(indexes) / (jobs * 4)))
+    runs = [indexes[start:start + run_length] for start in range(0, len(indexes), run_length)]
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        for results in executor.map(_extract_page_list, [path] * len(runs), runs, [lean] * len(runs)):
+            yield from results
+
+def _extract_page_range(path, indexes, lean):
+    # Every worker opens the whole PDF, rather than passing `pages=` to
+    # pdfplumber, so that `doctop` keeps accounting for the preceding pages.
+    with pdfplumber.open(path) as pdf:
+        if indexes is None:
+            indexes = range(len(pdf.pages))
+        for index in indexes:
+            page = pdf.pages[index]
+            yield index, page.width, extract_page_words(page, lean=lean)
+            page.close()
+
+def _extract_page_list(path, indexes, lean):
+    return list(_extract_page_range(path, indexes, lean))
+
+def page_fingerprint(page):
+    """
+      Hash of the raw content of a pdfplumber `page`: its geometry, content
+      streams and resources, i.e. its fonts, with their descriptors, encodings
+      and embedded font files, and its XObjects, with the resources of form
+      XObjects in turn. Pages with the same fingerprint yield the same words,
+      but computing it does not run layout analysis, so it is orders of
+      magnitude cheaper than `extract_page_words`.
+    """
+    page_obj = page.page_obj
+    digest = hashlib.sha256()
+    digest.update(repr((page_obj.mediabox, page_obj.cropbox, page_obj.rotate)).encode())
+    for stream in page_obj.contents:
+        digest.update(resolve1(stream).get_data())
+
+    resources = resolve1(page_obj.resources) or {}
+    seen = {}
+    for key in ('Font', 'XObject'):
+        _hash_object(digest, resolve1(resources.get(key)) or {}, seen)
+    return digest.hexdigest()
+
+def _hash_object(digest, obj, seen):
+    """
+      Feeds `obj` to `digest`, following references. An object reached a
+      second time is hashed as the order in which it was first reached, not
+      its object number, so renumbering the objects of a PDF leaves the hash
+      as it was, and reference cycles end.
+    """
+    if isinstance(obj, PDFObjRef):
+        if obj.objid in seen:
+            digest.update(f'<ref {seen[obj.objid]}>'.encode())
+            return
+        seen[obj.objid] = len(seen)
+        obj = obj.resolve()
+    if isinstance(obj, PDFStream):
+        _hash_object(digest, obj.attrs, seen)
+        digest.update(obj.get_data())
+    elif isinstance(obj, dict):
+        digest.update(b'<<')
+        for key, value in sorted(obj.items()):
+            digest.update(repr(key).encode())
+            _hash_object(digest, value, seen)
+        digest.update(b'>>')
+    elif isinstance(obj, list):
+        digest.update(b'[')
+        for value in obj:
+            _hash_object(digest, value, seen)
+        digest.update(b']')
+    else:
+        digest.update(repr(obj).encode())
+
+@contextmanager
+def open_pages(path, lean=False):
+    """
+      Opens the PDF at `path` for incremental parsing. Yields the fingerprint
+      of every page (see `page_fingerprint`), the `doctop` of the top of
+      every page and a function that extracts the (width, words) of the page
+      at an index.
+    """
+    with pdfplumber.open(path) as pdf:
+        fingerprints = [page_fingerprint(page) for page in pdf.pages]
+        doctops = [page.initial_doctop for page in pdf.pages]
+
+        def load(index):
+            page = pdf.pages[index]
+            words = extract_page_words(page, lean=lean)
+            page.close()
+            return page.width, words
+
+        yield fingerprints, doctops, load
@@ -4,8 +4,9 @@ import string
 from enum import Enum
 from .content_type import ContentType
 from .casing import Casing
-from .content_group import ContentGroup
+from .content_group import ContentGroup, word_sizes, word_size_steps, word_char_text
 from .content_descriptors import CONTENT_TYPES, HEADINGS, POSSIBLE_HEADINGS, IGNORABLE, CONTENT, HEADING_HIERARCHY
+from .content_index import CONTENT_TYPE_INDEX, HEADING_SET, POSSIBLE_HEADING_SET, IGNORABLE_SET, CONTENT_SET, NORMAL_CASING_NEVER_HEADS
 
 # TODO:Fix duplicative parenthetical, e.g., ECONOMIC DEVELOPMENT ASSISTANCE PROGRAMS (INCLUDING (INCLUDING TRANSFERS OF FUNDS)
 class HeadingAccumulator:
@@ -19,13 +20,42 @@ class HeadingAccumulator:
 
     FILE_PATH_REGEX = re.compile(r'^[A-Za-z]:\\(?:[^\\/:*?"<>|\r\n]+\\)*[^\\/:*?"<>|\r\n]*$')
     POSITION_TOLERANCE = 5.0
+    # `last_case` of a word ignored before reaching any of the cases.
+    IGNORED_CASE = 0
 
     def __init__(self, *, width):
         self.words = []
+        # Classification features of each accumulated word, parallel to `words`.
+        self.groups = []
         self.width = width
         self.status = self.Status.UNDETERMINED
         self.casing = Casing.UNKNOWN
         self.index_of_suspect_heading_word = None
+        # The case of `add` that handled the last word (see `ParseStats`).
+        self.last_case = None
+
+    @classmethod
+    def rejects_as_first_word(cls, word):
+        """
+          Whether `word`, added to an empty accumulator, certainly makes it
+          NOT_HEADING without accumulating anything (Cases 4, 7, 8 and 11): a
+          word with lowercase letters that is neither an enumeration nor a file
+          path. Lets callers skip building an accumulator for ordinary lines of
+          body text.
+        """
+        if not NORMAL_CASING_NEVER_HEADS:
+            # A normal-cased descriptor was added for headings or ignorable
+            # content, so lowercase words have to go through `add`.
+            return False
+        text = word_char_text(word)
+        return (
+            any(c in string.ascii_lowercase for c in text)
+            and not any(regex.search(text) for regex in ContentGroup.ENUMERATION_REGEXES)
+            and not cls.FILE_PATH_REGEX.match(word['text'])
+        )
+
+    def is_empty(self):
+        return not self.words and self.status == self.Status.UNDETERMINED
 
     def is_heading_complete(self):
         return self.status == self.Status.HEADING_COMPLETE
@@ -39,6 +69,9 @@ class HeadingAccumulator:
     def heading_words(self):
         return self.words[:self.index_of_suspect_heading_word]
 
+    def heading_groups(self):
+        return self.groups[:self.index_of_suspect_heading_word]
+
     @property
     def tier(self):
         if self.status == self.Status.NOT_HEADING:
@@ -47,19 +80,19 @@ class HeadingAccumulator:
         if self.status != self.Status.HEADING_COMPLETE:
             raise self.BadStateError(f'HeadingAccumulator must be in complete state to determine tier {self.status}, got {self.text()}')
 
-        if ContentGroup(self.words[0]).is_enumeration():
+        if self.groups[0].is_enumeration():
             # Enumerations tend to be small sections that, and also require more
             # complication hierarchy handling if we treat them as tiered headings.
             return None
 
         for index, content_type in enumerate(HEADING_HIERARCHY):
             if all(
-                CONTENT_TYPES[content_type].characteristics_consistent(ContentGroup(word)) for word in self.heading_words()
+                CONTENT_TYPES[content_type].characteristics_consistent(group) for group in self.heading_groups()
             ):
                 return index + 1
         return None
 
-    def add(self, word):
+    def add(self, word, candidate=None):
         """
           Adds a word to the accumulator. Will determine if whether the word
           matches the current heading, or, if nothing has accumulated yet, whether
@@ -67,17 +100,23 @@ class HeadingAccumulator:
 
           NOTE: If accumulator is new, it is assumed that the word passed is the
           first word in a document line.
+
+          `candidate` is the word's `ContentGroup`, if the caller already has it.
         """
         if self.status in {self.Status.NOT_HEADING, self.Status.HEADING_COMPLETE}:
             raise self.BadStateError('HeadingAccumulator in completed state')
 
-        candidate = ContentGroup(word)
-        if self._is_ignorable(word) or self._is_ignorable_by_font(candidate): return False
+        if candidate is None:
+            candidate = ContentGroup(word)
+        if self._is_ignorable(word) or self._is_ignorable_by_font(candidate):
+            self.last_case = self.IGNORED_CASE
+            return False
 
         if self.status == self.Status.HEADING:
             if candidate.is_punctuation() and self._has_main_content_font_and_size(candidate):
                 # Case 1: We are a heading and the next candidate is a punctuation that
                 # matches main content. Signals end of the heading.
+                self.last_case = 1
                 self.status = self.Status.HEADING_COMPLETE
                 return False
             elif (
@@ -86,6 +125,7 @@ class HeadingAccumulator:
             ):
                 # Case 2: We are a heading and the next candidate matches, so
                 # we add it to the accumulator after some housekeeping.
+                self.last_case = 2
                 if self.casing == Casing.SMALL_CAPS:
                     # Edge case handling for small-caps heading. If we have a
                     # small-caps heading accumulated, and the next word on a
@@ -93,7 +133,7 @@ class HeadingAccumulator:
                     # be either part of the heading or its own heading.
                     if (
                         candidate.casing == Casing.ALL_CAPS and
-                        self._is_approximately_small_caps_size(word['chars'][0]['size'])
+                        self._is_approximately_small_caps_size(word_sizes(word)[0])
                     ):
                         if self._word_is_on_new_line(word):
                             if self.index_of_suspect_heading_word is None:
@@ -102,7 +142,7 @@ class HeadingAccumulator:
                                 # Now we have a second line of a potentially new heading.
                                 # We can assume we have been accumulating a new heading.
                                 # Add the word so that it can be returned easily for reprocessing.
-                                self.words.append(word)
+                                self._append(word, candidate)
                                 self.status = self.Status.HEADING_COMPLETE
                                 return False
                     else:
@@ -112,17 +152,19 @@ class HeadingAccumulator:
                     # Set the casing if we have a new word with known casing.
                     self.casing = candidate.casing
 
-                self.words.append(word)
+                self._append(word, candidate)
                 return True
             else:
                 # Case 3: We are a heading and the next candidate does not match,
                 # so we mark the accumulator as complete.
+                self.last_case = 3
                 self.status = self.Status.HEADING_COMPLETE
                 return False
         elif not self.words:
             if candidate.is_punctuation() or candidate.starts_with_forbidden_punctuation():
                 # Case 4: We have no words accumulated yet, but received a punctuation
                 # word. This is not a heading.
+                self.last_case = 4
                 self.status = self.Status.NOT_HEADING
                 return False
             elif self._has_main_content_characteristics(candidate):
@@ -135,12 +177,14 @@ class HeadingAccumulator:
                     # Case 5: We have no words accumulated yet, but received an
                     # all-caps or parenthetical enumeration word. Unknown if
                     # this is a heading at this point.
-                    self.words.append(word)
+                    self.last_case = 5
+                    self._append(word, candidate)
                     return True
                 elif candidate.casing == Casing.SMALL_CAPS:
                     # Case 6: We have no words accumulated yet, but received a
                     # a small-caps word. This is a heading.
-                    self.words.append(word)
+                    self.last_case = 6
+                    self._append(word, candidate)
                     self.status = self.Status.HEADING
                     self.casing = Casing.SMALL_CAPS
                     self.content_type = self._resolve_heading_content_type(candidate)
@@ -149,18 +193,21 @@ class HeadingAccumulator:
                     # Case 7: We have no words accumulated yet, but received a
                     # word with punctuation and we already know it is not an
                     # enumeration or acronym. This is not a heading.
+                    self.last_case = 7
                     self.status = self.Status.NOT_HEADING
                     return False
                 else:
                     # Case 8: We have no words accumulated yet, but received a
                     # normal-cased word. This is not a heading.
+                    self.last_case = 8
                     self.status = self.Status.NOT_HEADING
                     self.casing = Casing.NORMAL
                     return False
             elif self._has_heading_characteristics(candidate):
                 # Case 9: We have no words accumulated yet, but received a word
                 # that matches one of the definitive heading content types.
-                self.words.append(word)
+                self.last_case = 9
+                self._append(word, candidate)
                 if candidate.casing in {Casing.NORMAL, Casing.SMALL_CAPS}:
                     # With all-caps words, unclear if that is the casing just yet.
                     self.casing = candidate.casing
@@ -170,11 +217,13 @@ class HeadingAccumulator:
             elif self._has_ambiguous_heading_characteristics(candidate):
                 # Case 10: We have no words accumulated yet, but received a word
                 # that is ambiguous about whether it could be a heading.
-                self.words.append(word)
+                self.last_case = 10
+                self._append(word, candidate)
                 return True
             else:
                 # Case 11: We have no words accumulated yet, and received a word
                 # that does not match any known content types. This is not a heading.
+                self.last_case = 11
                 self.status = self.Status.NOT_HEADING
                 return False
         else:
@@ -184,18 +233,21 @@ class HeadingAccumulator:
             if candidate.is_enumeration():
                 # Case 12: We have an ambiguous heading word, but we get an enumeration.
                 # Enumerations should start headings, so this can't be a heading.
+                self.last_case = 12
                 self.status = self.Status.NOT_HEADING
                 return False
-            elif candidate.same_line_as(ContentGroup(self.words[-1])) and self._is_main_content(candidate):
+            elif candidate.same_line_as(self.groups[-1]) and self._is_main_content(candidate):
                 # Case 13: We have an ambiguous heading word accumulated, but got a main
                 # content word on same line that has lowercase letters in it. Not a heading.
+                self.last_case = 13
                 self.status = self.Status.NOT_HEADING
                 self.casing = Casing.NORMAL
                 return False
-            elif candidate.same_line_as(ContentGroup(self.words[-1])) and self._matches(candidate):
+            elif candidate.same_line_as(self.groups[-1]) and self._matches(candidate):
                 # Case 14: We have an upper-case/number word accumulated, and the next word
                 # is on the same line and is also ambiguous. Should keep same status.
-                self.words.append(word)
+                self.last_case = 14
+                self._append(word, candidate)
                 if self._has_two_or_more_all_caps():
                     self.status = self.Status.HEADING
                     self.casing = Casing.ALL_CAPS
@@ -206,31 +258,35 @@ class HeadingAccumulator:
                     self.content_type = self._resolve_heading_content_type(candidate)
                 return True
             elif (
-                candidate.same_line_as(ContentGroup(self.words[-1]))
+                candidate.same_line_as(self.groups[-1])
                 and self._matches(candidate, accept_casing=Casing.SMALL_CAPS)
             ):
                 # Case 15: We have an upper-case/number word accumulated, and the next word is
                 # on the same line and is small-caps. Should be small-caps heading.
-                self.words.append(word)
+                self.last_case = 15
+                self._append(word, candidate)
                 self.status = self.Status.HEADING
                 self.casing = Casing.SMALL_CAPS
                 self.content_type = self._resolve_heading_content_type(candidate)
                 return True
-            elif candidate.same_line_as(ContentGroup(self.words[-1])):
+            elif candidate.same_line_as(self.groups[-1]):
                 # Case 16: We have an upper-case/number word accumulated, and the next word is
                 # on the same line and is not upper-case. This is not a heading.
+                self.last_case = 16
                 self.status = self.Status.NOT_HEADING
                 self.casing = Casing.NORMAL
                 return False
-            elif len(self.words) == 1 and ContentGroup(self.words[-1]).is_enumeration():
+            elif len(self.words) == 1 and self.groups[-1].is_enumeration():
                 # Case 17: We have an enumeration word accumulated, but the next word is
                 # on a different line. This is not a heading.
+                self.last_case = 17
                 self.status = self.Status.NOT_HEADING
                 return False
             elif self._matches(candidate) and candidate.casing == Casing.ALL_CAPS:
                 # Case 18: We have an upper-case/number word accumulated, but the next word is
                 # on a different line and is all-caps. This is treated as a continued heading.
-                self.words.append(word)
+                self.last_case = 18
+                self._append(word, candidate)
                 self.status = self.Status.HEADING
                 self.casing = Casing.ALL_CAPS
                 self.content_type = self._resolve_heading_content_type(candidate)
@@ -239,9 +295,10 @@ class HeadingAccumulator:
                 # Case 19: We have ambiguous word set accumulated, but the next word is
                 # on a different line and not matching. The heading is complete but
                 # the next word is not part of the heading.
+                self.last_case = 19
                 self.status = self.Status.HEADING_COMPLETE
                 self.casing = Casing.ALL_CAPS
-                self.content_type = self._resolve_heading_content_type(ContentGroup(self.words[-1]))
+                self.content_type = self._resolve_heading_content_type(self.groups[-1])
                 return False
 
     def accumulated_subheading_words(self):
@@ -250,6 +307,16 @@ class HeadingAccumulator:
 
         return self.words[self.index_of_suspect_heading_word:]
 
+    def accumulated_subheading_groups(self):
+        if self.index_of_suspect_heading_word is None:
+            return []
+
+        return self.groups[self.index_of_suspect_heading_word:]
+
+    def _append(self, word, candidate):
+        self.words.append(word)
+        self.groups.append(candidate)
+
     def _is_page_number(self, word):
         if not word['text'].isdigit():
             return False
@@ -264,21 +331,19 @@ class HeadingAccumulator:
         return self._is_page_number(word) or bool(self.FILE_PATH_REGEX.match(word['text']))
 
     def _is_ignorable_by_font(self, candidate):
-         return any(CONTENT_TYPES[content_type].characteristics_match(candidate) for content_type in IGNORABLE)
+         return not CONTENT_TYPE_INDEX.matches(candidate).isdisjoint(IGNORABLE_SET)
 
     def _has_heading_characteristics(self, candidate):
-        return any(CONTENT_TYPES[content_type].characteristics_match(candidate) for content_type in HEADINGS)
+        return not CONTENT_TYPE_INDEX.matches(candidate).isdisjoint(HEADING_SET)
 
     def _has_ambiguous_heading_characteristics(self, candidate):
-        return any(CONTENT_TYPES[content_type].characteristics_match(candidate) for content_type in POSSIBLE_HEADINGS)
+        return not CONTENT_TYPE_INDEX.matches(candidate).isdisjoint(POSSIBLE_HEADING_SET)
 
     def _has_main_content_characteristics(self, candidate):
-        return (
-            any(CONTENT_TYPES[content_type].characteristics_match(candidate, accept_casing=[Casing.UNKNOWN]) for content_type in CONTENT)
-        )
+        return not CONTENT_TYPE_INDEX.matches_accepting_unknown_casing(candidate).isdisjoint(CONTENT_SET)
 
     def _is_main_content(self, candidate):
-        return self._has_main_content_characteristics(candidate) and any(c in string.ascii_lowercase for c in candidate.text)
+        return self._has_main_content_characteristics(candidate) and candidate.has_lowercase
 
     def _matches(self, candidate, accept_casing=None):
         allowable_casing = [Casing.ALL_CAPS, Casing.UNKNOWN]
@@ -294,12 +359,12 @@ class HeadingAccumulator:
         else:
             accept_size_diff = False
 
-        return ContentGroup(self.words[0]).characteristics_match(candidate, accept_casing=allowable_casing, accept_size_diff=accept_size_diff)
+        return self.groups[0].characteristics_match(candidate, accept_casing=allowable_casing, accept_size_diff=accept_size_diff)
 
     def _has_two_or_more_all_caps(self):
         count = 0
-        for word in self.words:
-            if ContentGroup(word).casing == Casing.ALL_CAPS:
+        for group in self.groups:
+            if group.casing == Casing.ALL_CAPS:
                 count += 1
 
         return count >= 2
@@ -311,8 +376,9 @@ class HeadingAccumulator:
         )
 
     def _resolve_heading_content_type(self, candidate):
+        matches = CONTENT_TYPE_INDEX.matches(candidate)
         for content_type in HEADINGS:
-            if CONTENT_TYPES[content_type].characteristics_match(candidate):
+            if content_type in matches:
                 return content_type
         return None
 
@@ -320,11 +386,11 @@ class HeadingAccumulator:
         return any(p in text for p in string.punctuation)
 
     def _small_caps_size(self):
-        size = self.words[0]['chars'][0]['size']
+        size = word_sizes(self.words[0])[0]
         for word in self.words:
-            for char in word['chars']:
-                if char['size'] < size:
-                    return char['size']
+            for step in word_size_steps(word):
+                if step < size:
+                    return step
         return None
 
     def _is_approximately_small_caps_size(self, size):
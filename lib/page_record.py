@@ -0,0 +1,138 @@
+import copy
+import hashlib
+from .content_group import word_sizes, word_size_steps, word_char_text
+
+def word_key(word):
+    """
+      Everything the heading logic reads from `word`, as a hashable tuple.
+    """
+    return (
+        word['text'],
+        word_char_text(word),
+        word['fontname'],
+        word['x0'],
+        word['x1'],
+        word['bottom'],
+        word_sizes(word),
+        word_size_steps(word),
+    )
+
+def words_fingerprint(words, width):
+    """
+      Fingerprint of a page's width and word stream. Two pages with the same
+      fingerprint are parsed identically given the same starting state.
+    """
+    digest = hashlib.sha256()
+    digest.update(repr(width).encode())
+    for word in words:
+        digest.update(repr(word_key(word)).encode())
+    return digest.hexdigest()
+
+def page_doctop(words):
+    """
+      The `doctop` of the top of the page `words` were extracted from, or
+      None when they carry no `doctop`.
+    """
+    for word in words:
+        if 'doctop' not in word:
+            return None
+        return word['doctop'] - word['top']
+    return None
+
+def heading_state(heading):
+    """
+      The parse state carried from one page to the next: the open heading
+      accumulator, if any. Returns a hashable value that is equal for two
+      accumulators exactly when feeding them the same words has the same
+      outcome.
+    """
+    if heading is None:
+        return None
+    return (
+        heading.width,
+        heading.status,
+        heading.casing,
+        heading.index_of_suspect_heading_word,
+        tuple(word_key(word) for word in heading.words),
+    )
+
+class PageRecord:
+    """
+      What parsing one page did to a `Document`: the content items and
+      completed headings it attached, in order, and the heading accumulator
+      left open at the end of the page. Replaying the events onto a document
+      in `start_state` has the same effect as parsing the page again.
+    """
+    CONTENT = 'content'
+    HEADING = 'heading'
+
+    # Tolerance when telling the words of the page from words carried over
+    # from the pages before it by their `doctop`.
+    DOCTOP_TOLERANCE = 0.01
+
+    def __init__(self, fingerprint, width, start_state, doctop=None):
+        self.fingerprint = fingerprint
+        self.width = width
+        self.start_state = start_state
+        # The `doctop` of the top of the page (see `page_doctop`).
+        self.doctop = doctop
+        self.events = []
+        self.end_heading = None
+        self.retries = 0
+        self.fast_path_words = 0
+
+    def finish(self, heading, retries, fast_path_words):
+        # The live accumulator keeps changing on the next page, so keep a copy.
+        self.end_heading = copy.deepcopy(heading)
+        self.retries = retries
+        self.fast_path_words = fast_path_words
+
+    def moved(self, doctop, carried):
+        """
+          Returns the record of this page at `doctop` in a new version of the
+          bill, with the `doctop` of its words rebased, and the words carried
+          over from earlier pages by the open heading accumulator replaced by
+          `carried`, that accumulator's words in the new version. Returns the
+          record itself when no word changes.
+        """
+        shift = 0 if doctop is None or self.doctop is None else doctop - self.doctop
+        carried = {word_key(word): word for word in carried}
+        if not shift and not carried:
+            return self
+
+        def move(word):
+            if 'doctop' not in word:
+                return word
+            if self.doctop is None or abs(word['doctop'] - word['top'] - self.doctop) > self.DOCTOP_TOLERANCE:
+                return carried.get(word_key(word), word)
+            if not shift:
+                return word
+            # As pdfplumber computes it, so the result is exactly the same.
+            word = dict(word, doctop=doctop + word['top'])
+            if 'chars' in word:
+                word['chars'] = [
+                    dict(char, doctop=doctop + char['top']) if 'doctop' in char else char
+                    for char in word['chars']
+                ]
+            return word
+
+        def move_heading(heading):
+            if heading is None:
+                return None
+            heading = copy.copy(heading)
+            heading.words = [move(word) for word in heading.words]
+            return heading
+
+        record = PageRecord(self.fingerprint, self.width, self.start_state, self.doctop if doctop is None else doctop)
+        for kind, value in self.events:
+            if kind == self.HEADING:
+                value = move_heading(value)
+            elif isinstance(value, list):
+                value = [move(word) for word in value]
+            else:
+                value = move(value)
+            record.events.append((kind, value))
+        record.end_heading = move_heading(self.end_heading)
+        record.retries = self.retries
+        record.fast_path_words = self.fast_path_words
+        return record
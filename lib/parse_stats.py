@@ -0,0 +1,84 @@
+import json
+import time
+from collections import Counter
+
+class ParseStats:
+    """
+      Counters for the heading logic of a `Document`, collected when it is
+      created with `stats=True`:
+
+        cases           words handled by each case of `HeadingAccumulator.add`
+                        (case 0 is a word ignored before any case, like a
+                        line number)
+        case_seconds    time spent in `add` for the words of each case
+        final_statuses  status each discarded accumulator ended in; an
+                        accumulator dropped before it kept a word ends
+                        UNDETERMINED
+        pages           accumulators created and discarded on each page
+
+      Pages replayed from a `PageRecord` are not parsed, so they add an empty
+      page. Words rejected by the fast path never reach an accumulator; they
+      are counted by `Document.fast_path_words`.
+    """
+    def __init__(self):
+        self.cases = Counter()
+        self.case_seconds = Counter()
+        self.final_statuses = Counter()
+        self.page_created = []
+        self.page_discarded = []
+
+    def start_page(self):
+        self.page_created.append(0)
+        self.page_discarded.append(0)
+
+    def add(self, accumulator, word, candidate):
+        """
+          Feeds `word` to `accumulator`, timing it against the case that
+          handled it, and returns the result of `add`.
+        """
+        start = time.perf_counter()
+        result = accumulator.add(word, candidate)
+        elapsed = time.perf_counter() - start
+        self.cases[accumulator.last_case] += 1
+        self.case_seconds[accumulator.last_case] += elapsed
+        return result
+
+    def created(self):
+        if self.page_created:
+            self.page_created[-1] += 1
+
+    def discarded(self, accumulator):
+        self.final_statuses[accumulator.status.name] += 1
+        if self.page_discarded:
+            self.page_discarded[-1] += 1
+
+    @property
+    def accumulators_created(self):
+        return sum(self.page_created)
+
+    @property
+    def accumulators_discarded(self):
+        return sum(self.page_discarded)
+
+    def as_dict(self):
+        return {
+            'cases': {str(case): self.cases[case] for case in sorted(self.cases)},
+            'case_seconds': {str(case): self.case_seconds[case] for case in sorted(self.case_seconds)},
+            'final_statuses': dict(sorted(self.final_statuses.items())),
+            'accumulators_created': self.accumulators_created,
+            'accumulators_discarded': self.accumulators_discarded,
+            'pages': [
+                {'created': created, 'discarded': discarded}
+                for created, discarded in zip(self.page_created, self.page_discarded)
+            ],
+        }
+
+    def to_json(self, **options):
+        """
+          The stats as JSON; `options` are passed to `json.dumps`.
+        """
+        return json.dumps(self.as_dict(), **options)
+
+    def save(self, path):
+        with open(path, 'w') as file:
+            file.write(self.to_json(indent=2) + "\n")
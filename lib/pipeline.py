@@ -0,0 +1,210 @@
+import asyncio
+import json
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from .chunker import chunk_sections
+from .document import Document
+from .extraction import extract_pages
+
+class ModelRequest:
+    """
+      One request to the model: the text of a top-level section with its
+      subtree, or, with a token budget, of a `Chunk` of an oversized one.
+      `index` is the request's position in the bill.
+    """
+    def __init__(self, index, path, heading, text, token_count):
+        self.index = index
+        self.path = path
+        self.heading = heading
+        self.text = text
+        self.token_count = token_count
+
+    def __repr__(self):
+        return f'ModelRequest(index={self.index}, heading={self.heading!r}, token_count={self.token_count})'
+
+    def payload(self, model):
+        """
+          The body of the request, in the chat completions format.
+        """
+        return {'model': model, 'messages': [{'role': 'user', 'content': self.text}]}
+
+class HTTPModelClient:
+    """
+      Posts JSON payloads to a chat completions endpoint at `url` and returns
+      the decoded responses. Requests block a thread of the client's own pool
+      of `connections` threads, so size it to the pipeline's model
+      concurrency.
+    """
+    def __init__(self, url, *, headers=None, timeout=120, connections=8):
+        self.url = url
+        self.headers = {'Content-Type': 'application/json', **(headers or {})}
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=connections, thread_name_prefix='model')
+
+    def _post(self, payload):
+        request = urllib.request.Request(
+            self.url, data=json.dumps(payload).encode('utf-8'), headers=self.headers, method='POST'
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return json.loads(response.read())
+
+    async def send(self, payload):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self._post, payload)
+
+    def close(self):
+        self._executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+class Pipeline:
+    """
+      Takes a bill from PDF to model responses in four concurrent stages,
+      joined by queues of at most `queue_size` items so a slow stage holds
+      the ones before it back instead of letting work pile up:
+
+        extract     words of each page (see `extract_pages`; `jobs`, `cache`
+                    and `lean` are passed to it)
+        classify    the pages through a `Document`; a top-level section is
+                    passed on as soon as the heading that closes it is
+                    parsed (see `Document.add_words_streaming`)
+        tokenize    `Section.token_count` of each section, which becomes one
+                    `ModelRequest`, or several `Chunk`s of at most `budget`
+                    tokens when it is larger
+        model       `client.send` of each request, with at most
+                    `concurrency` requests in flight
+
+      With a `TextIndex`, the document's sections are indexed under `name` as
+      they are parsed.
+
+      The CPU-bound stages run on their own executor threads, so parsing
+      later divisions overlaps the model calls for earlier ones and the
+      wall time approaches that of the slowest stage rather than the sum.
+
+      `stats` has, per stage, the time spent working (summed over the
+      concurrent requests for the model stage) and when, relative to the
+      start of `run`, it started and finished.
+    """
+    STAGES = ('extract', 'classify', 'tokenize', 'model')
+
+    def __init__(self, client, *, model="gpt-4o", concurrency=4, queue_size=8, budget=None, jobs=1, cache=None, lean=False, text_index=None, name=None):
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least one")
+        self.client = client
+        self.model = model
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.budget = budget
+        self.jobs = jobs
+        self.cache = cache
+        self.lean = lean
+        self.text_index = text_index
+        self.name = name
+        self.document = None
+        self.stats = {}
+
+    async def run(self, source):
+        """
+          Runs the bill `source` through the pipeline: a PDF path, or any
+          iterable of (width, words) pages, like a `SyntheticBill` or a
+          `TokenStream`. Returns (request, response) pairs in bill order.
+        """
+        if isinstance(source, str):
+            source = extract_pages(source, jobs=self.jobs, cache=self.cache, lean=self.lean)
+        self.document = Document(text_index=self.text_index, name=self.name)
+        self.stats = {stage: {'busy_s': 0.0, 'started_s': None, 'finished_s': None} for stage in self.STAGES}
+        self._start = time.perf_counter()
+        pages = asyncio.Queue(self.queue_size)
+        sections = asyncio.Queue(self.queue_size)
+        requests = asyncio.Queue(self.queue_size)
+        results = []
+
+        with ThreadPoolExecutor(max_workers=3, thread_name_prefix='pipeline') as executor:
+            try:
+                async with asyncio.TaskGroup() as group:
+                    group.create_task(self._extract(executor, iter(source), pages))
+                    group.create_task(self._classify(executor, pages, sections))
+                    group.create_task(self._tokenize(executor, sections, requests))
+                    model = [group.create_task(self._call_model(requests, results)) for _ in range(self.concurrency)]
+                    group.create_task(self._finish(model))
+            except ExceptionGroup as group:
+                # Raise the failure itself, noting any other stage that failed
+                # with it.
+                first, *others = group.exceptions
+                for other in others:
+                    first.add_note(f"another stage also failed: {other!r}")
+                raise first
+
+        results.sort(key=lambda result: result[0].index)
+        return results
+
+    async def _timed(self, stage, executor, function, *args):
+        """
+          Runs `function` on `executor` (or awaits it, without one), adding
+          the time to `stage`.
+        """
+        stats = self.stats[stage]
+        start = time.perf_counter()
+        if stats['started_s'] is None:
+            stats['started_s'] = start - self._start
+        if executor is None:
+            result = await function(*args)
+        else:
+            result = await asyncio.get_running_loop().run_in_executor(executor, function, *args)
+        stats['busy_s'] += time.perf_counter() - start
+        return result
+
+    def _done(self, stage):
+        self.stats[stage]['finished_s'] = time.perf_counter() - self._start
+
+    async def _extract(self, executor, source, pages):
+        done = object()
+        while (page := await self._timed('extract', executor, next, source, done)) is not done:
+            await pages.put(page)
+        await pages.put(None)
+        self._done('extract')
+
+    async def _classify(self, executor, pages, sections):
+        document = self.document
+        while (page := await pages.get()) is not None:
+            width, words = page
+            closed = await self._timed('classify', executor, partial(document.add_words_streaming, words, width=width))
+            for section in closed:
+                await sections.put(section)
+        for section in document.drain_sections():
+            await sections.put(section)
+        await sections.put(None)
+        self._done('classify')
+
+    def _requests_for(self, section, index):
+        count = section.token_count(self.model)
+        if self.budget is None or count <= self.budget:
+            return [ModelRequest(index, (), section.heading_text(), section.text(), count)]
+        return [
+            ModelRequest(index + offset, chunk.path, chunk.sections[0].heading_text(), chunk.text(), chunk.token_count)
+            for offset, chunk in enumerate(chunk_sections([section], self.budget, self.model))
+        ]
+
+    async def _tokenize(self, executor, sections, requests):
+        index = 0
+        while (section := await sections.get()) is not None:
+            for request in await self._timed('tokenize', executor, self._requests_for, section, index):
+                await requests.put(request)
+                index += 1
+        for _ in range(self.concurrency):
+            await requests.put(None)
+        self._done('tokenize')
+
+    async def _call_model(self, requests, results):
+        while (request := await requests.get()) is not None:
+            response = await self._timed('model', None, self.client.send, request.payload(self.model))
+            results.append((request, response))
+
+    async def _finish(self, workers):
+        await asyncio.gather(*workers)
+        self._done('model')
@@ -0,0 +1,83 @@
+import json
+
+class SectionRenderer:
+    """
+      Writes a forest of sections to a text sink (anything with a `write`
+      method: a file, a socket's text wrapper, an `io.StringIO`). The tree is
+      walked once, iteratively, and written in small chunks as it goes, so the
+      rendered document is never held in memory as a whole.
+    """
+    def __init__(self, sink):
+        self.sink = sink
+
+    def render(self, sections):
+        stack = [(section, ()) for section in reversed(sections)]
+        while stack:
+            section, path = stack.pop()
+            self.write_section(section, path)
+            child_path = path + (section.heading_text(),)
+            stack.extend((subsection, child_path) for subsection in reversed(section.subsections))
+
+    def write_section(self, section, path):
+        raise NotImplementedError
+
+    def write_content(self, section):
+        write = self.sink.write
+        for chunk in section.content_chunks():
+            write(chunk)
+
+class TaggedRenderer(SectionRenderer):
+    """
+      The `<hN>heading<hN>` format produced by `Section.text`.
+    """
+    def write_section(self, section, path):
+        write = self.sink.write
+        tag = f"<h{section.tier}>"
+        write(tag)
+        write(section.heading_text())
+        write(tag)
+        write("\n\n")
+        self.write_content(section)
+        write("\n\n")
+
+class MarkdownRenderer(SectionRenderer):
+    def write_section(self, section, path):
+        write = self.sink.write
+        write('#' * section.tier)
+        write(" ")
+        write(section.heading_text())
+        write("\n\n")
+        if section.content:
+            self.write_content(section)
+            write("\n\n")
+
+class JSONLinesRenderer(SectionRenderer):
+    """
+      One JSON object per section, in document order, with the headings of
+      its ancestors as `path`.
+    """
+    def write_section(self, section, path):
+        record = {
+            'tier': section.tier,
+            'heading': section.heading_text(),
+            'path': list(path),
+            'content': section.content_text(),
+        }
+        self.sink.write(json.dumps(record, ensure_ascii=False))
+        self.sink.write("\n")
+
+RENDERERS = {
+    'tagged': TaggedRenderer,
+    'markdown': MarkdownRenderer,
+    'jsonl': JSONLinesRenderer,
+}
+
+def render(sections, sink, format='tagged'):
+    """
+      Renders `sections` to `sink` in one of the `RENDERERS` formats.
+    """
+    try:
+        renderer = RENDERERS[format]
+    except KeyError:
+        raise ValueError(f"unknown format {format!r}, expected one of {', '.join(RENDERERS)}") from None
+    renderer(sink).render(sections)
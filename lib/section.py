@@ -1,5 +1,7 @@
-import tiktoken
+import io
 import pdb
+from .renderer import TaggedRenderer
+from .tokens import encoder_for
 
 class Section:
   def __init__(self, heading, tier=1, content=None, subsections=None):
@@ -8,35 +10,158 @@ class Section:
 
     self.heading = heading
     self.tier = tier
+    self.parent = None
+    # Number (1-based) of the page the section's heading was found on, when
+    # the section was parsed from a document.
+    self.page = None
+    # Position of the section in its document, in document order.
+    self.ordinal = None
+    # Token counts by model, for this section's own text and for its subtree.
+    self._own_token_counts = {}
+    self._subtree_token_counts = {}
     self.content = content
     self.subsections = subsections if subsections is not None else []
 
+  @property
+  def content(self):
+    return self._content
+
+  @content.setter
+  def content(self, content):
+    self._content = content
+    self.invalidate()
+
+  @property
+  def subsections(self):
+    return self._subsections
+
+  @subsections.setter
+  def subsections(self, subsections):
+    for section in subsections:
+      section.parent = self
+    self._subsections = subsections
+    self.invalidate(own=False)
+
+  def append_subsection(self, section):
+    section.parent = self
+    self._subsections.append(section)
+    self.invalidate(own=False)
+
+  def invalidate(self, own=True):
+    """
+      Drops cached token counts after this section's content (or, with
+      `own=False`, only its subsections) changed. Assigning `content` or
+      `subsections` and `append_subsection` call this; mutating either in
+      place requires calling it directly.
+    """
+    if own:
+      self._own_token_counts.clear()
+    section = self
+    while section is not None and section._subtree_token_counts:
+      section._subtree_token_counts.clear()
+      section = section.parent
+
   def add_subsection(self, section):
     if section.tier <= self.tier:
       return None
-    else:
-      if len(self.subsections) == 0 or not self.subsections[-1].add_subsection(section):
-        self.subsections.append(section)
-        return self
-      return self.subsections[-1]
+
+    parent = self
+    while parent.subsections and section.tier > parent.subsections[-1].tier:
+      parent = parent.subsections[-1]
+    parent.append_subsection(section)
+    return self if parent is self else self.subsections[-1]
 
   def last_subsection(self):
-    if len(self.subsections) == 0:
-      return self
-    else:
-      return self.subsections[-1].last_subsection()
+    section = self
+    while section.subsections:
+      section = section.subsections[-1]
+    return section
+
+  def walk(self):
+    """
+      Yields this section and all of its descendants in document order,
+      without recursion.
+    """
+    stack = [self]
+    while stack:
+      section = stack.pop()
+      yield section
+      stack.extend(reversed(section.subsections))
+
+  def has_own_token_count(self, model="gpt-4o"):
+    return model in self._own_token_counts
+
+  def cache_own_token_count(self, model, count):
+    self._own_token_counts[model] = count
+    self.invalidate(own=False)
+
+  def own_token_count(self, model="gpt-4o"):
+    counts = self._own_token_counts
+    if model not in counts:
+      counts[model] = len(encoder_for(model).encode(self.own_text()))
+    return counts[model]
 
   def token_count(self, model="gpt-4o"):
-    encoder = tiktoken.encoding_for_model(model)
-    return len(encoder.encode(self.text()))
+    """
+      Tokens in `text()`. Subtree totals are cached and rolled up from the
+      subsections, so counting a whole tree encodes each section once. The
+      sum is exact because every section's text ends with a blank line,
+      which tiktoken never merges with the `<h` that starts the next one.
+    """
+    if model in self._subtree_token_counts:
+      return self._subtree_token_counts[model]
+
+    # Sections whose subtree total is not cached yet, parents before children.
+    pending = []
+    stack = [self]
+    while stack:
+      section = stack.pop()
+      if model not in section._subtree_token_counts:
+        pending.append(section)
+        stack.extend(section.subsections)
+
+    for section in reversed(pending):
+      section._subtree_token_counts[model] = section.own_token_count(model) + sum(
+        subsection._subtree_token_counts[model] for subsection in section.subsections
+      )
+    return self._subtree_token_counts[model]
+
+  def heading_text(self):
+    return self.heading if isinstance(self.heading, str) else self.heading.text()
+
+  def content_chunks(self):
+    """
+      Yields the section's own content as strings. Content is either a
+      string or, for parsed documents, a list of words and lists of words
+      (rejected heading candidates), which are joined with spaces.
+    """
+    if self.content is None:
+      return
+    if isinstance(self.content, str):
+      yield self.content
+      return
+
+    first = True
+    for item in self.content:
+      for word in (item if isinstance(item, list) else (item,)):
+        if not first:
+          yield " "
+        yield word['text']
+        first = False
+
+  def content_text(self):
+    return "".join(self.content_chunks())
+
+  def own_text(self):
+    sink = io.StringIO()
+    TaggedRenderer(sink).write_section(self, ())
+    return sink.getvalue()
 
   def text(self):
-    content = "" if self.content is None else self.content
-    section_result = f"<h{self.tier}>{self.heading}<h{self.tier}>\n\n" + content + "\n\n"
-    subsections_result = "".join([s.text() for s in self.subsections])
-    return section_result + subsections_result
+    sink = io.StringIO()
+    TaggedRenderer(sink).render([self])
+    return sink.getvalue()
 
   def print_headings(self):
-    print(f"{'#' * self.tier} {self.heading.text()}")
-    for subsection in self.subsections:
-      subsection.print_headings()
+    for section in self.walk():
+      print(f"{'#' * section.tier} {section.heading.text()}")
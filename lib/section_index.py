@@ -0,0 +1,217 @@
+import sqlite3
+from .renderer import TaggedRenderer
+
+class _CountingSink:
+    """
+      Collects written chunks and keeps track of the offset of the next one.
+    """
+    def __init__(self):
+        self.chunks = []
+        self.offset = 0
+
+    def write(self, chunk):
+        self.chunks.append(chunk)
+        self.offset += len(chunk)
+
+    def getvalue(self):
+        return "".join(self.chunks)
+
+class SectionIndex:
+    """
+      A SQLite database of parsed section trees, queried without the PDFs or
+      pdfplumber. Each document's tagged text (as rendered by `Section.text`)
+      is stored once; each section is a row with its tier, heading, heading
+      path, parent, preorder `ordinal`, page range and offsets into that text:
+      `text_start`/`text_end` span the section with its subsections and
+      `content_start`/`content_end` its own content.
+
+      Query methods return `sqlite3.Row`s of the `sections` table.
+    """
+    # Headings never contain newlines, so a path is the ancestors' headings
+    # and the section's own, joined by newlines.
+    PATH_SEPARATOR = "\n"
+
+    SCHEMA = """
+      CREATE TABLE IF NOT EXISTS documents (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE,
+        page_count INTEGER,
+        text TEXT NOT NULL
+      );
+      CREATE TABLE IF NOT EXISTS sections (
+        id INTEGER PRIMARY KEY,
+        document_id INTEGER NOT NULL REFERENCES documents (id),
+        parent_id INTEGER REFERENCES sections (id),
+        ordinal INTEGER NOT NULL,
+        last_ordinal INTEGER NOT NULL,
+        tier INTEGER NOT NULL,
+        heading TEXT NOT NULL,
+        path TEXT NOT NULL,
+        first_page INTEGER,
+        last_page INTEGER,
+        text_start INTEGER NOT NULL,
+        text_end INTEGER NOT NULL,
+        content_start INTEGER NOT NULL,
+        content_end INTEGER NOT NULL
+      );
+      CREATE INDEX IF NOT EXISTS sections_heading ON sections (heading);
+      CREATE INDEX IF NOT EXISTS sections_path ON sections (path);
+      CREATE INDEX IF NOT EXISTS sections_parent ON sections (parent_id);
+      CREATE UNIQUE INDEX IF NOT EXISTS sections_ordinal ON sections (document_id, ordinal);
+    """
+
+    def __init__(self, path=":memory:"):
+        self.connection = sqlite3.connect(path)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.executescript(self.SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def add_document(self, name, sections, page_count=None):
+        """
+          Stores the section forest `sections` under `name`, replacing any
+          document already stored under that name, and returns its id. Page
+          ranges come from each section's `page`; a section's last page is the
+          page of the next section outside its subtree, or `page_count`.
+        """
+        sink = _CountingSink()
+        renderer = TaggedRenderer(sink)
+        # Rows in preorder: [parent ordinal, tier, heading, path, first page,
+        # text start, content start, content end, last ordinal, text end].
+        rows = []
+        # Ordinals of the ancestors of the section being visited, and of the
+        # sections whose subtree has not been closed yet.
+        open_rows = []
+        stack = [(section, None, ()) for section in reversed(sections)]
+        while stack:
+            section, parent, path = stack.pop()
+            ordinal = len(rows)
+            while open_rows and open_rows[-1] != parent:
+                self._close_row(rows, open_rows.pop(), ordinal - 1, sink.offset)
+
+            path = path + (section.heading_text(),)
+            text_start = sink.offset
+            renderer.write_section(section, ())
+            # `write_section` ends the content with a blank line.
+            content_end = sink.offset - 2
+            content_start = content_end - sum(len(chunk) for chunk in section.content_chunks())
+            rows.append([parent, section.tier, path[-1], self.PATH_SEPARATOR.join(path), getattr(section, 'page', None), text_start, content_start, content_end, None, None])
+            open_rows.append(ordinal)
+            stack.extend((subsection, ordinal, path) for subsection in reversed(section.subsections))
+        while open_rows:
+            self._close_row(rows, open_rows.pop(), len(rows) - 1, sink.offset)
+
+        with self.connection:
+            self._delete_document(name)
+            document_id = self.connection.execute(
+                "INSERT INTO documents (name, page_count, text) VALUES (?, ?, ?)",
+                (name, page_count, sink.getvalue()),
+            ).lastrowid
+
+            ids = []
+            for ordinal, row in enumerate(rows):
+                parent, tier, heading, path, first_page, text_start, content_start, content_end, last_ordinal, text_end = row
+                next_page = rows[last_ordinal + 1][4] if last_ordinal + 1 < len(rows) else page_count
+                ids.append(self.connection.execute(
+                    """
+                      INSERT INTO sections (
+                        document_id, parent_id, ordinal, last_ordinal, tier, heading, path,
+                        first_page, last_page, text_start, text_end, content_start, content_end
+                      ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (
+                        document_id, None if parent is None else ids[parent], ordinal, last_ordinal,
+                        tier, heading, path, first_page, next_page if first_page is not None else None,
+                        text_start, text_end, content_start, content_end,
+                    ),
+                ).lastrowid)
+        return document_id
+
+    @staticmethod
+    def _close_row(rows, ordinal, last_ordinal, text_end):
+        rows[ordinal][8] = last_ordinal
+        rows[ordinal][9] = text_end
+
+    def _delete_document(self, name):
+        row = self.connection.execute("SELECT id FROM documents WHERE name = ?", (name,)).fetchone()
+        if row is not None:
+            self.connection.execute("DELETE FROM sections WHERE document_id = ?", (row['id'],))
+            self.connection.execute("DELETE FROM documents WHERE id = ?", (row['id'],))
+
+    def remove_document(self, name):
+        with self.connection:
+            self._delete_document(name)
+
+    def documents(self):
+        return [row['name'] for row in self.connection.execute("SELECT name FROM documents ORDER BY name")]
+
+    def _select(self, where, parameters, document=None):
+        query = "SELECT sections.* FROM sections"
+        if document is not None:
+            query += " JOIN documents ON documents.id = sections.document_id"
+            where += " AND documents.name = ?"
+            parameters = (*parameters, document)
+        query += f" WHERE {where} ORDER BY sections.document_id, sections.ordinal"
+        return self.connection.execute(query, parameters).fetchall()
+
+    def section(self, section_id):
+        rows = self._select("sections.id = ?", (section_id,))
+        return rows[0] if rows else None
+
+    def find(self, heading, document=None):
+        """
+          Sections whose heading is exactly `heading`.
+        """
+        return self._select("sections.heading = ?", (heading,), document)
+
+    def find_prefix(self, prefix, document=None):
+        """
+          Sections whose heading starts with `prefix`, e.g. "SEC. 304.".
+        """
+        return self._select(
+            "sections.heading >= ? AND sections.heading < ?", (prefix, prefix + "\U0010ffff"), document
+        )
+
+    def by_path(self, path, document=None):
+        """
+          Sections with the heading path `path`, a sequence of headings from
+          the top-level section down.
+        """
+        return self._select("sections.path = ?", (self.PATH_SEPARATOR.join(path),), document)
+
+    def children(self, row):
+        return self._select("sections.parent_id = ?", (row['id'],))
+
+    def subtree(self, row):
+        """
+          `row` and all of its descendants, in document order.
+        """
+        return self._select(
+            "sections.document_id = ? AND sections.ordinal BETWEEN ? AND ?",
+            (row['document_id'], row['ordinal'], row['last_ordinal']),
+        )
+
+    def _substring(self, document_id, start, end):
+        return self.connection.execute(
+            "SELECT substr(text, ?, ?) FROM documents WHERE id = ?", (start + 1, end - start, document_id)
+        ).fetchone()[0]
+
+    def text(self, row):
+        """
+          The tagged text of the section and its subsections, as `Section.text`
+          would render it.
+        """
+        return self._substring(row['document_id'], row['text_start'], row['text_end'])
+
+    def content(self, row):
+        """
+          The section's own content text.
+        """
+        return self._substring(row['document_id'], row['content_start'], row['content_end'])
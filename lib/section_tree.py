@@ -0,0 +1,33 @@
+class SectionTreeBuilder:
+    """
+      Builds a forest of sections in document order. The rightmost spine of
+      the last top-level section is kept as a stack of open sections, ordered
+      by tier, so adding a section only pops the sections it closes instead of
+      walking down from the root.
+    """
+    def __init__(self, sections=None):
+        self.sections = sections if sections is not None else []
+        self.open_sections = []
+
+    def add(self, section):
+        """
+          Adds `section` under the deepest open section of a lower tier, or as
+          a new top-level section if there is none. Equivalent to calling
+          `add_subsection` on the last top-level section.
+        """
+        open_sections = self.open_sections
+        while open_sections and section.tier <= open_sections[-1].tier:
+            open_sections.pop()
+
+        if open_sections:
+            open_sections[-1].append_subsection(section)
+        else:
+            self.sections.append(section)
+        open_sections.append(section)
+        return section
+
+    def last_section(self):
+        """
+          The most recently added section, i.e. the one content is attached to.
+        """
+        return self.open_sections[-1] if self.open_sections else None
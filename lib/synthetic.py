@@ -0,0 +1,300 @@
+import random
+from .content_type import ContentType
+from .content_descriptors import CONTENT_TYPES
+
+class SyntheticBill:
+    """
+      Generates the word stream of a made-up bill of any length, page by page,
+      in the form `extract_page_words` produces, without a PDF. Fonts, sizes
+      and casings come from `CONTENT_TYPES`; the layout (margins, line pitch,
+      line numbers after each line, centered page numbers, file paths) follows
+      the GPO bills in `fixtures/`.
+
+      The bill is a sequence of blocks drawn at random, weighted by `mix`;
+      every heading is followed by a paragraph:
+
+        division        centered DIVISION_HEADING_1 line, "DIVISION A — ..."
+        title           centered DIVISION_HEADING_2 line, "TITLE I — ..."
+        subheading      centered all-caps DIVISION_SUBHEADING_1 line
+        small_caps      centered DIVISION_SUBHEADING_2 small-caps line
+        law_section     LAW_SECTION line, "SEC. 3. SHORT TITLE."
+        section         run-in small-caps "SEC. 101." followed by a paragraph
+        paragraph       CONTENT lines, sometimes starting with an enumeration
+
+      Every heading emitted is appended to `headings` as a (kind, text) pair.
+      With `lean`, words carry the `size`, `min_size`, `uniform_size` and
+      `size_steps` of lean extraction instead of chars.
+    """
+    WIDTH = 612.0
+    LEFT = 150.0
+    RIGHT = 486.0
+    INDENT = 178.0
+    ENUMERATION_INDENT = 206.0
+    CENTER = 318.0
+    LINE_NUMBER_X0 = 133.0
+    FIRST_LINE_TOP = 73.9
+    LINE_PITCH = 26.0
+    LINES_PER_PAGE = 25
+    PAGE_NUMBER_TOP = 49.9
+    FILE_PATH_TOP = 29.2
+    SMALL_CAPS_SIZE = 10.544
+    # Average glyph and space widths, in ems.
+    CHAR_WIDTH = 0.5
+    SPACE_WIDTH = 0.3
+
+    DEFAULT_MIX = {
+        'division': 0.01,
+        'title': 0.03,
+        'subheading': 0.03,
+        'small_caps': 0.06,
+        'law_section': 0.02,
+        'section': 0.15,
+        'paragraph': 0.70,
+    }
+
+    WORDS = (
+        "the of and to for in shall be a such as by any or under this that may not with section "
+        "amounts made available act fiscal year appropriations funds amended striking inserting "
+        "secretary department program provided further notwithstanding provision law other "
+        "each paragraph subsection including purposes necessary expenses remain until expended "
+        "pursuant authority agency federal state grants carry out activities described report "
+        "committees house representatives senate days after date enactment shall apply period "
+        "rate operations authorized continuing resolution extension emergency requirement"
+    ).split()
+    CAPITALIZED_WORDS = (
+        "Secretary Congress Act Federal State Department Administration Office Service Fund "
+        "United States Code Public Law Treasury Agriculture Energy Defense Commerce"
+    ).split()
+    HEADING_WORDS = (
+        "DEPARTMENT AGRICULTURE ENERGY DEFENSE COMMERCE JUSTICE HEALTH HUMAN SERVICES "
+        "DISASTER RELIEF SUPPLEMENTAL APPROPRIATIONS EXTENDERS PROGRAMS OPERATIONS ADMINISTRATION "
+        "RESEARCH MARKETING CONSTRUCTION FOREST RESTORATION EMERGENCY GENERAL PROVISIONS"
+    ).split()
+    SMALL_WORDS = ("AND", "OF", "THE", "FOR")
+    ROMAN = ("I", "II", "III", "IV", "V", "VI", "VII", "VIII", "IX", "X")
+    ENUMERATIONS = ("(1)", "(2)", "(3)", "(a)", "(b)", "(c)", "(A)", "(B)", "(i)", "(ii)")
+    FILE_PATH = "I:\\FY25\\SYNTHETIC\\BILL.XML"
+
+    def __init__(self, pages=100, *, seed=0, mix=None, line_numbers=True, page_numbers=True, file_paths=True, lean=False):
+        self.page_count = pages
+        self.random = random.Random(seed)
+        mix = dict(self.DEFAULT_MIX if mix is None else mix)
+        self.kinds = list(mix)
+        self.weights = [mix[kind] for kind in self.kinds]
+        self.line_numbers = line_numbers
+        self.page_numbers = page_numbers
+        self.file_paths = file_paths
+        self.lean = lean
+        self.headings = []
+        self.word_count = 0
+        self._divisions = 0
+        self._titles = 0
+        self._sections = 0
+
+    def __iter__(self):
+        return self.pages()
+
+    def pages(self):
+        """
+          Yields a (width, words) pair for every page.
+        """
+        lines = self._lines()
+        for page_index in range(self.page_count):
+            words = []
+            if self.file_paths:
+                words.append(self._word(self.FILE_PATH, ContentType.FILE_PATH, 63.0, self.FILE_PATH_TOP))
+            if self.page_numbers and page_index > 0:
+                number = str(page_index + 1)
+                width = self._text_width(number, 14.0)
+                words.append(self._word(number, ContentType.PAGE_NUMBER, self.WIDTH / 2 - width / 2, self.PAGE_NUMBER_TOP))
+
+            for line_index in range(self.LINES_PER_PAGE):
+                top = self.FIRST_LINE_TOP + line_index * self.LINE_PITCH
+                for text, content_type, x0, sizes in next(lines):
+                    words.append(self._word(text, content_type, x0, top, sizes))
+                if self.line_numbers:
+                    # Line numbers follow the words of their line, as pdfplumber
+                    # orders them, and sit a hair lower.
+                    words.append(self._word(str(line_index + 1), ContentType.LINE_NUMBER, self.LINE_NUMBER_X0, top + 0.1))
+
+            self.word_count += len(words)
+            yield self.WIDTH, words
+
+    def feed(self, document):
+        """
+          Parses the whole bill into `document` and returns it.
+        """
+        for width, words in self.pages():
+            document.add_words(words, width=width)
+        return document
+
+    def _word(self, text, content_type, x0, top, sizes=None):
+        characteristics = CONTENT_TYPES[content_type]
+        if sizes is None:
+            sizes = [characteristics.size] * len(text)
+        x1 = x0 + sum(size * self.CHAR_WIDTH for size in sizes)
+        height = max(sizes)
+        word = {
+            'text': text,
+            'x0': x0,
+            'x1': x1,
+            'top': top,
+            'doctop': top,
+            'bottom': top + height,
+            'upright': True,
+            'height': height,
+            'width': x1 - x0,
+            'direction': 'ltr',
+            'fontname': characteristics.font,
+        }
+        if self.lean:
+            word['size'] = sizes[0]
+            word['min_size'] = min(sizes)
+            word['uniform_size'] = len(set(sizes)) == 1
+            steps = []
+            for size in sizes:
+                if not steps or size < steps[-1]:
+                    steps.append(size)
+            word['size_steps'] = tuple(steps)
+        else:
+            chars = []
+            x = x0
+            for char, size in zip(text, sizes):
+                chars.append({
+                    'text': char, 'fontname': characteristics.font, 'size': size,
+                    'x0': x, 'x1': x + size * self.CHAR_WIDTH, 'top': top, 'bottom': top + size,
+                })
+                x += size * self.CHAR_WIDTH
+            word['chars'] = chars
+        return word
+
+    def _text_width(self, text, size):
+        return len(text) * size * self.CHAR_WIDTH
+
+    def _lines(self):
+        """
+          Yields lines forever, each a list of (text, content type, x0, char
+          sizes) tuples.
+        """
+        while True:
+            kind = self.random.choices(self.kinds, self.weights)[0]
+            yield from getattr(self, f'_{kind}_lines')()
+
+    def _heading_text(self, count):
+        return [self.random.choice(self.HEADING_WORDS) for _ in range(count)]
+
+    def _centered(self, tokens, content_type):
+        """
+          Lays out `tokens` ((text, sizes) pairs) centered on the text column.
+        """
+        size = CONTENT_TYPES[content_type].size
+        widths = [sum(sizes) * self.CHAR_WIDTH for _, sizes in tokens]
+        total = sum(widths) + size * self.SPACE_WIDTH * (len(tokens) - 1)
+        x = self.CENTER - total / 2
+        line = []
+        for (text, sizes), width in zip(tokens, widths):
+            line.append((text, content_type, x, sizes))
+            x += width + size * self.SPACE_WIDTH
+        return line
+
+    def _uniform(self, words, content_type):
+        size = CONTENT_TYPES[content_type].size
+        return [(word, [size] * len(word)) for word in words]
+
+    def _division_lines(self):
+        self._divisions += 1
+        letter = chr(ord('A') + (self._divisions - 1) % 26)
+        words = ['DIVISION', letter, '—'] + self._heading_text(self.random.randint(2, 4))
+        self.headings.append(('division', " ".join(words)))
+        yield self._centered(self._uniform(words, ContentType.DIVISION_HEADING_1), ContentType.DIVISION_HEADING_1)
+        yield from self._paragraph_lines()
+
+    def _title_lines(self):
+        self._titles += 1
+        words = ['TITLE', self.ROMAN[(self._titles - 1) % len(self.ROMAN)], '—'] + self._heading_text(self.random.randint(1, 3))
+        self.headings.append(('title', " ".join(words)))
+        yield self._centered(self._uniform(words, ContentType.DIVISION_HEADING_2), ContentType.DIVISION_HEADING_2)
+        yield from self._paragraph_lines()
+
+    def _subheading_lines(self):
+        words = self._heading_text(self.random.randint(1, 4))
+        self.headings.append(('subheading', " ".join(words)))
+        yield self._centered(self._uniform(words, ContentType.DIVISION_SUBHEADING_1), ContentType.DIVISION_SUBHEADING_1)
+        yield from self._paragraph_lines()
+
+    def _small_caps(self, word):
+        """
+          (text, sizes) of `word` set in small caps: a capital initial at full
+          size and the rest at the small-caps size; short function words are
+          entirely small.
+        """
+        size = CONTENT_TYPES[ContentType.DIVISION_SUBHEADING_2].size
+        if word in self.SMALL_WORDS:
+            return word, [self.SMALL_CAPS_SIZE] * len(word)
+        return word, [size] + [self.SMALL_CAPS_SIZE] * (len(word) - 1)
+
+    def _small_caps_lines(self):
+        words = self._heading_text(self.random.randint(1, 3))
+        if len(words) > 1 and self.random.random() < 0.5:
+            words.insert(1, self.random.choice(self.SMALL_WORDS))
+        self.headings.append(('small_caps', " ".join(words)))
+        yield self._centered([self._small_caps(word) for word in words], ContentType.DIVISION_SUBHEADING_2)
+        yield from self._paragraph_lines()
+
+    def _law_section_lines(self):
+        self._sections += 1
+        words = ['SEC.', f'{self._sections}.'] + self._heading_text(self.random.randint(1, 3))
+        words[-1] += '.'
+        self.headings.append(('law_section', " ".join(words)))
+        size = CONTENT_TYPES[ContentType.LAW_SECTION].size
+        line = []
+        x = self.LEFT
+        for text, sizes in self._uniform(words, ContentType.LAW_SECTION):
+            line.append((text, ContentType.LAW_SECTION, x, sizes))
+            x += sum(sizes) * self.CHAR_WIDTH + size * self.SPACE_WIDTH
+        yield line
+        yield from self._paragraph_lines()
+
+    def _section_lines(self):
+        self._sections += 1
+        sec, _ = self._small_caps('SEC.')
+        number = f'{self._sections}.'
+        self.headings.append(('section', f'SEC. {number}'))
+        size = CONTENT_TYPES[ContentType.CONTENT].size
+        lead = [(sec, self._small_caps('SEC.')[1]), (number, [size] * len(number))]
+        yield from self._paragraph_lines(lead)
+
+    def _paragraph_lines(self, lead=None):
+        """
+          A paragraph of body text. `lead` ((text, sizes) pairs) starts its
+          first line; otherwise the paragraph may open with an enumeration.
+        """
+        size = CONTENT_TYPES[ContentType.CONTENT].size
+        tokens = list(lead or [])
+        x0 = self.INDENT
+        if lead is None and self.random.random() < 0.3:
+            tokens.append((self.random.choice(self.ENUMERATIONS), None))
+            x0 = self.ENUMERATION_INDENT
+        for index in range(self.random.randint(15, 120)):
+            if self.random.random() < 0.08:
+                word = self.random.choice(self.CAPITALIZED_WORDS)
+            else:
+                word = self.random.choice(self.WORDS)
+            if index == 0 and lead is None and not tokens:
+                word = word.capitalize()
+            tokens.append((word, None))
+        tokens[-1] = (tokens[-1][0] + '.', tokens[-1][1])
+
+        line = []
+        x = x0
+        for text, sizes in tokens:
+            sizes = sizes or [size] * len(text)
+            width = sum(sizes) * self.CHAR_WIDTH
+            if line and x + width > self.RIGHT:
+                yield line
+                line = []
+                x = self.LEFT
+            line.append((text, ContentType.CONTENT, x, sizes))
+            x += width + size * self.SPACE_WIDTH
+        if line:
+            yield line
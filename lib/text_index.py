@@ -0,0 +1,329 @@
+import bisect
+import json
+import math
+import re
+import struct
+import zlib
+from pathlib import Path
+
+class TextIndex:
+    """
+      Inverted index over the text of parsed sections. Terms are the
+      lowercased alphanumeric runs of a section's heading followed by its
+      content, and map to the sections holding them and the term positions
+      within each. Sections are identified by a document name and their
+      ordinal in document order (`Section.ordinal`, and the `ordinal` column
+      of `SectionIndex`).
+
+      A `Document` created with a `text_index` feeds it while it builds its
+      tree; `add_sections` indexes an existing tree the same way.
+
+      `save` writes a header followed by the zlib-compressed JSON of the
+      postings, sections and lengths. The format holds data only, so loading
+      an index from anyone is safe.
+    """
+    TERM_REGEX = re.compile(r'[a-z0-9]+')
+    QUERY_REGEX = re.compile(r'"([^"]*)"|(\S+)')
+    MAGIC = b'BILLIDX\0'
+    FORMAT_VERSION = 2
+    # magic, version.
+    HEADER = struct.Struct('<8sI')
+    COMPRESSION_LEVEL = 6
+    # BM25 parameters.
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self):
+        # term -> {section id: [positions]}
+        self.postings = {}
+        # (document, ordinal) for each section id, or None once removed.
+        self.sections = []
+        self.lengths = []
+        self._section_ids = {}
+        self._sorted_terms = None
+        self._live_sections = 0
+        self._total_length = 0
+
+    @classmethod
+    def terms(cls, text):
+        return cls.TERM_REGEX.findall(text.lower())
+
+    def add_text(self, document, ordinal, text):
+        """
+          Appends the terms of `text` to the section `ordinal` of `document`,
+          after any text already indexed for it.
+        """
+        key = (document, ordinal)
+        section_id = self._section_ids.get(key)
+        if section_id is None:
+            section_id = self._section_ids[key] = len(self.sections)
+            self.sections.append(key)
+            self.lengths.append(0)
+            self._live_sections += 1
+
+        position = self.lengths[section_id]
+        postings = self.postings
+        for term in self.terms(text):
+            sections = postings.get(term)
+            if sections is None:
+                sections = postings[term] = {}
+                self._sorted_terms = None
+            positions = sections.get(section_id)
+            if positions is None:
+                sections[section_id] = [position]
+            else:
+                positions.append(position)
+            position += 1
+        self._total_length += position - self.lengths[section_id]
+        self.lengths[section_id] = position
+
+    def add_sections(self, document, sections):
+        """
+          Indexes the section forest `sections` under `document`, replacing
+          anything indexed for that document before.
+        """
+        self.remove_document(document)
+        stack = list(reversed(sections))
+        ordinal = 0
+        while stack:
+            section = stack.pop()
+            self.add_text(document, ordinal, section.heading_text())
+            self.add_text(document, ordinal, section.content_text())
+            ordinal += 1
+            stack.extend(reversed(section.subsections))
+
+    def documents(self):
+        return sorted({key[0] for key in self.sections if key is not None})
+
+    def remove_document(self, document):
+        removed = set()
+        for section_id, key in enumerate(self.sections):
+            if key is not None and key[0] == document:
+                removed.add(section_id)
+                del self._section_ids[key]
+                self.sections[section_id] = None
+                self._total_length -= self.lengths[section_id]
+                self.lengths[section_id] = 0
+        if not removed:
+            return
+        self._live_sections -= len(removed)
+        for term in list(self.postings):
+            sections = self.postings[term]
+            for section_id in removed.intersection(sections):
+                del sections[section_id]
+            if not sections:
+                del self.postings[term]
+                self._sorted_terms = None
+
+    def merge(self, other):
+        """
+          Adds the documents indexed by `other` to this index. A document
+          indexed by both is replaced by `other`'s.
+        """
+        for document in other.documents():
+            self.remove_document(document)
+
+        remapped = {}
+        for section_id, key in enumerate(other.sections):
+            if key is None:
+                continue
+            remapped[section_id] = self._section_ids[key] = len(self.sections)
+            self.sections.append(key)
+            self.lengths.append(other.lengths[section_id])
+            self._live_sections += 1
+            self._total_length += other.lengths[section_id]
+
+        for term, sections in other.postings.items():
+            merged = self.postings.get(term)
+            if merged is None:
+                merged = self.postings[term] = {}
+                self._sorted_terms = None
+            for section_id, positions in sections.items():
+                if section_id in remapped:
+                    merged[remapped[section_id]] = list(positions)
+            if not merged:
+                del self.postings[term]
+
+    def expand_prefix(self, prefix):
+        """
+          The indexed terms starting with `prefix`, found by binary search
+          over the sorted terms.
+        """
+        if self._sorted_terms is None:
+            self._sorted_terms = sorted(self.postings)
+        terms = self._sorted_terms
+        start = bisect.bisect_left(terms, prefix)
+        end = bisect.bisect_left(terms, prefix + "\U0010ffff", lo=start)
+        return terms[start:end]
+
+    def term_frequencies(self, term):
+        """
+          {section id: occurrences} for a term, or, for a term ending in `*`,
+          for every term it is a prefix of.
+        """
+        if term.endswith("*"):
+            frequencies = {}
+            for expanded in self.expand_prefix(term[:-1]):
+                for section_id, positions in self.postings[expanded].items():
+                    frequencies[section_id] = frequencies.get(section_id, 0) + len(positions)
+            return frequencies
+        return {section_id: len(positions) for section_id, positions in self.postings.get(term, {}).items()}
+
+    def phrase_frequencies(self, terms):
+        """
+          {section id: occurrences} of `terms` appearing consecutively.
+        """
+        if not terms:
+            return {}
+        if len(terms) == 1:
+            return self.term_frequencies(terms[0])
+
+        postings = [self.postings.get(term) for term in terms]
+        if any(sections is None for sections in postings):
+            return {}
+        # Intersect starting from the rarest term.
+        candidates = set(min(postings, key=len))
+        for sections in postings:
+            candidates.intersection_update(sections)
+
+        frequencies = {}
+        for section_id in candidates:
+            starts = set(postings[0][section_id])
+            for offset, sections in enumerate(postings[1:], start=1):
+                starts.intersection_update(position - offset for position in sections[section_id])
+                if not starts:
+                    break
+            if starts:
+                frequencies[section_id] = len(starts)
+        return frequencies
+
+    def parse_query(self, query):
+        """
+          Splits a query into clauses: quoted phrases and single terms. A
+          trailing `*` makes the last term of a clause a prefix. Each clause
+          is a tuple of terms.
+        """
+        clauses = []
+        for phrase, word in self.QUERY_REGEX.findall(query):
+            text = phrase or word
+            terms = self.terms(text)
+            if not terms:
+                continue
+            if text.endswith("*"):
+                terms[-1] += "*"
+            if phrase:
+                clauses.append(tuple(terms))
+            else:
+                clauses.extend((term,) for term in terms[:-1])
+                clauses.append((terms[-1],))
+        return clauses
+
+    def search(self, query, limit=10):
+        """
+          Ranks the sections matching any clause of `query` by BM25, treating
+          each phrase as a single term. Returns up to `limit` (document,
+          ordinal, score) tuples, best first.
+        """
+        if not self._live_sections:
+            return []
+        average_length = self._total_length / self._live_sections or 1
+        scores = {}
+        for clause in self.parse_query(query):
+            if len(clause) > 1 and clause[-1].endswith("*"):
+                frequencies = {}
+                for expanded in self.expand_prefix(clause[-1][:-1]):
+                    for section_id, count in self.phrase_frequencies(clause[:-1] + (expanded,)).items():
+                        frequencies[section_id] = frequencies.get(section_id, 0) + count
+            else:
+                frequencies = self.phrase_frequencies(clause)
+            if not frequencies:
+                continue
+            idf = math.log(1 + (self._live_sections - len(frequencies) + 0.5) / (len(frequencies) + 0.5))
+            for section_id, frequency in frequencies.items():
+                norm = self.K1 * (1 - self.B + self.B * self.lengths[section_id] / average_length)
+                score = idf * frequency * (self.K1 + 1) / (frequency + norm)
+                scores[section_id] = scores.get(section_id, 0.0) + score
+
+        best = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        return [(*self.sections[section_id], score) for section_id, score in best]
+
+    def save(self, path):
+        path = Path(path)
+        state = {
+            # JSON object keys are strings, so each term's postings are a
+            # list of [section id, positions] pairs.
+            'postings': {term: list(sections.items()) for term, sections in self.postings.items()},
+            'sections': self.sections,
+            'lengths': self.lengths,
+        }
+        encoded = json.dumps(state, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        data = self.HEADER.pack(self.MAGIC, self.FORMAT_VERSION) + zlib.compress(encoded, self.COMPRESSION_LEVEL)
+        # Write then rename so an interrupted save never leaves a truncated index.
+        partial = path.with_suffix('.partial')
+        partial.write_bytes(data)
+        partial.replace(path)
+
+    @classmethod
+    def load(cls, path):
+        data = Path(path).read_bytes()
+        if len(data) < cls.HEADER.size:
+            raise ValueError(f"{path} is not a text index")
+        magic, version = cls.HEADER.unpack_from(data, 0)
+        if magic != cls.MAGIC:
+            raise ValueError(f"{path} is not a text index")
+        if version != cls.FORMAT_VERSION:
+            raise ValueError(f"unsupported text index format {version}, expected {cls.FORMAT_VERSION}")
+        try:
+            state = json.loads(zlib.decompress(data[cls.HEADER.size:]))
+            postings, sections, lengths = cls._validated(state)
+        except (zlib.error, ValueError, TypeError, KeyError) as error:
+            raise ValueError(f"{path}: text index is corrupt ({error})") from None
+
+        index = cls()
+        index.postings = postings
+        index.sections = sections
+        index.lengths = lengths
+        for section_id, key in enumerate(sections):
+            if key is not None:
+                index._section_ids[key] = section_id
+                index._live_sections += 1
+                index._total_length += lengths[section_id]
+        return index
+
+    @staticmethod
+    def _validated(state):
+        """
+          The postings, sections and lengths of a decoded index, checked to
+          be of the shape `save` writes. Raises ValueError otherwise.
+        """
+        def check(condition, what):
+            if not condition:
+                raise ValueError(f"bad {what}")
+
+        def is_count(value):
+            return type(value) is int and value >= 0
+
+        check(isinstance(state, dict), "index")
+        sections, lengths = state['sections'], state['lengths']
+        check(isinstance(sections, list) and isinstance(lengths, list) and len(sections) == len(lengths), "sections")
+        keys = []
+        for key in sections:
+            if key is None:
+                keys.append(None)
+                continue
+            check(isinstance(key, list) and len(key) == 2 and isinstance(key[0], str) and is_count(key[1]), "section")
+            keys.append(tuple(key))
+        check(all(is_count(length) for length in lengths), "lengths")
+
+        postings = {}
+        check(isinstance(state['postings'], dict), "postings")
+        for term, entries in state['postings'].items():
+            check(isinstance(entries, list), f"postings of {term!r}")
+            sections_of_term = postings[term] = {}
+            for entry in entries:
+                check(isinstance(entry, list) and len(entry) == 2, f"postings of {term!r}")
+                section_id, positions = entry
+                check(is_count(section_id) and section_id < len(keys), f"section id of {term!r}")
+                check(isinstance(positions, list) and all(is_count(position) for position in positions), f"positions of {term!r}")
+                sections_of_term[section_id] = positions
+        return postings, keys, lengths
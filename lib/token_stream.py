@@ -0,0 +1,155 @@
+import json
+import struct
+import zlib
+
+def encode_word(word):
+    """
+      A compact tuple of everything the parser reads from `word` (see
+      `page_record.word_key`): the char texts and sizes of a word with chars,
+      or the size summary of a lean or columnar word. Char texts are left out
+      when they spell the word's text, as they almost always do.
+    """
+    if 'chars' in word:
+        chars = word['chars']
+        char_texts = [char['text'] for char in chars]
+        if ''.join(char_texts) == word['text']:
+            char_texts = None
+        return (
+            word['text'], word['fontname'], word['x0'], word['x1'], word['bottom'],
+            tuple(char['size'] for char in chars), char_texts,
+        )
+    return (
+        word['text'], word['fontname'], float(word['x0']), float(word['x1']), float(word['bottom']),
+        float(word['size']), float(word['min_size']), bool(word['uniform_size']),
+        tuple(float(step) for step in word['size_steps']),
+    )
+
+def decode_word(encoded):
+    """
+      Rebuilds a word dict from `encode_word`. Words with chars get chars
+      holding only their text and size; the parser reads nothing else.
+    """
+    if not isinstance(encoded, (list, tuple)) or len(encoded) not in (7, 9):
+        raise ValueError(f"not an encoded word: {encoded!r}")
+    if len(encoded) == 7:
+        text, fontname, x0, x1, bottom, sizes, char_texts = encoded
+        if char_texts is None:
+            char_texts = text
+        return {
+            'text': text, 'fontname': fontname, 'x0': x0, 'x1': x1, 'bottom': bottom,
+            'chars': [{'text': char, 'size': size} for char, size in zip(char_texts, sizes)],
+        }
+    text, fontname, x0, x1, bottom, size, min_size, uniform_size, steps = encoded
+    return {
+        'text': text, 'fontname': fontname, 'x0': x0, 'x1': x1, 'bottom': bottom,
+        'size': size, 'min_size': min_size, 'uniform_size': uniform_size, 'size_steps': tuple(steps),
+    }
+
+class TokenStreamWriter:
+    """
+      Records the word stream a `Document` parses, page by page, to a token
+      stream file; pass one to `Document` as `recorder`. The words are reduced
+      to what the parser reads, so the file holds nothing beyond the text and
+      layout of the bill.
+
+      The file is a header followed by one frame per page: its length and the
+      zlib-compressed JSON of the page width and its encoded words (see
+      `encode_word`). Pages are written as they are added. The format holds
+      data only, so opening a stream from anyone is safe.
+    """
+    MAGIC = b'BILLTOK\0'
+    VERSION = 3
+    # magic, version.
+    HEADER = struct.Struct('<8sI')
+    # length of the compressed page that follows.
+    FRAME = struct.Struct('<I')
+    COMPRESSION_LEVEL = 6
+
+    def __init__(self, path):
+        self._file = open(path, 'wb')
+        self._file.write(self.HEADER.pack(self.MAGIC, self.VERSION))
+        self.page_count = 0
+        self.word_count = 0
+
+    def add_page(self, words, *, width):
+        page = (width, [encode_word(word) for word in words])
+        encoded = json.dumps(page, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        data = zlib.compress(encoded, self.COMPRESSION_LEVEL)
+        self._file.write(self.FRAME.pack(len(data)))
+        self._file.write(data)
+        self.page_count += 1
+        self.word_count += len(page[1])
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+class TokenStream:
+    """
+      A token stream file written by `TokenStreamWriter`, decoded into memory
+      when opened so that replaying it does no I/O and no decoding. Like
+      `SyntheticBill`, it yields (width, words) pairs and can `feed` a
+      `Document`; the document ends up exactly as when the stream was
+      recorded.
+    """
+    def __init__(self, path):
+        with open(path, 'rb') as file:
+            data = file.read()
+        if len(data) < TokenStreamWriter.HEADER.size:
+            raise ValueError(f"{path} is not a token stream")
+        magic, version = TokenStreamWriter.HEADER.unpack_from(data, 0)
+        if magic != TokenStreamWriter.MAGIC:
+            raise ValueError(f"{path} is not a token stream")
+        if version != TokenStreamWriter.VERSION:
+            raise ValueError(f"unsupported token stream version {version}, expected {TokenStreamWriter.VERSION}")
+
+        self._pages = []
+        offset = TokenStreamWriter.HEADER.size
+        while offset < len(data):
+            try:
+                (length,) = TokenStreamWriter.FRAME.unpack_from(data, offset)
+                offset += TokenStreamWriter.FRAME.size
+                if offset + length > len(data):
+                    raise ValueError("truncated")
+                width, words = json.loads(zlib.decompress(data[offset:offset + length]))
+                page = (float(width), [decode_word(word) for word in words])
+            except (struct.error, zlib.error, ValueError, TypeError) as error:
+                raise ValueError(f"{path}: page {len(self._pages) + 1} is corrupt ({error})") from None
+            self._pages.append(page)
+            offset += length
+        self.word_count = sum(len(words) for _, words in self._pages)
+
+    def __len__(self):
+        return len(self._pages)
+
+    def __iter__(self):
+        return self.pages()
+
+    def pages(self):
+        """
+          Yields a (width, words) pair for every page.
+        """
+        return iter(self._pages)
+
+    def feed(self, document):
+        """
+          Parses the whole stream into `document` and returns it.
+        """
+        for width, words in self._pages:
+            document.add_words(words, width=width)
+        return document
+
+    @classmethod
+    def record(cls, path, pages):
+        """
+          Writes `pages`, (width, words) pairs, to the token stream file
+          `path`.
+        """
+        with TokenStreamWriter(path) as writer:
+            for width, words in pages:
+                writer.add_page(words, width=width)
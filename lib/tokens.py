@@ -0,0 +1,63 @@
+from concurrent.futures import ThreadPoolExecutor
+import tiktoken
+
+_ENCODERS = {}
+
+def encoder_for(model):
+    """
+      Returns the tiktoken encoder for `model`, loading it only once per
+      process.
+    """
+    try:
+        return _ENCODERS[model]
+    except KeyError:
+        encoder = _ENCODERS[model] = tiktoken.encoding_for_model(model)
+        return encoder
+
+def register_encoder(model, encoder):
+    """
+      Registers `encoder` (anything with tiktoken's `encode`) for `model`,
+      replacing any encoder already loaded for it.
+    """
+    _ENCODERS[model] = encoder
+
+def count_tokens(items, model="gpt-4o", workers=4, batch_size=64):
+    """
+      Counts the tokens of many sections (each with its whole subtree) or
+      `Chunk`s at once, encoding batches of texts on a pool of `workers`
+      threads; tiktoken releases the GIL while encoding, so the batches run
+      in parallel.
+
+      Counts are written back: sections get their cached own and subtree
+      counts (sections already counted are skipped) and chunks get their
+      `token_count`. Returns the count of each item.
+    """
+    sections = []
+    chunks = []
+    for item in items:
+        if hasattr(item, 'walk'):
+            sections.extend(section for section in item.walk() if not section.has_own_token_count(model))
+        else:
+            chunks.append(item)
+
+    texts = [section.own_text() for section in sections] + [chunk.text() for chunk in chunks]
+    counts = _encoded_lengths(encoder_for(model), texts, workers, batch_size)
+
+    for section, count in zip(sections, counts):
+        section.cache_own_token_count(model, count)
+    for chunk, count in zip(chunks, counts[len(sections):]):
+        chunk.token_count = count
+
+    return [item.token_count(model) if hasattr(item, 'walk') else item.token_count for item in items]
+
+def _encoded_lengths(encoder, texts, workers, batch_size):
+    def encode_batch(batch):
+        return [len(encoder.encode(text)) for text in batch]
+
+    batches = [texts[start:start + batch_size] for start in range(0, len(texts), batch_size)]
+    if workers <= 1 or len(batches) <= 1:
+        results = map(encode_batch, batches)
+        return [count for batch in results for count in batch]
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return [count for batch in executor.map(encode_batch, batches) for count in batch]
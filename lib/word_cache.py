@@ -0,0 +1,108 @@
+import hashlib
+import json
+import os
+import pickle
+import zlib
+from pathlib import Path
+import pdfplumber
+from .extraction import EXTRACT_WORDS_OPTIONS
+
+class WordCache:
+    """
+      Persistent cache of the words extracted from each page of a PDF.
+
+      Entries are keyed by the SHA-256 of the file contents, the page index and
+      the extraction parameters (including lean mode and the pdfplumber
+      version), so editing the heading rules never invalidates them but
+      changing how words are extracted does. Each page is stored as a
+      zlib-compressed pickle of its (width, words) pair.
+    """
+    # 2: lean words carry `size_steps`.
+    FORMAT_VERSION = 2
+    COMPRESSION_LEVEL = 6
+
+    def __init__(self, directory=None):
+        self.directory = Path(directory) if directory is not None else self.default_directory()
+        self.hits = 0
+        self.misses = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+
+    @staticmethod
+    def default_directory():
+        base = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+        return Path(base) / 'bill-ai' / 'words'
+
+    @classmethod
+    def parameters_digest(cls, options=EXTRACT_WORDS_OPTIONS, lean=False):
+        parameters = {
+            'format': cls.FORMAT_VERSION,
+            'pdfplumber': pdfplumber.__version__,
+            'options': options,
+            'lean': lean,
+        }
+        encoded = json.dumps(parameters, sort_keys=True, ensure_ascii=False).encode()
+        return hashlib.sha256(encoded).hexdigest()[:16]
+
+    @classmethod
+    def key(cls, path, lean=False):
+        """
+          The key for the pages of the PDF at `path` extracted with the given
+          parameters, to pass to the other methods.
+        """
+        return f'{cls.digest(path)}/{cls.parameters_digest(lean=lean)}'
+
+    @staticmethod
+    def digest(path):
+        hasher = hashlib.sha256()
+        with open(path, 'rb') as file:
+            for block in iter(lambda: file.read(1 << 20), b''):
+                hasher.update(block)
+        return hasher.hexdigest()
+
+    def page_count(self, key):
+        path = self._entry_directory(key) / 'pages'
+        try:
+            return int(path.read_text())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def put_page_count(self, key, count):
+        path = self._entry_directory(key) / 'pages'
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(str(count))
+
+    def missing(self, key, count):
+        missing = [index for index in range(count) if not self._page_path(key, index).exists()]
+        self.misses += len(missing)
+        return missing
+
+    def get(self, key, index):
+        data = self._page_path(key, index).read_bytes()
+        self.hits += 1
+        self.bytes_read += len(data)
+        return pickle.loads(zlib.decompress(data))
+
+    def put(self, key, index, width, words):
+        path = self._page_path(key, index)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = zlib.compress(pickle.dumps((width, words), protocol=pickle.HIGHEST_PROTOCOL), self.COMPRESSION_LEVEL)
+        # Write then rename so an interrupted run never leaves a truncated entry.
+        partial = path.with_suffix('.partial')
+        partial.write_bytes(data)
+        partial.replace(path)
+        self.bytes_written += len(data)
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'bytes_read': self.bytes_read,
+            'bytes_written': self.bytes_written,
+        }
+
+    def _entry_directory(self, key):
+        return self.directory / key
+
+    def _page_path(self, key, index):
+        return self._entry_directory(key) / f'{index}.bin'
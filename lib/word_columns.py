@@ -0,0 +1,129 @@
+import sys
+from collections.abc import Mapping
+import numpy as np
+from .content_group import word_sizes, word_size_steps
+
+class WordColumns:
+    """
+      Struct-of-arrays representation of the words on one page.
+
+      Positions and char sizes live in NumPy arrays, font names are interned
+      and referenced by id, and all word texts share a single string buffer
+      addressed by offsets, as do the size steps of all words. Iterating yields `ColumnarWord` views, which can be
+      passed to `Document.add_token`, `HeadingAccumulator.add` and
+      `ContentGroup` in place of pdfplumber word dicts.
+    """
+    def __init__(self, *, x0, x1, bottom, size, min_size, uniform_size, steps, step_offsets, font_ids, fonts, text, offsets):
+        self.x0 = x0
+        self.x1 = x1
+        self.bottom = bottom
+        self.size = size
+        self.min_size = min_size
+        self.uniform_size = uniform_size
+        self.steps = steps
+        self.step_offsets = step_offsets
+        self.font_ids = font_ids
+        self.fonts = fonts
+        self.text = text
+        self.offsets = offsets
+
+    @classmethod
+    def from_words(cls, words):
+        count = len(words)
+        x0 = np.empty(count, dtype=np.float64)
+        x1 = np.empty(count, dtype=np.float64)
+        bottom = np.empty(count, dtype=np.float64)
+        size = np.empty(count, dtype=np.float64)
+        min_size = np.empty(count, dtype=np.float64)
+        uniform_size = np.empty(count, dtype=np.bool_)
+        font_ids = np.empty(count, dtype=np.int32)
+        offsets = np.empty(count + 1, dtype=np.int64)
+        step_offsets = np.empty(count + 1, dtype=np.int64)
+        fonts = {}
+        texts = []
+        steps = []
+        offset = 0
+
+        for index, word in enumerate(words):
+            first, smallest, uniform = word_sizes(word)
+            x0[index] = word['x0']
+            x1[index] = word['x1']
+            bottom[index] = word['bottom']
+            size[index] = first
+            min_size[index] = smallest
+            uniform_size[index] = uniform
+            step_offsets[index] = len(steps)
+            steps.extend(word_size_steps(word))
+            font_ids[index] = fonts.setdefault(sys.intern(word['fontname']), len(fonts))
+            offsets[index] = offset
+            texts.append(word['text'])
+            offset += len(word['text'])
+        offsets[count] = offset
+        step_offsets[count] = len(steps)
+
+        return cls(
+            x0=x0, x1=x1, bottom=bottom, size=size, min_size=min_size, uniform_size=uniform_size,
+            steps=np.array(steps, dtype=np.float64), step_offsets=step_offsets,
+            font_ids=font_ids, fonts=tuple(fonts), text=''.join(texts), offsets=offsets,
+        )
+
+    def __len__(self):
+        return len(self.x0)
+
+    def __getitem__(self, index):
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return ColumnarWord(self, index)
+
+    def __iter__(self):
+        return (ColumnarWord(self, index) for index in range(len(self)))
+
+    @property
+    def nbytes(self):
+        arrays = (
+            self.x0, self.x1, self.bottom, self.size, self.min_size, self.uniform_size,
+            self.steps, self.step_offsets, self.font_ids, self.offsets,
+        )
+        return sum(array.nbytes for array in arrays) + sys.getsizeof(self.text)
+
+class ColumnarWord(Mapping):
+    """
+      Read-only view of one word in a `WordColumns`. Supports the subset of
+      pdfplumber word keys the parser reads, with the per-char sizes reduced
+      to `size` (first char), `min_size`, `uniform_size` and `size_steps`.
+    """
+    __slots__ = ('columns', 'index')
+
+    KEYS = ('text', 'x0', 'x1', 'bottom', 'fontname', 'size', 'min_size', 'uniform_size', 'size_steps')
+
+    def __init__(self, columns, index):
+        self.columns = columns
+        self.index = index
+
+    def __getitem__(self, key):
+        columns, index = self.columns, self.index
+        if key == 'text':
+            return columns.text[columns.offsets[index]:columns.offsets[index + 1]]
+        elif key == 'bottom':
+            return float(columns.bottom[index])
+        elif key == 'fontname':
+            return columns.fonts[columns.font_ids[index]]
+        elif key in {'x0', 'x1', 'size', 'min_size'}:
+            return float(getattr(columns, key)[index])
+        elif key == 'uniform_size':
+            return bool(columns.uniform_size[index])
+        elif key == 'size_steps':
+            return tuple(columns.steps[columns.step_offsets[index]:columns.step_offsets[index + 1]].tolist())
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        return key in self.KEYS
+
+    def __iter__(self):
+        return iter(self.KEYS)
+
+    def __len__(self):
+        return len(self.KEYS)
+
+    def __repr__(self):
+        return f'ColumnarWord(text={self["text"]!r}, index={self.index})'
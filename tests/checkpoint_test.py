@@ -0,0 +1,96 @@
+import pytest
+from lib import Checkpoint, Document
+
+def describe(document):
+    return {
+        section.ordinal: (section.heading_text(), section.tier, section.page, section.content_text())
+        for top in document.sections for section in top.walk()
+    }
+
+def tree_of(document):
+    return [
+        (section.ordinal, section.parent and section.parent.ordinal)
+        for top in document.sections for section in top.walk()
+    ]
+
+def headings_after(document, section_count):
+    return {ordinal: value for ordinal, value in describe(document).items() if ordinal >= section_count}
+
+@pytest.fixture(scope='module')
+def checkpointed(sample3_pages):
+    document = Document()
+    checkpoints = []
+    for width, words in sample3_pages:
+        document.add_words(words, width=width)
+        checkpoints.append(Checkpoint.loads(document.checkpoint().dumps()))
+    return document, checkpoints
+
+class TestCheckpoint:
+    @pytest.mark.parametrize('page', [1, 2, 10, 57, 100, 117])
+    def test_resume_matches_uninterrupted_parse(self, sample3_pages, checkpointed, page):
+        full, checkpoints = checkpointed
+        checkpoint = checkpoints[page - 1]
+        assert checkpoint.page_number == page
+
+        document = Document.resume(checkpoint)
+        for width, words in sample3_pages[page:]:
+            document.add_words(words, width=width)
+
+        assert document.section_count == full.section_count
+        assert document.retries == full.retries
+        assert document.fast_path_words == full.fast_path_words
+        resumed = describe(document)
+        expected = describe(full)
+        # The open sections and every section added after the checkpoint.
+        assert set(resumed) >= {ordinal for _, _, _, ordinal, _ in checkpoint.open_sections}
+        assert headings_after(document, checkpoint.section_count) == headings_after(full, checkpoint.section_count)
+        assert all(expected[ordinal] == value for ordinal, value in resumed.items())
+
+    @pytest.mark.parametrize('page', [1, 10, 57, 117])
+    def test_prepend_completes_the_resumed_parse(self, sample3_pages, checkpointed, page):
+        full, checkpoints = checkpointed
+        earlier = Document()
+        for width, words in sample3_pages[:page]:
+            earlier.add_words(words, width=width)
+        document = Document.resume(checkpoints[page - 1])
+        for width, words in sample3_pages[page:]:
+            document.add_words(words, width=width)
+
+        document.prepend(earlier)
+        assert describe(document) == describe(full)
+        assert tree_of(document) == tree_of(full)
+        assert [heading.text() for heading in document.headings] == [heading.text() for heading in full.headings]
+        assert document.page_retries == full.page_retries
+        assert document.page_fast_path_words == full.page_fast_path_words
+        with pytest.raises(ValueError):
+            document.prepend(earlier)
+
+    def test_checkpoints_are_small(self, checkpointed):
+        _, checkpoints = checkpointed
+        assert max(len(checkpoint.open_sections) for checkpoint in checkpoints) <= 5
+        assert all(len(checkpoint.dumps()) < 100_000 for checkpoint in checkpoints)
+
+    def test_save_and_load(self, checkpointed, tmp_path):
+        _, checkpoints = checkpointed
+        path = tmp_path / 'checkpoint'
+        checkpoints[40].save(path)
+        loaded = Checkpoint.load(path)
+        assert loaded.page_number == 41
+        assert loaded.section_count == checkpoints[40].section_count
+
+class TestFromPdfRange:
+    def test_page_range_from_checkpoint(self, sample3_path, checkpointed):
+        full, checkpoints = checkpointed
+        saved = []
+        document = Document.from_pdf_range(
+            sample3_path, start=checkpoints[49], stop=56, checkpoint_every=2, on_checkpoint=saved.append
+        )
+        assert document.page_number == 56
+        assert [checkpoint.page_number for checkpoint in saved] == [52, 54, 56]
+        assert saved[-1].section_count == checkpoints[55].section_count
+        expected = describe(full)
+        assert all(expected[ordinal][:3] == value[:3] for ordinal, value in describe(document).items())
+
+    def test_checkpoint_every_needs_on_checkpoint(self, sample3_path):
+        with pytest.raises(ValueError):
+            Document.from_pdf_range(sample3_path, stop=2, checkpoint_every=1)
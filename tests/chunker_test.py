@@ -0,0 +1,118 @@
+import pytest
+from lib import Section
+from lib.chunker import chunk_sections
+from lib.tokens import register_encoder, _ENCODERS
+
+class ByteEncoder:
+    """One token per UTF-8 byte, so characters can span tokens."""
+    def encode(self, text):
+        return list(text.encode('utf-8'))
+
+    def decode(self, tokens):
+        return bytes(tokens).decode('utf-8', errors='replace')
+
+    def decode_single_token_bytes(self, token):
+        return bytes([token])
+
+class WordEncoder:
+    def encode(self, text):
+        return text.split()
+
+    def decode(self, tokens):
+        return " ".join(tokens)
+
+@pytest.fixture(autouse=True)
+def encoder():
+    register_encoder('test-model', WordEncoder())
+    register_encoder('byte-model', ByteEncoder())
+    yield
+    del _ENCODERS['test-model']
+    del _ENCODERS['byte-model']
+
+def chunk(sections, budget):
+    return chunk_sections(sections, budget, model='test-model')
+
+@pytest.fixture
+def sections():
+    # Each section's own text is two words: its heading tag and its content.
+    return [
+        Section("A", tier=1, content="a", subsections=[
+            Section("A1", tier=2, content="a1"),
+            Section("A2", tier=2, content="a2"),
+            Section("A3", tier=2, content="a3"),
+        ]),
+        Section("B", tier=1, content="b"),
+        Section("C", tier=1, content="c"),
+    ]
+
+class TestChunkSections:
+    def test_everything_fits(self, sections):
+        chunks = chunk(sections, 100)
+        assert len(chunks) == 1
+        assert chunks[0].text() == "".join(section.text() for section in sections)
+        assert chunks[0].token_count == 12
+
+    def test_packs_adjacent_siblings(self, sections):
+        chunks = chunk(sections, 4)
+        # A's own text does not get a chunk of its own, but leads the chunk of
+        # the subsections after it.
+        assert [(c.path, [s.heading for s in c.sections]) for c in chunks] == [
+            ((), ["A", "A1"]),
+            (("A",), ["A2", "A3"]),
+            ((), ["B", "C"]),
+        ]
+        assert all(c.token_count <= 4 for c in chunks)
+
+    def test_preserves_text(self, sections):
+        chunks = chunk(sections, 4)
+        assert "".join(c.text() for c in chunks) == "".join(section.text() for section in sections)
+
+    def test_splits_oversized_content_at_paragraphs(self):
+        section = Section("Big", tier=1, content="one two\n\nthree four\n\nfive")
+        chunks = chunk([section], 3)
+        assert [c.text() for c in chunks] == ["<h1>Big<h1>\n\none two", "\n\nthree four\n\nfive\n\n"]
+        assert [c.path for c in chunks] == [(), ("Big",)]
+
+    def test_splits_oversized_paragraph_by_tokens(self):
+        section = Section("Big", tier=1, content="one two three four five")
+        chunks = chunk([section], 2)
+        assert all(c.token_count <= 2 for c in chunks)
+        assert " ".join(c.text().strip() for c in chunks).split() == section.text().split()
+
+    def test_own_text_packs_with_following_subsections(self):
+        section = Section("A", tier=1, content="one two three", subsections=[
+            Section("A1", tier=2, content="a1"),
+            Section("A2", tier=2, content="a2"),
+        ])
+        chunks = chunk([section], 5)
+        assert [(c.path, [s.heading for s in c.sections]) for c in chunks] == [
+            ((), ["A"]),
+            (("A",), ["A1", "A2"]),
+        ]
+        chunks = chunk([section], 6)
+        assert [(c.path, [s.heading for s in c.sections]) for c in chunks] == [
+            ((), ["A", "A1"]),
+            (("A",), ["A2"]),
+        ]
+
+    @pytest.mark.parametrize('budget', [1, 2, 3, 5])
+    def test_token_splits_keep_characters_whole(self, budget):
+        section = Section("Große", tier=1, content="Überschrift “zitat” für €5 ✓")
+        chunks = chunk_sections([section], budget, model='byte-model')
+        assert "".join(c.text() for c in chunks) == section.text()
+        assert not any("\ufffd" in c.text() for c in chunks)
+        if budget >= 3:
+            assert all(c.token_count <= budget for c in chunks)
+
+    def test_splits_parsed_words_at_lines(self):
+        words = [
+            {'text': 'first', 'bottom': 10}, {'text': 'line', 'bottom': 10},
+            {'text': 'second', 'bottom': 30}, {'text': 'line', 'bottom': 30},
+        ]
+        section = Section("Words", tier=1, content=words)
+        chunks = chunk([section], 3)
+        assert [c.text() for c in chunks] == ["<h1>Words<h1>\n\nfirst line", " second line\n\n"]
+
+    def test_invalid_budget(self, sections):
+        with pytest.raises(ValueError):
+            chunk(sections, 0)
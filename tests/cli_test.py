@@ -0,0 +1,111 @@
+import json
+import os
+import shutil
+import pytest
+from pathlib import Path
+from lib import Section
+from lib.cli import main, find_bills, section_tree
+
+FIXTURES = Path(__file__).parent.parent / 'fixtures'
+
+@pytest.fixture
+def bills(tmp_path):
+    directory = tmp_path / 'bills'
+    (directory / 'nested').mkdir(parents=True)
+    shutil.copy(FIXTURES / 'sample.pdf', directory / 'sample.pdf')
+    shutil.copy(FIXTURES / 'sample2.pdf', directory / 'nested' / 'sample2.pdf')
+    (directory / 'notes.txt').write_text("not a bill")
+    return directory
+
+class TestCli:
+    def test_find_bills(self, bills):
+        assert find_bills([bills, bills / 'sample.pdf']) == [bills / 'nested' / 'sample2.pdf', bills / 'sample.pdf']
+        with pytest.raises(FileNotFoundError):
+            find_bills([bills / 'missing.pdf'])
+
+    def test_writes_outputs(self, sample3_path, tmp_path, capsys):
+        output = tmp_path / 'output'
+        assert main([sample3_path, '-o', str(output), '-j', '1']) == 0
+        directory = output / 'sample3'
+        assert sorted(path.name for path in directory.iterdir()) == [
+            'headings.txt', 'manifest.json', 'sections.json', 'text.txt',
+        ]
+        headings = (directory / 'headings.txt').read_text().splitlines()
+        tree = json.loads((directory / 'sections.json').read_text())
+        assert headings[0] == f"{'#' * tree[0]['tier']} {tree[0]['heading']}"
+        assert set(tree[0]) == {'heading', 'tier', 'page', 'content', 'subsections'}
+        assert tree[0]['heading'] in (directory / 'text.txt').read_text()
+        assert "1 bills, 118 pages" in capsys.readouterr().err
+
+    def test_format(self, bills, tmp_path):
+        output = tmp_path / 'output'
+        main([str(bills / 'nested'), '-o', str(output), '--format', 'markdown', '--quiet'])
+        assert (output / 'sample2' / 'text.md').exists()
+
+    def test_skips_bills_that_are_up_to_date(self, bills, tmp_path, capsys):
+        output = tmp_path / 'output'
+        main([str(bills), '-o', str(output), '-j', '1'])
+        capsys.readouterr()
+
+        main([str(bills), '-o', str(output), '-j', '1'])
+        assert capsys.readouterr().err == "2 of 2 bills up to date\n"
+
+        # A changed bill, or different options, means parsing again.
+        stat = (bills / 'sample.pdf').stat()
+        os.utime(bills / 'sample.pdf', ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+        main([str(bills), '-o', str(output), '-j', '1'])
+        err = capsys.readouterr().err
+        assert "1 of 2 bills up to date" in err
+        assert "sample.pdf: 1 pages" in err
+
+        main([str(bills), '-o', str(output), '-j', '1', '--lean'])
+        assert "up to date" not in capsys.readouterr().err
+
+        main([str(bills), '-o', str(output), '-j', '1', '--lean', '--force'])
+        assert "up to date" not in capsys.readouterr().err
+
+    def test_interrupted_bill_is_parsed_again(self, bills, tmp_path, capsys):
+        output = tmp_path / 'output'
+        main([str(bills), '-o', str(output), '-j', '1'])
+        (output / 'sample' / 'manifest.json').unlink()
+        capsys.readouterr()
+        main([str(bills), '-o', str(output), '-j', '1'])
+        assert "1 of 2 bills up to date" in capsys.readouterr().err
+
+    def test_worker_pool(self, bills, tmp_path):
+        serial = tmp_path / 'serial'
+        parallel = tmp_path / 'parallel'
+        main([str(bills), '-o', str(serial), '-j', '1', '--quiet'])
+        assert main([str(bills), '-o', str(parallel), '-j', '2', '--quiet']) == 0
+        for name in ('sample', 'sample2'):
+            for output in ('headings.txt', 'sections.json', 'text.txt'):
+                assert (parallel / name / output).read_text() == (serial / name / output).read_text()
+
+    def test_failures(self, bills, tmp_path, capsys):
+        (bills / 'broken.pdf').write_bytes(b'not a pdf')
+        output = tmp_path / 'output'
+        assert main([str(bills), '-o', str(output), '-j', '1']) == 1
+        assert "broken.pdf: failed" in capsys.readouterr().err
+        assert not (output / 'broken' / 'manifest.json').exists()
+        assert (output / 'sample2' / 'manifest.json').exists()
+
+    def test_bills_with_the_same_name(self, bills, tmp_path):
+        shutil.copy(bills / 'sample.pdf', bills / 'nested' / 'sample.pdf')
+        with pytest.raises(SystemExit):
+            main([str(bills), '-o', str(tmp_path / 'output')])
+
+    def test_section_tree(self):
+        root = Section("Root", tier=1, content="root text")
+        parent = root
+        for depth in range(2, 3000):
+            child = Section(f"Level {depth}", tier=depth, content=f"text {depth}")
+            parent.add_subsection(child)
+            parent = child
+        tree = section_tree(root)
+        assert (tree['heading'], tree['tier'], tree['content']) == ("Root", 1, "root text")
+        depth = 1
+        while tree['subsections']:
+            [tree] = tree['subsections']
+            depth += 1
+        assert (tree['heading'], tree['content']) == ("Level 2999", "text 2999")
+        assert depth == 2999
@@ -0,0 +1,13 @@
+import pytest
+from pathlib import Path
+from lib.extraction import extract_pages
+
+FIXTURES = Path(__file__).parent.parent / 'fixtures'
+
+@pytest.fixture(scope='session')
+def sample3_path():
+    return str(FIXTURES / 'sample3.pdf')
+
+@pytest.fixture(scope='session')
+def sample3_pages(sample3_path):
+    return list(extract_pages(sample3_path))
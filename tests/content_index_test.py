@@ -0,0 +1,30 @@
+import itertools
+import pytest
+from lib import Casing, ContentCharacteristics
+from lib.content_descriptors import CONTENT_TYPES
+from lib.content_index import ContentTypeIndex, CONTENT_TYPE_INDEX
+
+FONTS = sorted({characteristics.font for characteristics in CONTENT_TYPES.values()}) + ['Unknown-Font']
+SIZES = [9.0, 9.95, 10.0, 10.05, 10.1, 10.5, 10.55, 12.0, 13.95, 14.0, 14.04, 14.1, 18.0]
+
+def brute_force(candidate, **kwargs):
+    return frozenset(
+        content_type for content_type, characteristics in CONTENT_TYPES.items()
+        if characteristics.characteristics_match(candidate, **kwargs)
+    )
+
+class TestContentTypeIndex:
+    @pytest.mark.parametrize('font,size,casing', list(itertools.product(FONTS, SIZES, list(Casing))))
+    def test_matches_linear_scan(self, font, size, casing):
+        candidate = ContentCharacteristics(font, size, casing=casing)
+        assert CONTENT_TYPE_INDEX.matches(candidate) == brute_force(candidate)
+        assert CONTENT_TYPE_INDEX.matches_accepting_unknown_casing(candidate) == brute_force(
+            candidate, accept_casing=[Casing.UNKNOWN]
+        )
+
+    def test_lookups_are_memoized(self):
+        index = ContentTypeIndex(CONTENT_TYPES)
+        assert index.matches(ContentCharacteristics('Unknown-Font', 14.0)) == frozenset()
+        assert index.lookup(ContentCharacteristics('JJGECB+DeVinne', 14.0, casing=Casing.NORMAL)) is index.lookup(
+            ContentCharacteristics('JJGECB+DeVinne', 14.0, casing=Casing.NORMAL)
+        )
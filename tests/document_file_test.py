@@ -0,0 +1,88 @@
+import io
+import pytest
+from lib import Document, DocumentFile, Section, render
+from lib.section_tree import SectionTreeBuilder
+
+def build(headings):
+    builder = SectionTreeBuilder()
+    for page, (heading, tier, content) in enumerate(headings, start=1):
+        section = Section(heading, tier=tier, content=content)
+        section.page = page
+        builder.add(section)
+    return builder.sections
+
+SECTIONS = [
+    ('DIVISION A', 1, 'Intro'),
+    ('SEC. 101.', 2, 'First — section.'),
+    ('SEC. 102.', 2, None),
+    ('DIVISION B', 1, 'More'),
+    ('SEC. 101.', 3, 'Another first section.'),
+]
+
+@pytest.fixture
+def document_file(tmp_path):
+    path = tmp_path / 'bill.doc'
+    DocumentFile.write(path, build(SECTIONS), page_count=9)
+    with DocumentFile(path) as document_file:
+        yield document_file
+
+class TestDocumentFile:
+    def test_tree(self, document_file):
+        assert len(document_file) == 5
+        assert document_file.page_count == 9
+        assert [(view.heading_text(), view.tier) for view in document_file.sections] == [('DIVISION A', 1), ('DIVISION B', 1)]
+        division = document_file.sections[0]
+        assert [view.heading_text() for view in division.subsections] == ['SEC. 101.', 'SEC. 102.']
+        assert division.subsections[1].parent.ordinal == 0
+        assert [view.page for view in division.walk()] == [1, 2, 3]
+
+    def test_content(self, document_file):
+        view = document_file.section(1)
+        content = view.content_bytes()
+        assert isinstance(content, memoryview)
+        assert bytes(content) == 'First — section.'.encode('utf-8')
+        content.release()
+        assert view.content_text() == 'First — section.'
+        assert document_file.section(2).content_text() == ''
+
+    def test_find(self, document_file):
+        assert [view.ordinal for view in document_file.find('SEC. 101.')] == [1, 4]
+        assert [view.ordinal for view in document_file.find('DIVISION B')] == [3]
+        assert document_file.find('SEC. 103.') == []
+
+    @pytest.mark.parametrize('format', ['tagged', 'markdown', 'jsonl'])
+    def test_renders_like_sections(self, document_file, format):
+        expected = io.StringIO()
+        render(build(SECTIONS), expected, format)
+        rendered = io.StringIO()
+        document_file.render(rendered, format)
+        assert rendered.getvalue() == expected.getvalue()
+
+    def test_rejects_other_files(self, tmp_path):
+        path = tmp_path / 'other.doc'
+        path.write_bytes(b'not a document file' * 4)
+        with pytest.raises(ValueError):
+            DocumentFile(path)
+
+    @pytest.mark.parametrize('data', [b'', b'BILLDOC\0', b'BILLDOC\0' + bytes(DocumentFile.HEADER.size - 9)])
+    def test_rejects_short_files(self, tmp_path, monkeypatch, data):
+        closed = []
+        close = DocumentFile.close
+        monkeypatch.setattr(DocumentFile, 'close', lambda self: closed.append(close(self)))
+        path = tmp_path / 'short.doc'
+        path.write_bytes(data)
+        with pytest.raises(ValueError, match='not a document file'):
+            DocumentFile(path)
+        assert len(closed) == (1 if data else 0)
+
+class TestDocumentSave:
+    def test_round_trip(self, sample3_pages, tmp_path):
+        document = Document()
+        for width, words in sample3_pages:
+            document.add_words(words, width=width)
+        path = tmp_path / 'sample3.doc'
+        document.save(path)
+
+        with DocumentFile(path) as document_file:
+            assert document_file.page_count == 118
+            assert [view.text() for view in document_file.sections] == [section.text() for section in document.sections]
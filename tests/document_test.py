@@ -0,0 +1,226 @@
+import copy
+import io
+import pytest
+from lib import Document
+from lib.content_group import word_size_steps
+from lib.extraction import open_pages
+from lib.page_record import page_doctop, words_fingerprint
+
+def headings_of(document):
+    return [(heading.text(), heading.tier) for heading in document.headings]
+
+def document_from(pages):
+    document = Document()
+    for width, words in pages:
+        document.add_words(words, width=width)
+    return document
+
+def rendered(document):
+    sink = io.StringIO()
+    document.render(sink)
+    return sink.getvalue()
+
+@pytest.fixture(scope='module')
+def serial_document(sample3_pages):
+    return document_from(sample3_pages)
+
+class TestDocument:
+    def test_sections(self, serial_document):
+        assert len(serial_document.headings) == 266
+        assert [section.tier for section in serial_document.sections] == [4, 3, 3, 3, 2, 1, 1, 1, 1, 1, 1, 1, 1]
+        assert serial_document.sections[0].heading.text() == 'IN THE HOUSE OF REPRESENTATIVES'
+
+    def test_retries_are_counted_per_page(self, serial_document):
+        assert len(serial_document.page_retries) == 118
+        assert sum(serial_document.page_retries) == serial_document.retries
+        assert serial_document.retries > 0
+
+    def test_from_pdf_in_parallel(self, sample3_path, serial_document):
+        document = Document.from_pdf(sample3_path, jobs=2)
+        assert headings_of(document) == headings_of(serial_document)
+        assert [s.tier for s in document.sections] == [s.tier for s in serial_document.sections]
+
+class FakePage:
+    def __init__(self, width, words):
+        self.width = width
+        self.words = words
+        self.closed = False
+
+    def extract_words(self, **kwargs):
+        return self.words
+
+    def close(self):
+        self.closed = True
+
+class FakePDF:
+    def __init__(self, pages):
+        self.pages = [FakePage(width, words) for width, words in pages]
+
+class TestIterSections:
+    def test_matches_serial_sections(self, sample3_pages, serial_document):
+        document = Document()
+        sections = list(document.iter_sections(FakePDF(sample3_pages)))
+        assert [(s.heading.text(), s.tier) for s in sections] == [
+            (s.heading.text(), s.tier) for s in serial_document.sections
+        ]
+        assert [s.content for s in sections] == [s.content for s in serial_document.sections]
+
+    def test_releases_pages_and_sections(self, sample3_pages):
+        document = Document()
+        pdf = FakePDF(sample3_pages)
+        for section in document.iter_sections(pdf):
+            assert section not in document.sections
+            assert len(document.headings) <= 1
+        assert document.pages == []
+        assert document.sections == []
+        assert all(page.closed for page in pdf.pages)
+
+class TestLeanWords:
+    def test_headings_match_full_words(self, sample3_pages, serial_document):
+        lean_pages = []
+        for width, words in sample3_pages:
+            lean_words = []
+            for word in words:
+                sizes = [char['size'] for char in word['chars']]
+                lean_word = {key: value for key, value in word.items() if key != 'chars'}
+                lean_word.update(
+                    size=sizes[0], min_size=min(sizes), uniform_size=len(set(sizes)) == 1,
+                    size_steps=word_size_steps(word),
+                )
+                lean_words.append(lean_word)
+            lean_pages.append((width, lean_words))
+
+        assert headings_of(document_from(lean_pages)) == headings_of(serial_document)
+
+class TestFastPath:
+    def test_body_lines_skip_the_accumulator(self, serial_document):
+        assert serial_document.fast_path_words > 0
+        assert sum(serial_document.page_fast_path_words) == serial_document.fast_path_words
+        assert len(serial_document.page_fast_path_words) == 118
+
+    def test_matches_regular_path(self, sample3_pages, serial_document, monkeypatch):
+        monkeypatch.setattr('lib.heading_accumulator.HeadingAccumulator.rejects_as_first_word', classmethod(lambda cls, word: False))
+        document = document_from(sample3_pages)
+        assert document.fast_path_words == 0
+        assert headings_of(document) == headings_of(serial_document)
+        assert [s.content for s in document.sections] == [s.content for s in serial_document.sections]
+
+def recorded_document_from(pages):
+    document = Document(record_pages=True)
+    for width, words in pages:
+        document.add_words(words, width=width)
+    return document
+
+def amend_word(pages, page_index, word_index, text):
+    pages = list(pages)
+    width, words = pages[page_index]
+    words = copy.deepcopy(words)
+    word = words[word_index]
+    word['text'] = text
+    word['chars'] = [dict(word['chars'][0], text=c) for c in text]
+    pages[page_index] = (width, words)
+    return pages
+
+@pytest.fixture(scope='module')
+def recorded_document(sample3_pages):
+    return recorded_document_from(sample3_pages)
+
+class TestIncrementalUpdate:
+    def update(self, previous, pages, doctops=None):
+        loaded = []
+        def load_page(index):
+            loaded.append(index)
+            return pages[index]
+        fingerprints = [words_fingerprint(words, width) for width, words in pages]
+        return Document.update(previous, fingerprints, load_page, doctops), loaded
+
+    def assert_matches_full_parse(self, document, pages):
+        full = document_from(pages)
+        assert headings_of(document) == headings_of(full)
+        assert [s.tier for s in document.sections] == [s.tier for s in full.sections]
+        assert rendered(document) == rendered(full)
+
+    def test_recording_does_not_change_the_parse(self, recorded_document, serial_document):
+        assert len(recorded_document.page_records) == 118
+        assert rendered(recorded_document) == rendered(serial_document)
+
+    def test_unchanged_bill_is_replayed(self, sample3_pages, recorded_document):
+        document, loaded = self.update(recorded_document, sample3_pages)
+        assert loaded == []
+        assert document.replayed_pages == 118
+        assert document.retries == recorded_document.retries
+        self.assert_matches_full_parse(document, sample3_pages)
+
+    @pytest.mark.parametrize('page_index,word_index,text', [
+        (0, 0, 'Amended'),
+        (40, 3, 'amended'),
+        (59, 0, 'SEC.'),
+        (117, 5, 'TITLE'),
+    ])
+    def test_amended_word(self, sample3_pages, recorded_document, page_index, word_index, text):
+        pages = amend_word(sample3_pages, page_index, word_index, text)
+        document, loaded = self.update(recorded_document, pages)
+        assert page_index in loaded
+        assert len(loaded) <= 3
+        self.assert_matches_full_parse(document, pages)
+
+    def test_removed_and_inserted_pages(self, sample3_pages, recorded_document):
+        pages = sample3_pages[:20] + sample3_pages[21:70] + sample3_pages[65:70] + sample3_pages[70:]
+        document, loaded = self.update(recorded_document, pages)
+        assert len(loaded) < 10
+        self.assert_matches_full_parse(document, pages)
+
+    def test_inserted_pages_move_the_words_after_them(self, sample3_pages, recorded_document):
+        # As extracted from a new version with pages 65-69 repeated after
+        # page 69: every page from there on starts further down the bill.
+        height = page_doctop(sample3_pages[1][1])
+        def moved(word, index):
+            return dict(word, doctop=word['top'] + index * height)
+        pages = [
+            (width, [
+                dict(moved(word, index), chars=[moved(char, index) for char in word['chars']])
+                for word in words
+            ])
+            for index, (width, words) in enumerate(sample3_pages[:70] + sample3_pages[65:70] + sample3_pages[70:])
+        ]
+        doctops = [index * height for index in range(len(pages))]
+        document, loaded = self.update(recorded_document, pages, doctops)
+        assert len(loaded) < 10
+        assert document.replayed_pages > 100
+
+        def words_of(document):
+            return [
+                (section.ordinal, section.page, section.heading.words, section.content)
+                for top in document.sections for section in top.walk()
+            ]
+        full = document_from(pages)
+        assert words_of(document) == words_of(full)
+        # The new document's records hold the moved words too.
+        document, loaded = self.update(document, pages, doctops)
+        assert loaded == []
+        assert words_of(document) == words_of(full)
+
+    def test_width_is_part_of_the_fingerprint(self, sample3_pages):
+        width, words = sample3_pages[0]
+        assert words_fingerprint(words, width) != words_fingerprint(words, width + 1)
+
+    def test_update_is_chainable(self, sample3_pages, recorded_document):
+        pages = amend_word(sample3_pages, 30, 2, 'amended')
+        document, _ = self.update(recorded_document, pages)
+        document, loaded = self.update(document, sample3_pages)
+        assert loaded == [30]
+        self.assert_matches_full_parse(document, sample3_pages)
+
+    def test_from_pdf_replays_unchanged_pages(self, sample3_path, sample3_pages, serial_document):
+        previous = Document(record_pages=True)
+        with open_pages(sample3_path) as (fingerprints, _, _):
+            for fingerprint, (width, words) in zip(fingerprints, sample3_pages):
+                previous.add_words(words, width=width, fingerprint=fingerprint)
+
+        document = Document.from_pdf(sample3_path, previous=previous)
+        assert document.replayed_pages == 118
+        assert rendered(document) == rendered(serial_document)
+
+    def test_requires_recorded_pages(self, serial_document):
+        with pytest.raises(ValueError):
+            Document.update(serial_document, [], None)
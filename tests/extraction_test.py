@@ -0,0 +1,80 @@
+import pytest
+from pathlib import Path
+from types import SimpleNamespace
+import pdfplumber
+from pdfminer.pdftypes import PDFObjRef
+from pdfminer.psparser import LIT
+from lib.content_group import word_size_steps
+from lib.extraction import extract_pages, extract_page_words, page_count, page_fingerprint
+
+SAMPLE2 = str(Path(__file__).parent.parent / 'fixtures' / 'sample2.pdf')
+
+class TestExtractPages:
+    def test_matches_page_extraction(self):
+        with pdfplumber.open(SAMPLE2) as pdf:
+            expected = [(page.width, extract_page_words(page)) for page in pdf.pages]
+        assert list(extract_pages(SAMPLE2)) == expected
+
+    def test_parallel_matches_serial(self):
+        assert list(extract_pages(SAMPLE2, jobs=2)) == list(extract_pages(SAMPLE2))
+
+    def test_page_count(self):
+        assert page_count(SAMPLE2) == 3
+
+    def test_lean_words_summarize_chars(self):
+        full = list(extract_pages(SAMPLE2))
+        lean = list(extract_pages(SAMPLE2, lean=True))
+        for (_, full_words), (_, lean_words) in zip(full, lean):
+            for full_word, lean_word in zip(full_words, lean_words):
+                sizes = [char['size'] for char in full_word['chars']]
+                assert 'chars' not in lean_word
+                assert lean_word['size'] == sizes[0]
+                assert lean_word['min_size'] == min(sizes)
+                assert lean_word['uniform_size'] == (len(set(sizes)) == 1)
+                assert lean_word['size_steps'] == word_size_steps(full_word)
+                assert lean_word['text'] == full_word['text']
+
+class FakePDFDocument:
+    def __init__(self, objects):
+        self.objects = objects
+
+    def getobj(self, objid):
+        return self.objects[objid]
+
+def fake_page(objects, font_id=1, form_id=3):
+    """
+      A page using the font `font_id`, with its descriptor, and the form
+      XObject `form_id`, whose own resources use the font too.
+    """
+    document = FakePDFDocument(objects)
+    objects.setdefault(font_id, {
+        'Type': LIT('Font'), 'BaseFont': LIT('DeVinne'), 'FontDescriptor': PDFObjRef(document, 2),
+    })
+    objects.setdefault(2, {'Type': LIT('FontDescriptor'), 'Flags': 32, 'ItalicAngle': 0})
+    objects.setdefault(form_id, {
+        'Resources': {'Font': {'F1': PDFObjRef(document, font_id)}}, 'BBox': [0, 0, 10, 10],
+    })
+    resources = {
+        'Font': {'F1': PDFObjRef(document, font_id)},
+        'XObject': {'X1': PDFObjRef(document, form_id)},
+    }
+    return SimpleNamespace(page_obj=SimpleNamespace(
+        mediabox=[0, 0, 612, 792], cropbox=[0, 0, 612, 792], rotate=0, contents=[], resources=resources,
+    ))
+
+class TestPageFingerprint:
+    def test_follows_references(self):
+        fingerprint = page_fingerprint(fake_page({}))
+        assert page_fingerprint(fake_page({})) == fingerprint
+        assert page_fingerprint(fake_page({2: {'Type': LIT('FontDescriptor'), 'Flags': 34, 'ItalicAngle': 0}})) != fingerprint
+        assert page_fingerprint(fake_page({3: {'Resources': {}, 'BBox': [0, 0, 10, 10]}})) != fingerprint
+
+    def test_ignores_object_numbers(self):
+        assert page_fingerprint(fake_page({}, font_id=7, form_id=9)) == page_fingerprint(fake_page({}))
+
+    def test_cycles(self):
+        objects = {}
+        page = fake_page(objects)
+        objects[2]['Font'] = PDFObjRef(objects[1]['FontDescriptor'].doc, 1)
+        assert page_fingerprint(page) != page_fingerprint(fake_page({}))
+
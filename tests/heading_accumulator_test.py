@@ -909,6 +909,34 @@ class TestFromSmallCapsHeadingState:
         assert heading_state_accumulator.is_heading_complete()
         assert heading_state_accumulator.words == [initial_word, word1, word2, word3]
 
+    def test_small_caps_size_is_the_first_smaller_char(self, accumulator):
+        # The small-caps size is that of the first char smaller than the
+        # heading's first char, not the smallest char of its word.
+        initial_word = {
+            'fontname': 'JJGECB+DeVinne',
+            'text': 'HIS',
+            'bottom': 10,
+            'chars': [
+                {'text': 'H', 'size': 14, 'y1': 10},
+                {'text': 'I', 'size': 12, 'y1': 10},
+                {'text': 'S', 'size': 10.5, 'y1': 10}
+            ]
+        }
+        words = [
+            {
+                'fontname': 'JJGECB+DeVinne',
+                'text': text,
+                'bottom': bottom,
+                'chars': [{'text': char, 'size': 12, 'y1': bottom} for char in text]
+            }
+            for text, bottom in [('FOO', 15), ('BAR', 20)]
+        ]
+        assert accumulator.add(initial_word) == True
+        assert accumulator.add(words[0]) == True
+        assert accumulator.add(words[1]) == False
+        assert accumulator.status == HeadingAccumulator.Status.HEADING_COMPLETE
+        assert accumulator.words == [initial_word, *words]
+
     def test_adding_all_caps_on_same_line(self, heading_state_accumulator, initial_word):
         word = {
             'fontname': 'JJGECB+DeVinne',
@@ -1998,3 +2026,33 @@ class TestTierMethod:
 
         assert accumulator.status == HeadingAccumulator.Status.HEADING_COMPLETE
         assert accumulator.tier == 5
+
+class TestRejectsAsFirstWord:
+    @pytest.mark.parametrize('text,sizes,rejected', [
+        ('Hi', [14, 14], True),
+        ('shall', [14] * 5, True),
+        ('‘term’', [14] * 6, True),
+        ('c:\\\\v7', [14] * 5, True),
+        ('(a)', [14] * 3, False),
+        ('a.', [14] * 2, False),
+        ('TITLE', [14] * 5, False),
+        ('SEC', [14, 10.5, 10.5], False),
+        ('2024', [14] * 4, False),
+    ])
+    def test_agrees_with_add(self, accumulator, text, sizes, rejected):
+        word = {
+            'fontname': 'JJGECB+DeVinne',
+            'text': text,
+            'x0': 100,
+            'x1': 120,
+            'bottom': 10,
+            'chars': [{'text': c, 'size': size} for c, size in zip(text, sizes)],
+        }
+        assert HeadingAccumulator.rejects_as_first_word(word) == rejected
+        if rejected:
+            assert accumulator.add(word) == False
+            assert accumulator.is_not_heading()
+            assert accumulator.words == []
+        else:
+            assert accumulator.add(word) == True
+            assert accumulator.words == [word]
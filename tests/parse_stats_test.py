@@ -0,0 +1,72 @@
+import json
+import pytest
+from lib import Document, HeadingAccumulator, ParseStats
+from lib.synthetic import SyntheticBill
+
+@pytest.fixture(scope='module')
+def parsed(sample3_pages):
+    plain = Document()
+    instrumented = Document(stats=True)
+    for width, words in sample3_pages:
+        plain.add_words(words, width=width)
+        instrumented.add_words(words, width=width)
+    return plain, instrumented
+
+class TestParseStats:
+    def test_disabled_by_default(self):
+        assert Document().stats is None
+
+    def test_does_not_change_the_parse(self, parsed):
+        plain, instrumented = parsed
+        assert [(h.text(), h.tier) for h in instrumented.headings] == [(h.text(), h.tier) for h in plain.headings]
+        assert instrumented.retries == plain.retries
+        assert instrumented.fast_path_words == plain.fast_path_words
+
+    def test_cases(self, parsed):
+        _, document = parsed
+        stats = document.stats
+        assert set(stats.cases) <= {HeadingAccumulator.IGNORED_CASE, *range(1, 20)}
+        assert set(stats.case_seconds) == set(stats.cases)
+        assert stats.final_statuses['HEADING_COMPLETE'] == len(document.headings)
+
+    def test_accumulators(self, parsed, sample3_pages):
+        _, document = parsed
+        stats = document.stats
+        assert len(stats.page_created) == len(stats.page_discarded) == len(sample3_pages)
+        assert sum(stats.final_statuses.values()) == stats.accumulators_discarded
+        # At most the accumulator still open at the end is not discarded.
+        pending = 0 if document.current_heading is None else 1
+        assert stats.accumulators_created == stats.accumulators_discarded + pending
+
+    def test_to_json(self, parsed):
+        _, document = parsed
+        data = json.loads(document.stats.to_json())
+        assert data['accumulators_created'] == document.stats.accumulators_created
+        assert sum(data['cases'].values()) == sum(document.stats.cases.values())
+        assert len(data['pages']) == len(document.stats.page_created)
+
+    def test_save(self, parsed, tmp_path):
+        _, document = parsed
+        path = tmp_path / 'stats.json'
+        document.stats.save(path)
+        assert json.loads(path.read_text()) == document.stats.as_dict()
+
+    def test_synthetic_bill(self):
+        document = SyntheticBill(10, seed=2).feed(Document(stats=True))
+        stats = document.stats
+        # Line numbers, page numbers and file paths are ignored.
+        assert stats.cases[HeadingAccumulator.IGNORED_CASE] > 0
+        assert stats.final_statuses['HEADING_COMPLETE'] == len(document.headings)
+
+    def test_last_case(self):
+        stats = ParseStats()
+        stats.start_page()
+        heading = HeadingAccumulator(width=612.0)
+        word = {'text': '.', 'x0': 100.0, 'x1': 103.0, 'bottom': 100.0, 'fontname': 'JJGECB+DeVinne',
+                'chars': [{'text': '.', 'size': 14.0}]}
+        assert not stats.add(heading, word, None)
+        assert heading.last_case == 4
+        stats.discarded(heading)
+        assert stats.cases == {4: 1}
+        assert stats.final_statuses == {'NOT_HEADING': 1}
+        assert stats.page_discarded == [1]
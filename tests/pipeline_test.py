@@ -0,0 +1,126 @@
+import asyncio
+import urllib.error
+import pytest
+from lib import Document, TextIndex
+from lib.pipeline import HTTPModelClient, Pipeline
+from lib.synthetic import SyntheticBill
+from lib.tokens import register_encoder, _ENCODERS
+from .stub_model_server import StubModelServer
+
+MODEL = 'test-model'
+
+class WordEncoder:
+    def encode(self, text):
+        return text.split()
+
+class SlowClient:
+    """Answers after `delay` seconds, noting how far parsing had got."""
+    def __init__(self, pipeline_pages, delay):
+        self.pipeline_pages = pipeline_pages
+        self.delay = delay
+        self.pages_parsed = []
+
+    async def send(self, payload):
+        await asyncio.sleep(self.delay)
+        self.pages_parsed.append(self.pipeline_pages())
+        return {}
+
+@pytest.fixture(autouse=True)
+def encoder():
+    register_encoder(MODEL, WordEncoder())
+    yield
+    del _ENCODERS[MODEL]
+
+@pytest.fixture
+def server():
+    with StubModelServer(latency=0.05) as server:
+        yield server
+
+@pytest.fixture
+def client(server):
+    with HTTPModelClient(server.url) as client:
+        yield client
+
+def bill():
+    return SyntheticBill(30, seed=7, mix={'division': 0.1, 'section': 0.2, 'paragraph': 0.7})
+
+class TestPipeline:
+    def test_one_request_per_top_level_section(self, client, server):
+        results = asyncio.run(Pipeline(client, model=MODEL).run(bill()))
+        sections = bill().feed(Document()).sections
+        assert [request.heading for request, _ in results] == [section.heading_text() for section in sections]
+        assert [request.index for request, _ in results] == list(range(len(sections)))
+        for (request, response), section in zip(results, sections):
+            assert request.text == section.text()
+            assert request.token_count == len(section.text().split())
+            assert response['choices'][0]['message']['content'] == f"{request.token_count} words"
+        assert len(server.payloads) == len(sections)
+        assert sorted(server.payloads, key=str) == sorted((request.payload(MODEL) for request, _ in results), key=str)
+
+    def test_budget(self, client):
+        results = asyncio.run(Pipeline(client, model=MODEL, budget=200).run(bill()))
+        sections = bill().feed(Document()).sections
+        assert len(results) > len(sections)
+        assert all(request.token_count <= 200 for request, _ in results)
+        assert [request.index for request, _ in results] == list(range(len(results)))
+        assert "".join(request.text for request, _ in results) == "".join(section.text() for section in sections)
+
+    @pytest.mark.parametrize('concurrency', [1, 3])
+    def test_concurrency(self, client, server, concurrency):
+        asyncio.run(Pipeline(client, model=MODEL, concurrency=concurrency, budget=200).run(bill()))
+        assert server.max_in_flight == concurrency
+
+    def test_stages_overlap(self, client):
+        pipeline = Pipeline(client, model=MODEL, budget=200)
+        asyncio.run(pipeline.run(SyntheticBill(60, seed=7, mix={'division': 0.1, 'paragraph': 0.9})))
+        stats = pipeline.stats
+        assert set(stats) == set(Pipeline.STAGES)
+        # Model calls start while the bill is still being parsed.
+        assert stats['model']['started_s'] < stats['classify']['finished_s']
+        assert stats['classify']['finished_s'] <= stats['model']['finished_s']
+
+    def test_backpressure(self):
+        pipeline = Pipeline(None, model=MODEL, concurrency=1, queue_size=1, budget=50)
+        pipeline.client = client = SlowClient(lambda: pipeline.document.page_number, 0.02)
+        asyncio.run(pipeline.run(bill()))
+        # With every queue full, parsing waits for the model instead of
+        # running to the end of the bill.
+        assert client.pages_parsed[0] < 30
+        assert len(client.pages_parsed) > 10
+
+    def test_model_errors_are_raised(self):
+        with StubModelServer(fail_on="DIVISION B") as server, HTTPModelClient(server.url) as client:
+            with pytest.raises(urllib.error.HTTPError):
+                asyncio.run(Pipeline(client, model=MODEL).run(bill()))
+
+    def test_pdf(self, client, sample3_path):
+        pipeline = Pipeline(client, model=MODEL, concurrency=8, lean=True)
+        results = asyncio.run(pipeline.run(sample3_path))
+        assert [request.heading for request, _ in results][:3] == [
+            'IN THE HOUSE OF REPRESENTATIVES', 'SECTION 1. SHORT TITLE.', 'SEC. 2. TABLE OF CONTENTS.',
+        ]
+        assert pipeline.document.page_number == 118
+
+    def test_concurrency_must_be_positive(self, client):
+        with pytest.raises(ValueError):
+            Pipeline(client, concurrency=0)
+
+    def test_every_failure_is_reported(self):
+        class FailingClient:
+            async def send(self, payload):
+                await asyncio.sleep(0.01)
+                raise ValueError("model unavailable")
+
+        with pytest.raises(ValueError, match="model unavailable") as error:
+            asyncio.run(Pipeline(FailingClient(), model=MODEL, concurrency=2, budget=50).run(bill()))
+        assert error.value.__notes__ == ["another stage also failed: ValueError('model unavailable')"]
+
+    def test_text_index(self, client):
+        index = TextIndex()
+        results = asyncio.run(Pipeline(client, model=MODEL, text_index=index, name='bill').run(bill()))
+        expected = TextIndex()
+        expected.add_sections('bill', bill().feed(Document()).sections)
+        assert index.documents() == expected.documents() == ['bill']
+        assert len(index.sections) == len(expected.sections)
+        last = results[-1][0].heading.split()[-1].lower()
+        assert index.search(last) == expected.search(last)
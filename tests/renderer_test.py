@@ -0,0 +1,51 @@
+import io
+import json
+import pytest
+from lib import Document, Section, render
+
+@pytest.fixture
+def sections():
+    return [
+        Section("Heading", tier=1, content="Content", subsections=[
+            Section("Sub Heading", tier=2, content="Sub Content"),
+        ]),
+        Section("Other Heading", tier=1),
+    ]
+
+def rendered(sections, format):
+    sink = io.StringIO()
+    render(sections, sink, format=format)
+    return sink.getvalue()
+
+class TestRender:
+    def test_tagged_matches_text(self, sections):
+        assert rendered(sections, 'tagged') == "".join(section.text() for section in sections)
+
+    def test_markdown(self, sections):
+        assert rendered(sections, 'markdown') == (
+            "# Heading\n\nContent\n\n## Sub Heading\n\nSub Content\n\n# Other Heading\n\n"
+        )
+
+    def test_jsonl(self, sections):
+        records = [json.loads(line) for line in rendered(sections, 'jsonl').splitlines()]
+        assert records == [
+            {'tier': 1, 'heading': 'Heading', 'path': [], 'content': 'Content'},
+            {'tier': 2, 'heading': 'Sub Heading', 'path': ['Heading'], 'content': 'Sub Content'},
+            {'tier': 1, 'heading': 'Other Heading', 'path': [], 'content': ''},
+        ]
+
+    def test_unknown_format(self, sections):
+        with pytest.raises(ValueError):
+            rendered(sections, 'html')
+
+    def test_parsed_document(self, sample3_pages):
+        document = Document()
+        for width, words in sample3_pages:
+            document.add_words(words, width=width)
+        sink = io.StringIO()
+        document.render(sink, format='jsonl')
+        records = [json.loads(line) for line in sink.getvalue().splitlines()]
+        assert len(records) == sum(len(list(section.walk())) for section in document.sections)
+        assert records[0]['heading'] == 'IN THE HOUSE OF REPRESENTATIVES'
+        assert any('appropriated' in record['content'] for record in records)
+        assert "".join(section.text() for section in document.sections) == rendered(document.sections, 'tagged')
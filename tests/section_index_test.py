@@ -0,0 +1,87 @@
+import pytest
+from lib import Document, Section, SectionIndex
+from lib.section_tree import SectionTreeBuilder
+
+def build(headings):
+    builder = SectionTreeBuilder()
+    for page, (heading, tier, content) in enumerate(headings, start=1):
+        section = Section(heading, tier=tier, content=content)
+        section.page = page
+        builder.add(section)
+    return builder.sections
+
+@pytest.fixture
+def index():
+    index = SectionIndex()
+    index.add_document('bill', build([
+        ('DIVISION A', 1, 'Intro'),
+        ('SEC. 101.', 2, 'First section.'),
+        ('SEC. 102.', 2, 'Second section.'),
+        ('DIVISION B', 1, None),
+        ('SEC. 101.', 2, 'Another first section.'),
+    ]), page_count=7)
+    yield index
+    index.close()
+
+class TestSectionIndex:
+    def test_find(self, index):
+        rows = index.find('SEC. 101.')
+        assert [row['path'].split(SectionIndex.PATH_SEPARATOR) for row in rows] == [
+            ['DIVISION A', 'SEC. 101.'],
+            ['DIVISION B', 'SEC. 101.'],
+        ]
+        assert index.find('SEC. 101.', document='other') == []
+
+    def test_find_prefix(self, index):
+        assert [row['heading'] for row in index.find_prefix('SEC. 10')] == ['SEC. 101.', 'SEC. 102.', 'SEC. 101.']
+        assert [row['heading'] for row in index.find_prefix('DIV')] == ['DIVISION A', 'DIVISION B']
+
+    def test_tree_columns(self, index):
+        division, = index.by_path(['DIVISION A'])
+        assert (division['tier'], division['parent_id'], division['ordinal'], division['last_ordinal']) == (1, None, 0, 2)
+        assert [row['heading'] for row in index.children(division)] == ['SEC. 101.', 'SEC. 102.']
+        assert [row['ordinal'] for row in index.subtree(division)] == [0, 1, 2]
+
+    def test_page_ranges(self, index):
+        assert [(row['first_page'], row['last_page']) for row in index.find_prefix('')] == [
+            (1, 4), (2, 3), (3, 4), (4, 7), (5, 7),
+        ]
+
+    def test_text(self, index):
+        section, = index.by_path(['DIVISION A', 'SEC. 102.'])
+        assert index.content(section) == 'Second section.'
+        assert index.text(section) == '<h2>SEC. 102.<h2>\n\nSecond section.\n\n'
+        division, = index.by_path(['DIVISION B'])
+        assert index.content(division) == ''
+        assert index.text(division) == '<h1>DIVISION B<h1>\n\n\n\n<h2>SEC. 101.<h2>\n\nAnother first section.\n\n'
+
+    def test_replaces_document(self, index):
+        index.add_document('bill', build([('TITLE I', 1, 'Text')]))
+        assert index.documents() == ['bill']
+        assert [row['heading'] for row in index.find_prefix('')] == ['TITLE I']
+
+    def test_persists(self, tmp_path):
+        path = str(tmp_path / 'sections.db')
+        with SectionIndex(path) as index:
+            index.add_document('bill', build([('TITLE I', 1, 'Text')]))
+        with SectionIndex(path) as index:
+            row, = index.find('TITLE I')
+            assert index.text(row) == '<h1>TITLE I<h1>\n\nText\n\n'
+
+class TestDocumentIndex:
+    def test_matches_section_tree(self, sample3_pages, tmp_path):
+        document = Document()
+        for width, words in sample3_pages:
+            document.add_words(words, width=width)
+        path = str(tmp_path / 'sections.db')
+        document.save_index(path, 'sample3')
+
+        with SectionIndex(path) as index:
+            rows = index.find_prefix('')
+            sections = [section for top in document.sections for section in top.walk()]
+            assert [row['heading'] for row in rows] == [section.heading_text() for section in sections]
+            assert [row['first_page'] for row in rows] == [section.page for section in sections]
+            assert all(row['first_page'] <= row['last_page'] <= 118 for row in rows)
+            for row, section in zip(rows, sections):
+                assert index.text(row) == section.text()
+                assert index.content(row) == section.content_text()
@@ -62,3 +62,25 @@ class TestSection:
         assert section.subsections[0].tier == new_section.tier
         assert section.subsections[0].content == new_section.content
         assert section.subsections[0].subsections == []
+
+    def test_walk(self, section):
+        section.subsections = [
+            Section("Sub Heading 1", tier=2, subsections=[Section("Sub Sub Heading", tier=3)]),
+            Section("Sub Heading 2", tier=2)
+        ]
+        assert [s.heading for s in section.walk()] == ["Heading", "Sub Heading 1", "Sub Sub Heading", "Sub Heading 2"]
+
+    def test_text_of_deep_tree(self):
+        root = Section("Heading 0", tier=0)
+        parent = root
+        for depth in range(1, 5000):
+            parent.subsections = [Section(f"Heading {depth}", tier=depth)]
+            parent = parent.subsections[0]
+        assert root.last_subsection() is parent
+        assert root.text().count("\n\n") == 2 * 5000
+
+    def test_content_text_of_words(self):
+        words = [{'text': 'SEC.'}, {'text': '2.'}]
+        section = Section("Heading", tier=1, content=[words, {'text': 'The'}, {'text': 'term'}])
+        assert section.content_text() == "SEC. 2. The term"
+        assert section.text() == "<h1>Heading<h1>\n\nSEC. 2. The term\n\n"
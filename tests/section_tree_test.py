@@ -0,0 +1,45 @@
+import random
+import pytest
+from lib import Section
+from lib.section_tree import SectionTreeBuilder
+
+def shape(sections):
+    return [(section.heading, section.tier, shape(section.subsections)) for section in sections]
+
+def build_with_add_subsection(tiers):
+    sections = []
+    for index, tier in enumerate(tiers):
+        section = Section(f"Heading {index}", tier=tier)
+        if not sections or not sections[-1].add_subsection(section):
+            sections.append(section)
+    return sections
+
+def build_with_builder(tiers):
+    builder = SectionTreeBuilder()
+    for index, tier in enumerate(tiers):
+        builder.add(Section(f"Heading {index}", tier=tier))
+    return builder
+
+class TestSectionTreeBuilder:
+    def test_nests_by_tier(self):
+        builder = build_with_builder([1, 2, 3, 2, 1, 3])
+        assert shape(builder.sections) == [
+            ('Heading 0', 1, [
+                ('Heading 1', 2, [('Heading 2', 3, [])]),
+                ('Heading 3', 2, []),
+            ]),
+            ('Heading 4', 1, [('Heading 5', 3, [])]),
+        ]
+        assert builder.last_section().heading == 'Heading 5'
+
+    def test_empty(self):
+        assert SectionTreeBuilder().last_section() is None
+
+    @pytest.mark.parametrize('seed', range(20))
+    def test_matches_add_subsection(self, seed):
+        generator = random.Random(seed)
+        tiers = [generator.randint(1, 6) for _ in range(200)]
+        builder = build_with_builder(tiers)
+        sections = build_with_add_subsection(tiers)
+        assert shape(builder.sections) == shape(sections)
+        assert builder.last_section().heading == sections[-1].last_subsection().heading
@@ -0,0 +1,71 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class StubModelServer:
+    """
+      A local stand-in for a chat completions endpoint. Every POST waits
+      `latency` seconds and is answered with the number of words it was
+      sent. Records the payloads received and the most requests it had in
+      flight at once. Answers with a 500 to payloads whose text contains
+      `fail_on`.
+    """
+    def __init__(self, latency=0.0, fail_on=None):
+        self.latency = latency
+        self.fail_on = fail_on
+        self.payloads = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f'http://{host}:{port}/v1/chat/completions'
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                payload = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                with stub._lock:
+                    stub.payloads.append(payload)
+                    stub.in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+                try:
+                    time.sleep(stub.latency)
+                finally:
+                    with stub._lock:
+                        stub.in_flight -= 1
+
+                text = payload['messages'][0]['content']
+                if stub.fail_on is not None and stub.fail_on in text:
+                    self.send_error(500)
+                    return
+                body = json.dumps({
+                    'model': payload['model'],
+                    'choices': [{'message': {'role': 'assistant', 'content': f"{len(text.split())} words"}}],
+                }).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,49 @@
+import pytest
+from lib import Document
+from lib.synthetic import SyntheticBill
+
+def is_lone_word(kind, text):
+    # A lone all-caps word in the body font is only a possible heading; the
+    # parser keeps it or not depending on the line that follows.
+    return kind == 'subheading' and ' ' not in text
+
+class TestSyntheticBill:
+    def test_is_deterministic(self):
+        first = list(SyntheticBill(5, seed=3))
+        second = list(SyntheticBill(5, seed=3))
+        assert first == second
+        assert first != list(SyntheticBill(5, seed=4))
+
+    def test_layout(self):
+        bill = SyntheticBill(3)
+        pages = list(bill)
+        assert len(pages) == 3
+        assert all(width == SyntheticBill.WIDTH for width, _ in pages)
+        assert bill.word_count == sum(len(words) for _, words in pages)
+        _, words = pages[1]
+        assert words[0]['text'] == SyntheticBill.FILE_PATH
+        assert words[1]['text'] == '2'
+        assert [word['text'] for word in words if word['fontname'] == 'JJGECF+Times-Roman'][1:] == [
+            str(number) for number in range(1, SyntheticBill.LINES_PER_PAGE + 1)
+        ]
+
+    @pytest.mark.parametrize('seed', range(4))
+    def test_headings_are_parsed(self, seed):
+        bill = SyntheticBill(60, seed=seed)
+        document = bill.feed(Document())
+        lone_words = {text for kind, text in bill.headings if is_lone_word(kind, text)}
+        assert [heading.text() for heading in document.headings if heading.text() not in lone_words] == [
+            text for kind, text in bill.headings if text not in lone_words
+        ]
+
+    def test_lean_words_parse_the_same(self):
+        full = SyntheticBill(30, seed=1).feed(Document())
+        lean = SyntheticBill(30, seed=1, lean=True).feed(Document())
+        assert [(h.text(), h.tier) for h in lean.headings] == [(h.text(), h.tier) for h in full.headings]
+
+    def test_mix(self):
+        bill = SyntheticBill(10, mix={'paragraph': 1.0}, line_numbers=False, page_numbers=False, file_paths=False)
+        document = bill.feed(Document())
+        assert bill.headings == []
+        assert document.headings == []
+        assert all(word['fontname'] == 'JJGECB+DeVinne' for _, words in bill.pages() for word in words)
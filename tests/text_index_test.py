@@ -0,0 +1,136 @@
+import pickle
+import zlib
+import pytest
+from lib import Document, Section, TextIndex
+from lib.section_tree import SectionTreeBuilder
+
+def build(headings):
+    builder = SectionTreeBuilder()
+    for heading, tier, content in headings:
+        builder.add(Section(heading, tier=tier, content=content))
+    return builder.sections
+
+BILL = [
+    ('TITLE I', 1, 'Appropriations for the Department of Agriculture.'),
+    ('SEC. 101.', 2, 'Notwithstanding any other provision of law, the Secretary of Agriculture may act.'),
+    ('SEC. 102.', 2, 'The Department of Energy shall report. The Department of Energy shall publish.'),
+    ('TITLE II', 1, 'Agricultural programs.'),
+]
+
+@pytest.fixture
+def index():
+    index = TextIndex()
+    index.add_sections('bill', build(BILL))
+    return index
+
+def ordinals(results):
+    return [ordinal for _, ordinal, _ in results]
+
+class TestTextIndex:
+    def test_terms(self):
+        assert TextIndex.terms('SEC. 101. Notwithstanding U.S.C.') == ['sec', '101', 'notwithstanding', 'u', 's', 'c']
+
+    def test_positions_continue_from_heading(self, index):
+        assert index.postings['notwithstanding'] == {1: [2]}
+        assert index.postings['department'] == {0: [5], 2: [3, 9]}
+
+    def test_term_search(self, index):
+        assert ordinals(index.search('notwithstanding')) == [1]
+        assert ordinals(index.search('department')) == [2, 0]
+
+    def test_phrase_search(self, index):
+        assert ordinals(index.search('"department of energy"')) == [2]
+        assert ordinals(index.search('"energy department"')) == []
+        assert index.phrase_frequencies(('department', 'of', 'energy')) == {2: 2}
+
+    def test_prefix_search(self, index):
+        assert index.expand_prefix('agri') == ['agricultural', 'agriculture']
+        assert sorted(ordinals(index.search('agri*'))) == [0, 1, 3]
+        assert ordinals(index.search('"department of agri*"')) == [0]
+
+    def test_ranks_by_bm25(self, index):
+        results = index.search('department energy')
+        assert ordinals(results) == [2, 0]
+        assert results[0][2] > results[1][2] > 0
+
+    def test_merge_and_replace(self, index):
+        other = TextIndex()
+        other.add_sections('other', build([('TITLE I', 1, 'Department of Energy notwithstanding.')]))
+        index.merge(other)
+        assert index.documents() == ['bill', 'other']
+        assert [(document, ordinal) for document, ordinal, _ in index.search('notwithstanding')] == [('other', 0), ('bill', 1)]
+
+        replacement = TextIndex()
+        replacement.add_sections('bill', build([('TITLE I', 1, 'Nothing here.')]))
+        index.merge(replacement)
+        assert [(document, ordinal) for document, ordinal, _ in index.search('notwithstanding')] == [('other', 0)]
+        assert 'agriculture' not in index.postings
+
+    def test_save_and_load(self, index, tmp_path):
+        path = tmp_path / 'index.bin'
+        index.save(path)
+        loaded = TextIndex.load(path)
+        assert loaded.search('department energy') == index.search('department energy')
+        assert loaded.postings == index.postings
+        assert loaded.sections == index.sections
+        assert loaded.lengths == index.lengths
+
+    def test_loaded_index_can_be_merged(self, index, tmp_path):
+        path = tmp_path / 'index.bin'
+        index.save(path)
+        merged = TextIndex()
+        merged.add_sections('other', build([('TITLE I', 1, 'Energy programs.')]))
+        merged.merge(TextIndex.load(path))
+        assert merged.documents() == ['bill', 'other']
+        assert sorted(document for document, _, _ in merged.search('energy')) == ['bill', 'other']
+
+    def test_pickled_indexes_are_rejected(self, tmp_path):
+        marker = tmp_path / 'executed'
+
+        class Payload:
+            def __reduce__(self):
+                return (open, (str(marker), 'w'))
+
+        # A pickled index, as the first version of the format stored.
+        path = tmp_path / 'index.bin'
+        path.write_bytes(zlib.compress(pickle.dumps((1, Payload(), [], []))))
+        with pytest.raises(ValueError):
+            TextIndex.load(path)
+        path.write_bytes(TextIndex.HEADER.pack(TextIndex.MAGIC, TextIndex.FORMAT_VERSION) + zlib.compress(pickle.dumps(Payload())))
+        with pytest.raises(ValueError, match='corrupt'):
+            TextIndex.load(path)
+        assert not marker.exists()
+
+    @pytest.mark.parametrize('state', [
+        b'[]',
+        b'{"postings": {}, "sections": [["bill", 0]], "lengths": []}',
+        b'{"postings": {}, "sections": [["bill", "0"]], "lengths": [1]}',
+        b'{"postings": {"a": [[1, [0]]]}, "sections": [["bill", 0]], "lengths": [1]}',
+        b'{"postings": {"a": [[0, ["x"]]]}, "sections": [["bill", 0]], "lengths": [1]}',
+        b'{"sections": [], "lengths": []}',
+    ])
+    def test_corrupt_indexes_are_rejected(self, tmp_path, state):
+        path = tmp_path / 'index.bin'
+        path.write_bytes(TextIndex.HEADER.pack(TextIndex.MAGIC, TextIndex.FORMAT_VERSION) + zlib.compress(state))
+        with pytest.raises(ValueError, match='corrupt'):
+            TextIndex.load(path)
+
+    def test_short_files_are_rejected(self, tmp_path):
+        path = tmp_path / 'index.bin'
+        path.write_bytes(b'BILL')
+        with pytest.raises(ValueError, match='not a text index'):
+            TextIndex.load(path)
+
+class TestDocumentTextIndex:
+    def test_built_with_the_tree(self, sample3_pages):
+        index = TextIndex()
+        document = Document(text_index=index, name='sample3')
+        for width, words in sample3_pages:
+            document.add_words(words, width=width)
+        document.flush_text_index()
+
+        expected = TextIndex()
+        expected.add_sections('sample3', document.sections)
+        assert index.postings == expected.postings
+        assert index.lengths == expected.lengths
+        assert index.search('notwithstanding')
@@ -0,0 +1,103 @@
+import io
+import pickle
+import zlib
+import pytest
+from lib import Document, TokenStream, TokenStreamWriter, WordColumns
+from lib.page_record import word_key
+from lib.synthetic import SyntheticBill
+from lib.token_stream import encode_word, decode_word
+
+def rendered(document):
+    sink = io.StringIO()
+    document.render(sink)
+    return sink.getvalue()
+
+@pytest.fixture(scope='module')
+def recorded(sample3_pages, tmp_path_factory):
+    path = tmp_path_factory.mktemp('streams') / 'sample3.tok'
+    with TokenStreamWriter(path) as writer:
+        document = Document(recorder=writer)
+        for width, words in sample3_pages:
+            document.add_words(words, width=width)
+    return path, document
+
+class TestTokenStream:
+    def test_replay_matches_the_recorded_parse(self, recorded):
+        path, original = recorded
+        replayed = TokenStream(path).feed(Document())
+        assert [(h.text(), h.tier) for h in replayed.headings] == [(h.text(), h.tier) for h in original.headings]
+        assert rendered(replayed) == rendered(original)
+        assert replayed.retries == original.retries
+
+    def test_pages(self, recorded, sample3_pages):
+        path, _ = recorded
+        stream = TokenStream(path)
+        assert len(stream) == len(sample3_pages)
+        assert stream.word_count == sum(len(words) for _, words in sample3_pages)
+        for (width, words), (original_width, original_words) in zip(stream, sample3_pages):
+            assert width == original_width
+            assert [word_key(word) for word in words] == [word_key(word) for word in original_words]
+
+    def test_lean_and_columnar_words(self, tmp_path):
+        bill = SyntheticBill(3, seed=5, lean=True)
+        pages = list(bill)
+        TokenStream.record(tmp_path / 'lean.tok', pages)
+        TokenStream.record(tmp_path / 'columnar.tok', [(width, WordColumns.from_words(words)) for width, words in pages])
+        for name in ('lean.tok', 'columnar.tok'):
+            stream = TokenStream(tmp_path / name)
+            assert [[word_key(word) for word in words] for _, words in stream] == [
+                [word_key(word) for word in words] for _, words in pages
+            ]
+
+    def test_char_texts_that_differ_from_the_text_are_kept(self):
+        word = {'text': 'fi', 'fontname': 'F', 'x0': 1.0, 'x1': 2.0, 'bottom': 3.0,
+                'chars': [{'text': 'ﬁ', 'size': 14.0}]}
+        assert word_key(decode_word(encode_word(word))) == word_key(word)
+
+    def test_rejects_other_files(self, tmp_path):
+        path = tmp_path / 'not.tok'
+        path.write_bytes(b'%PDF-1.7\n' + bytes(16))
+        with pytest.raises(ValueError, match='not a token stream'):
+            TokenStream(path)
+
+    def test_tampered_streams_are_rejected(self, tmp_path):
+        marker = tmp_path / 'executed'
+
+        class Payload:
+            def __reduce__(self):
+                return (open, (str(marker), 'w'))
+
+        # A pickled page, as the first version of the format stored.
+        data = zlib.compress(pickle.dumps((612.0, [Payload()])))
+        path = tmp_path / 'tampered.tok'
+        header = TokenStreamWriter.HEADER.pack(TokenStreamWriter.MAGIC, TokenStreamWriter.VERSION)
+        path.write_bytes(header + TokenStreamWriter.FRAME.pack(len(data)) + data)
+        with pytest.raises(ValueError, match='page 1 is corrupt'):
+            TokenStream(path)
+        assert not marker.exists()
+
+    @pytest.mark.parametrize('page', [
+        b'not compressed',
+        zlib.compress(b'{"width": 612}'),
+        zlib.compress(b'[612, [["a", "F", 1, 2, 3]]]'),
+        zlib.compress(b'[612, [["a", "F", 1, 2, 3, 14, null]]]'),
+    ])
+    def test_corrupt_pages_are_rejected(self, tmp_path, page):
+        path = tmp_path / 'corrupt.tok'
+        header = TokenStreamWriter.HEADER.pack(TokenStreamWriter.MAGIC, TokenStreamWriter.VERSION)
+        path.write_bytes(header + TokenStreamWriter.FRAME.pack(len(page)) + page)
+        with pytest.raises(ValueError, match='corrupt'):
+            TokenStream(path)
+
+    def test_truncated_stream(self, recorded, tmp_path):
+        path, _ = recorded
+        truncated = tmp_path / 'truncated.tok'
+        truncated.write_bytes(path.read_bytes()[:-10])
+        with pytest.raises(ValueError, match='corrupt'):
+            TokenStream(truncated)
+
+    def test_empty_stream(self, tmp_path):
+        TokenStream.record(tmp_path / 'empty.tok', [])
+        stream = TokenStream(tmp_path / 'empty.tok')
+        assert len(stream) == 0
+        assert stream.feed(Document()).headings == []
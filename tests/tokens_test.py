@@ -0,0 +1,78 @@
+import pytest
+from lib import Section
+from lib.chunker import chunk_sections
+from lib.tokens import count_tokens, encoder_for, register_encoder, _ENCODERS
+
+class WordEncoder:
+    """Counts whitespace-separated words, recording every text it encodes."""
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, text):
+        self.encoded.append(text)
+        return text.split()
+
+@pytest.fixture
+def encoder():
+    encoder = WordEncoder()
+    register_encoder('test-model', encoder)
+    yield encoder
+    del _ENCODERS['test-model']
+
+@pytest.fixture
+def tree():
+    return Section("Heading", tier=1, content="one two", subsections=[
+        Section("Sub Heading 1", tier=2, content="three"),
+        Section("Sub Heading 2", tier=2, content="four five", subsections=[
+            Section("Deep", tier=3, content="six"),
+        ]),
+    ])
+
+class TestTokenCounts:
+    def test_registry_returns_registered_encoder(self, encoder):
+        assert encoder_for('test-model') is encoder
+
+    def test_subtree_count_matches_text(self, encoder, tree):
+        assert tree.token_count('test-model') == len(tree.text().split())
+
+    def test_each_section_encoded_once(self, encoder, tree):
+        tree.token_count('test-model')
+        for section in tree.walk():
+            section.token_count('test-model')
+        assert len(encoder.encoded) == 4
+
+    def test_content_change_invalidates_ancestors(self, encoder, tree):
+        tree.token_count('test-model')
+        deep = tree.subsections[1].subsections[0]
+        deep.content = "six seven eight"
+        assert tree.token_count('test-model') == len(tree.text().split())
+        assert len(encoder.encoded) == 5
+
+    def test_new_subsection_invalidates_ancestors(self, encoder, tree):
+        before = tree.token_count('test-model')
+        tree.add_subsection(Section("Deeper", tier=3, content="nine"))
+        assert tree.token_count('test-model') == len(tree.text().split())
+        assert tree.token_count('test-model') > before
+        assert len(encoder.encoded) == 5
+
+class TestCountTokens:
+    def test_counts_trees_in_batches(self, encoder, tree):
+        other = Section("Other", tier=1, content="seven")
+        counts = count_tokens([tree, other], 'test-model', workers=2, batch_size=2)
+        assert counts == [len(tree.text().split()), len(other.text().split())]
+        assert len(encoder.encoded) == 5
+        assert tree.token_count('test-model') == counts[0]
+        assert len(encoder.encoded) == 5
+
+    def test_skips_counted_sections(self, encoder, tree):
+        tree.subsections[0].token_count('test-model')
+        count_tokens([tree], 'test-model')
+        assert len(encoder.encoded) == 4
+
+    def test_counts_chunks(self, encoder, tree):
+        chunks = chunk_sections([tree], 4, model='test-model')
+        for chunk in chunks:
+            chunk.token_count = None
+        counts = count_tokens(chunks, 'test-model', workers=2, batch_size=1)
+        assert counts == [len(chunk.text().split()) for chunk in chunks]
+        assert [chunk.token_count for chunk in chunks] == counts
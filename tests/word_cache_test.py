@@ -0,0 +1,61 @@
+import pytest
+from pathlib import Path
+from lib import WordCache
+from lib.extraction import extract_pages
+
+SAMPLE2 = str(Path(__file__).parent.parent / 'fixtures' / 'sample2.pdf')
+
+@pytest.fixture
+def cache(tmp_path):
+    return WordCache(tmp_path)
+
+class TestWordCache:
+    def test_first_run_misses(self, cache):
+        assert list(extract_pages(SAMPLE2, cache=cache)) == list(extract_pages(SAMPLE2))
+        assert cache.stats() == {'hits': 0, 'misses': 3, 'bytes_read': 0, 'bytes_written': cache.bytes_written}
+        assert cache.bytes_written > 0
+
+    def test_second_run_hits_without_opening_pdf(self, cache, monkeypatch):
+        expected = list(extract_pages(SAMPLE2, cache=cache))
+        rerun = WordCache(cache.directory)
+        monkeypatch.setattr('lib.extraction.pdfplumber.open', None)
+        assert list(extract_pages(SAMPLE2, cache=rerun)) == expected
+        assert rerun.hits == 3
+        assert rerun.misses == 0
+        assert rerun.bytes_read == cache.bytes_written
+
+    def test_only_missing_pages_are_extracted(self, cache):
+        expected = list(extract_pages(SAMPLE2, cache=cache))
+        cache._page_path(cache.key(SAMPLE2), 1).unlink()
+        rerun = WordCache(cache.directory)
+        assert list(extract_pages(SAMPLE2, cache=rerun)) == expected
+        assert (rerun.hits, rerun.misses) == (2, 1)
+
+    def test_key_depends_on_extraction_options(self):
+        assert WordCache.parameters_digest() != WordCache.parameters_digest({'return_chars': False})
+        assert WordCache.key(SAMPLE2) != WordCache.key(SAMPLE2, lean=True)
+
+    def test_lean_pages_are_cached_separately(self, cache):
+        full = list(extract_pages(SAMPLE2, cache=cache))
+        lean = list(extract_pages(SAMPLE2, cache=cache, lean=True))
+        assert lean == list(extract_pages(SAMPLE2, lean=True))
+        assert lean != full
+        assert (cache.hits, cache.misses) == (0, 6)
+
+    def test_lean_entries_without_size_steps_are_not_served(self, cache, monkeypatch):
+        # A lean entry as written before lean words had `size_steps`.
+        with monkeypatch.context() as patch:
+            patch.setattr(WordCache, 'FORMAT_VERSION', 1)
+            key = cache.key(SAMPLE2, lean=True)
+            cache.put_page_count(key, 3)
+            for index, (width, words) in enumerate(extract_pages(SAMPLE2, lean=True)):
+                cache.put(key, index, width, [
+                    {name: value for name, value in word.items() if name != 'size_steps'} for word in words
+                ])
+
+        assert cache.key(SAMPLE2, lean=True) != key
+        pages = list(extract_pages(SAMPLE2, cache=cache, lean=True))
+        assert pages == list(extract_pages(SAMPLE2, lean=True))
+        assert all('size_steps' in word for _, words in pages for word in words)
+        assert (cache.hits, cache.misses) == (0, 3)
+
@@ -0,0 +1,57 @@
+import pytest
+from lib import ContentGroup, Casing, Document, HeadingAccumulator, WordColumns
+from lib.content_group import word_sizes, word_size_steps
+
+def make_word(text, sizes, bottom=10, fontname='JJGECB+DeVinne'):
+    return {
+        'fontname': fontname,
+        'text': text,
+        'x0': 100,
+        'x1': 140,
+        'bottom': bottom,
+        'chars': [{'text': c, 'size': size} for c, size in zip(text, sizes)],
+    }
+
+@pytest.fixture
+def words():
+    return [
+        make_word('Hi', [14, 14]),
+        make_word('TITLE', [14, 10.5, 10.5, 10.5, 10.5], bottom=30),
+        make_word('I', [18], bottom=30, fontname='JJGECG+NewCenturySchlbk-Bold'),
+    ]
+
+class TestWordColumns:
+    def test_views(self, words):
+        columns = WordColumns.from_words(words)
+        assert len(columns) == 3
+        assert columns.fonts == ('JJGECB+DeVinne', 'JJGECG+NewCenturySchlbk-Bold')
+        assert [word['text'] for word in columns] == ['Hi', 'TITLE', 'I']
+        assert columns[2]['fontname'] == 'JJGECG+NewCenturySchlbk-Bold'
+        assert columns[1]['bottom'] == 30
+
+    def test_sizes(self, words):
+        columns = WordColumns.from_words(words)
+        assert [word_sizes(word) for word in columns] == [word_sizes(word) for word in words]
+        assert word_sizes(columns[1]) == (14, 10.5, False)
+        assert [word_size_steps(word) for word in columns] == [(14,), (14, 10.5), (18,)]
+
+    def test_content_group(self, words):
+        for word, view in zip(words, WordColumns.from_words(words)):
+            group, view_group = ContentGroup(word), ContentGroup(view)
+            assert (group.text, group.font, group.size, group.casing, group.y_bottom) == (
+                view_group.text, view_group.font, view_group.size, view_group.casing, view_group.y_bottom
+            )
+        assert ContentGroup(WordColumns.from_words(words)[1]).casing == Casing.SMALL_CAPS
+
+    def test_index_out_of_range(self, words):
+        with pytest.raises(IndexError):
+            WordColumns.from_words(words)[3]
+
+    def test_document_headings_match_dicts(self, sample3_pages):
+        def parse(convert):
+            document = Document()
+            for width, page_words in sample3_pages:
+                document.add_words(convert(page_words), width=width)
+            return [(heading.text(), heading.tier) for heading in document.headings]
+
+        assert parse(WordColumns.from_words) == parse(list)